@@ -0,0 +1,91 @@
+import hashlib
+from collections import Counter
+import pandas as pd
+from rich.console import Console
+from indicators import as_frame
+from model_registry import model_registry as default_registry
+from trading_signals import TradingSignalEngine
+
+console = Console()
+
+
+def content_hash(data):
+    """Hash isi data (nama kolom + semua nilai), bukan identitas object"""
+    df = as_frame(data)
+    digest = hashlib.sha1('|'.join(map(str, df.columns)).encode())
+    if len(df):
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class AnalysisContext:
+    """Cache hasil analisis untuk satu siklus analisis.
+
+    Fitur ML, prediksi ML, risk metrics, dan rekomendasi di-memoize per
+    content hash data input, jadi main.py dan analyze_with_gemini yang memakai
+    data yang sama hanya menghitung semuanya sekali. `stats` mencatat berapa
+    kali tiap stage benar-benar dijalankan, `hits` berapa kali diambil dari cache.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or default_registry
+        # Dipakai untuk langkah yang tidak butuh model (fitur, risk metrics, skor akhir)
+        self._engine = TradingSignalEngine()
+        self.stats = Counter()
+        self.hits = Counter()
+        self._cache = {}
+
+    def _memo(self, stage, key, compute):
+        cache_key = (stage,) + key
+        if cache_key in self._cache:
+            self.hits[stage] += 1
+            return self._cache[cache_key]
+        self.stats[stage] += 1
+        value = self._cache[cache_key] = compute()
+        return value
+
+    # Stage internal menerima digest yang sudah dihitung, jadi data cukup di-hash sekali per panggilan publik
+
+    def _features(self, digest, data):
+        return self._memo('features', (digest,), lambda: self._engine.latest_features(as_frame(data)))
+
+    def _predictions(self, digest, data, symbol, timeframe):
+        def compute():
+            df = as_frame(data)
+            engine = self.registry.get_engine(symbol, timeframe, df)
+            return engine.latest_signal(df, features=self._features(digest, data))
+
+        return self._memo('predictions', (digest, symbol, timeframe), compute)
+
+    def _risk_metrics(self, digest, data):
+        def compute():
+            df = as_frame(data)
+            return self._engine.calculate_risk_metrics(df, df['close'].iloc[-1])
+
+        return self._memo('risk_metrics', (digest,), compute)
+
+    def _recommendation(self, digest, data, symbol, timeframe):
+        def compute():
+            console.log("[cyan]🎯 Generating trading recommendation...[/cyan]")
+            ml_signal, ml_confidence = self._predictions(digest, data, symbol, timeframe)
+            return self._engine.build_recommendation(as_frame(data).iloc[-1], self._risk_metrics(digest, data),
+                                                     symbol, timeframe, ml_signal, ml_confidence)
+
+        return self._memo('recommendation', (digest, symbol, timeframe), compute)
+
+    def features(self, data):
+        """Fitur ML bar terakhir (baris yang dipakai untuk prediksi)"""
+        return self._features(content_hash(data), data)
+
+    def predictions(self, data, symbol, timeframe):
+        """(ml_signal, ml_confidence) bar terakhir"""
+        return self._predictions(content_hash(data), data, symbol, timeframe)
+
+    def risk_metrics(self, data):
+        return self._risk_metrics(content_hash(data), data)
+
+    def recommendation(self, data, symbol, timeframe):
+        """Sama dengan TradingSignalEngine.generate_trading_recommendation, tapi dihitung sekali per data"""
+        if len(as_frame(data)) == 0:
+            return {"error": "No data available"}
+        return self._recommendation(content_hash(data), data, symbol, timeframe)
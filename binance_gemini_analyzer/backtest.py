@@ -0,0 +1,228 @@
+import itertools
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from rich.console import Console
+from indicators import as_frame, calculate_indicators
+from trading_signals import TradingSignalEngine
+from window_kernels import CHUNK_ELEMENTS
+
+console = Console()
+
+EXIT_STOP_LOSS = 'stop_loss'
+EXIT_TAKE_PROFIT = 'take_profit'
+EXIT_TIMEOUT = 'timeout'
+EXIT_REASONS = np.array([EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_TIMEOUT])
+
+
+def atr_multiplier_for(timeframe):
+    """Multiplier ATR yang sama dengan TradingSignalEngine.build_recommendation"""
+    return 2.0 if timeframe in ['1m', '5m'] else 1.5
+
+
+def entry_directions(signal_score, ml_signal=None, threshold=1.0):
+    """Arah posisi per bar: 1 long, -1 short, 0 tidak entry.
+
+    Skor gabungan sama dengan rekomendasi live: Signal_Score * 0.6 + ML_Signal * 0.4,
+    BUY/STRONG_BUY kalau >= threshold, SELL/STRONG_SELL kalau <= -threshold.
+    """
+    combined = np.asarray(signal_score, dtype=float) * 0.6
+    if ml_signal is not None:
+        combined = combined + np.asarray(ml_signal, dtype=float) * 0.4
+    return np.where(combined >= threshold, 1, np.where(combined <= -threshold, -1, 0)).astype(np.int8)
+
+
+def _first_true(mask):
+    """Index kolom True pertama per baris, mask.shape[1] kalau tidak ada"""
+    hit = mask.any(axis=1)
+    return np.where(hit, mask.argmax(axis=1), mask.shape[1])
+
+
+def _first_touch(high, low, entries, direction, stop, target, max_holding):
+    """Cari bar pertama yang menyentuh stop atau target untuk semua kandidat entry sekaligus.
+
+    Bar setelah entry dibaca lewat strided view (tanpa copy per kandidat) dan
+    diproses per blok. Kalau stop dan target kena di bar yang sama, dianggap
+    stop duluan (asumsi konservatif karena urutan intrabar tidak diketahui).
+    Return (offset_exit, alasan) dengan offset 1..max_holding dari bar entry.
+    """
+    pad = np.full(max_holding, np.nan)
+    # Window baris i = bar i .. i+max_holding-1, jadi bar setelah entry e ada di window e+1
+    high_windows = sliding_window_view(np.concatenate([high, pad]), max_holding)
+    low_windows = sliding_window_view(np.concatenate([low, pad]), max_holding)
+
+    offsets = np.empty(len(entries), dtype=np.int64)
+    reasons = np.empty(len(entries), dtype=np.int8)
+    step = max(1, CHUNK_ELEMENTS // max_holding)
+    for start in range(0, len(entries), step):
+        block = slice(start, start + step)
+        rows = entries[block] + 1
+        highs, lows = high_windows[rows], low_windows[rows]
+        is_long = (direction[block] > 0)[:, None]
+        stop_level = stop[block, None]
+        target_level = target[block, None]
+
+        stop_at = _first_true(np.where(is_long, lows <= stop_level, highs >= stop_level))
+        target_at = _first_true(np.where(is_long, highs >= target_level, lows <= target_level))
+
+        reasons[block] = np.where(stop_at <= target_at,
+                                  np.where(stop_at < max_holding, 0, 2),
+                                  1)
+        offsets[block] = np.minimum(np.minimum(stop_at, target_at), max_holding - 1) + 1
+    return offsets, reasons
+
+
+def simulate_trades(close, high, low, atr, direction, atr_multiplier=1.5, reward_ratio=1.5,
+                    max_holding=48, fee_rate=0.001, allow_overlap=False):
+    """Replay aturan exit ATR (stop = entry -/+ ATR*mult, TP1 = entry +/- ATR*mult*reward_ratio).
+
+    Entry di harga close bar sinyal, exit di level stop/TP yang pertama tersentuh,
+    atau di close bar ke-max_holding (timeout). Tanpa allow_overlap, sinyal baru
+    baru dipakai setelah posisi sebelumnya exit. Return dict berisi array per trade.
+    """
+    close = np.asarray(close, dtype=float)
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    atr = np.asarray(atr, dtype=float)
+    direction = np.asarray(direction)
+    n = len(close)
+
+    # Bar terakhir tidak punya bar berikutnya, ATR 0 berarti indikator belum siap
+    candidates = np.flatnonzero((direction != 0) & (atr > 0) & np.isfinite(atr))
+    candidates = candidates[candidates < n - 1]
+
+    side = direction[candidates].astype(float)
+    entry_price = close[candidates]
+    risk = atr[candidates] * atr_multiplier
+    stop = entry_price - side * risk
+    target = entry_price + side * risk * reward_ratio
+
+    offsets, reasons = _first_touch(high, low, candidates, side, stop, target, max_holding)
+    exit_index = np.minimum(candidates + offsets, n - 1)
+
+    if not allow_overlap and len(candidates):
+        # Kandidat berikutnya setelah bar exit dihitung sekaligus, loop hanya mengikuti pointer per trade
+        next_position = np.searchsorted(candidates, exit_index, side='right').tolist()
+        selected = []
+        position = 0
+        while position < len(candidates):
+            selected.append(position)
+            position = next_position[position]
+        selected = np.asarray(selected, dtype=np.int64)
+    else:
+        selected = np.arange(len(candidates))
+
+    candidates, side, entry_price, risk = candidates[selected], side[selected], entry_price[selected], risk[selected]
+    stop, target, reasons, exit_index = stop[selected], target[selected], reasons[selected], exit_index[selected]
+
+    exit_price = np.where(reasons == 0, stop, np.where(reasons == 1, target, close[exit_index]))
+    r_multiple = side * (exit_price - entry_price) / risk
+    returns = side * (exit_price - entry_price) / entry_price - 2 * fee_rate
+
+    return {
+        'entry_index': candidates,
+        'exit_index': exit_index,
+        'direction': side.astype(np.int8),
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'stop_loss': stop,
+        'take_profit': target,
+        'exit_reason': EXIT_REASONS[reasons],
+        'r_multiple': r_multiple,
+        'return': returns,
+    }
+
+
+def summarize_trades(trades):
+    """PnL, hit rate, drawdown, dan statistik R-multiple dari hasil simulate_trades"""
+    returns = np.asarray(trades['return'], dtype=float)
+    r_multiple = np.asarray(trades['r_multiple'], dtype=float)
+    count = len(returns)
+    if count == 0:
+        return {'trades': 0, 'hit_rate': 0.0, 'total_return': 0.0, 'max_drawdown': 0.0,
+                'avg_r': 0.0, 'total_r': 0.0, 'profit_factor': 0.0,
+                'take_profit': 0, 'stop_loss': 0, 'timeout': 0}
+
+    # Trade diurutkan menurut bar entry, equity dimajemukkan per trade
+    equity = np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+    reasons = np.asarray(trades['exit_reason'])
+
+    return {
+        'trades': count,
+        'hit_rate': round(float((returns > 0).mean() * 100), 2),
+        'total_return': round(float((equity[-1] - 1) * 100), 2),
+        'max_drawdown': round(float((1 - equity / peak).max() * 100), 2),
+        'avg_r': round(float(r_multiple.mean()), 3),
+        'total_r': round(float(r_multiple.sum()), 2),
+        'profit_factor': round(float(gains / losses), 2) if losses > 0 else float('inf'),
+        'take_profit': int((reasons == EXIT_TAKE_PROFIT).sum()),
+        'stop_loss': int((reasons == EXIT_STOP_LOSS).sum()),
+        'timeout': int((reasons == EXIT_TIMEOUT).sum()),
+    }
+
+
+def walk_forward_ml_signals(data, train_bars=2000, step=500):
+    """ML_Signal out-of-sample: model di-training ulang tiap `step` bar pada `train_bars` bar sebelumnya.
+
+    Bar sebelum fold pertama (belum ada data training) bernilai 0. Label training
+    hanya memakai harga di dalam window training, jadi tidak ada lookahead.
+    """
+    df = as_frame(data)
+    signals = np.zeros(len(df), dtype=np.int8)
+    for start in range(train_bars, len(df), step):
+        engine = TradingSignalEngine()
+        engine.train_model(df.iloc[start - train_bars:start].copy())
+        if not engine.is_trained:
+            continue
+        count = min(step, len(df) - start)
+        prediction = engine.predict_latest(df.iloc[:start + count], count)
+        signals[start:start + count] = prediction['ML_Signal'].to_numpy()
+    return signals
+
+
+def run_backtest(data, timeframe=None, ml_signal=None, use_ml=True, threshold=1.0, max_holding=48,
+                 fee_rate=0.001, allow_overlap=False, return_trades=False):
+    """Backtest kolom Signal_Score (+ ML_Signal kalau ada) dengan aturan exit ATR.
+
+    `data` berupa IndicatorResult atau DataFrame hasil calculate_indicators.
+    `ml_signal` (misal dari walk_forward_ml_signals) menggantikan kolom ML_Signal.
+    Return ringkasan (dict), ditambah DataFrame trade kalau return_trades=True.
+    """
+    df = as_frame(data)
+    timeframe = timeframe or getattr(data, 'timeframe', None)
+    if ml_signal is None and use_ml and 'ML_Signal' in df.columns:
+        ml_signal = df['ML_Signal'].to_numpy()
+    direction = entry_directions(df['Signal_Score'].to_numpy(), ml_signal, threshold)
+
+    trades = simulate_trades(df['close'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(),
+                             df['ATR'].to_numpy(), direction, atr_multiplier=atr_multiplier_for(timeframe),
+                             max_holding=max_holding, fee_rate=fee_rate, allow_overlap=allow_overlap)
+    summary = summarize_trades(trades)
+    if not return_trades:
+        return summary
+
+    trade_log = pd.DataFrame(trades)
+    if 'timestamp' in df.columns:
+        timestamps = df['timestamp'].to_numpy()
+        trade_log['entry_time'] = timestamps[trades['entry_index']]
+        trade_log['exit_time'] = timestamps[trades['exit_index']]
+    return summary, trade_log
+
+
+def run_parameter_grid(klines, timeframe, grid, **backtest_kwargs):
+    """Backtest setiap kombinasi parameter indikator.
+
+    `grid` berupa dict nama parameter -> list nilai (menimpa get_indicator_params).
+    Return DataFrame satu baris per kombinasi, diurutkan dari total_r terbesar.
+    """
+    names = list(grid)
+    rows = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        result = calculate_indicators(klines, timeframe, params=params)
+        rows.append({**params, **run_backtest(result, **backtest_kwargs)})
+    console.log(f"[green]✅ {len(rows)} kombinasi parameter selesai di-backtest[/green]")
+    return pd.DataFrame(rows).sort_values('total_r', ascending=False, ignore_index=True)
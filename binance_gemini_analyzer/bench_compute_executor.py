@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark scaling IndicatorComputeExecutor: 500 symbol sintetis, 1..N worker process
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+sys.path.append('.')
+import indicators
+import model_registry
+import trading_signals
+from binance_data import klines_to_array, DEFAULT_KLINE_COLUMNS
+from compute_executor import IndicatorComputeExecutor, analyze_klines
+from test_with_simulation import generate_sample_klines
+import numpy as np
+import time
+
+SYMBOL_COUNT = 500
+CANDLES = 300
+
+
+def make_batch():
+    np.random.seed(42)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [
+            (f'SYM{i:03d}USDT', '1h', klines_to_array(generate_sample_klines('X', CANDLES, 100 + i),
+                                                      DEFAULT_KLINE_COLUMNS))
+            for i in range(SYMBOL_COUNT)
+        ]
+
+
+def run_benchmark(symbol_count=SYMBOL_COUNT):
+    indicators.console.quiet = True
+    trading_signals.console.quiet = True
+    model_registry.console.quiet = True
+    # Folder model kosong supaya setiap pool benar-benar training, bukan load dari run sebelumnya
+    model_dir = tempfile.mkdtemp()
+    os.environ['MODEL_DIR'] = model_dir
+    model_registry.model_registry.model_dir = model_dir
+    batch = make_batch()[:symbol_count]
+    cores = os.cpu_count() or 1
+
+    print(f'🚀 Benchmark compute executor ({len(batch)} symbol x {CANDLES} candle, {cores} core)')
+    print('=' * 60)
+
+    start = time.perf_counter()
+    for symbol, timeframe, klines in batch:
+        analyze_klines(klines, symbol, timeframe)
+    baseline = time.perf_counter() - start
+    print(f'{"In-process (sequential)":<26} | {baseline:>7.2f}s | {len(batch) / baseline:>7.1f} simbol/s')
+
+    workers = 1
+    while True:
+        with IndicatorComputeExecutor(max_workers=workers) as executor:
+            # Warm-up: start worker process + training model pertama di tiap worker
+            executor.run_batch_sync(batch[:workers])
+            start = time.perf_counter()
+            results = executor.run_batch_sync(batch)
+            elapsed = time.perf_counter() - start
+        errors = sum('error' in r for r in results)
+        print(f'{f"Process pool x{workers}":<26} | {elapsed:>7.2f}s | {len(batch) / elapsed:>7.1f} simbol/s | '
+              f'speedup {baseline / elapsed:>4.1f}x | error {errors}')
+        if workers >= cores:
+            break
+        workers = min(workers * 2, cores)
+
+
+if __name__ == "__main__":
+    run_benchmark()
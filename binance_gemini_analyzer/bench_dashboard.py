@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark render dashboard saat jawaban Gemini di-stream: clear + print semua window
+(display_windows lama) vs Dashboard berbasis diff
+"""
+import io
+import sys
+import time
+sys.path.append('.')
+from blessed import Terminal
+from dashboard import Dashboard, figlet_header
+from test_gemini_stream import TEXT
+
+TOKENS = 600
+WIDTH, HEIGHT = 120, 60
+
+
+def legacy_frame(term, windows):
+    """Perilaku lama: header Figlet dirender ulang, layar di-clear, semua window di-print"""
+    out = [term.clear + term.home + figlet_header(term)]
+    out.append(term.move_y(HEIGHT // 4) + windows['input'])
+    out.append(term.move_y(HEIGHT // 2) + windows['progress'])
+    out.append(term.move_y(HEIGHT // 2 + 5) + windows['result'])
+    out.append(term.move_y(HEIGHT - 15) + windows['indicators'])
+    return '\n'.join(out)
+
+
+def run_benchmark():
+    words = (TEXT + ' ') * (TOKENS // 30)
+    tokens = words.split(' ')[:TOKENS]
+    indicators = '\n'.join(f'   Indikator {i}: {i * 1.5:.2f}' for i in range(12))
+
+    stream = io.StringIO()
+    term = Terminal(kind='xterm-256color', stream=stream, force_styling=True)
+    windows = {'input': 'Pair: BTCUSDT\nTimeframe: 1h', 'progress': 'Gemini menulis analisis...',
+               'result': '', 'indicators': indicators}
+
+    started = time.perf_counter()
+    legacy_bytes = 0
+    for token in tokens:
+        windows['result'] += token + ' '
+        legacy_bytes += len(legacy_frame(term, windows))
+    legacy_time = time.perf_counter() - started
+
+    dash = Dashboard(term, stream=stream, width=WIDTH, height=HEIGHT)
+    dash.update(header=figlet_header(term), **{**windows, 'result': ''})
+    dash.render()
+    stream.seek(0)
+    stream.truncate()
+    result = ''
+    started = time.perf_counter()
+    for token in tokens:
+        result += token + ' '
+        dash.update(result=result)
+        dash.render()
+    diff_time = time.perf_counter() - started
+    diff_bytes = len(stream.getvalue())
+
+    print(f'🚀 Benchmark render dashboard ({TOKENS} token, terminal {WIDTH}x{HEIGHT}, satu frame per token)')
+    print('=' * 64)
+    print(f'{"Mode":<24} | {"Per frame":>10} | {"Byte/frame":>10} | {"Total byte":>10}')
+    print('-' * 64)
+    print(f'{"clear + print semua":<24} | {legacy_time / TOKENS * 1e6:>8.0f}us | {legacy_bytes / TOKENS:>10.0f} | '
+          f'{legacy_bytes:>10}')
+    print(f'{"Dashboard (diff)":<24} | {diff_time / TOKENS * 1e6:>8.0f}us | {diff_bytes / TOKENS:>10.0f} | '
+          f'{diff_bytes:>10}')
+    print(f'   Baris ditulis per frame: {dash.stats["lines_written"] / TOKENS:.2f}')
+
+
+if __name__ == "__main__":
+    run_benchmark()
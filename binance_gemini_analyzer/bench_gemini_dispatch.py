@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark analisis Gemini 40 simbol terhadap mock lokal: sequential vs paralel vs batch multi-symbol
+"""
+import asyncio
+import random
+import sys
+import time
+sys.path.append('.')
+import gemini_dispatch
+from gemini_dispatch import GeminiDispatcher
+from http_client import HttpClient
+from mock_servers import create_gemini_app, start_server
+from test_gemini_dispatch import make_job
+
+SYMBOL_COUNT = 40
+MODES = [
+    # (nama, concurrency, batch_size)
+    ('sequential', 1, 1),
+    ('paralel x8', 8, 1),
+    ('batch 5 x paralel 4', 4, 5),
+]
+
+
+def mock_latency(prompt):
+    """Latency mirip API LLM: dasar 80ms + ekor panjang, sedikit naik per symbol dalam satu request"""
+    symbols = max(1, prompt.count('### '))
+    return 0.08 + random.expovariate(1 / 0.04) + 0.01 * symbols
+
+
+async def run_benchmark():
+    gemini_dispatch.console.quiet = True
+    random.seed(7)
+    jobs = [make_job(f'SYM{i:03d}USDT') for i in range(SYMBOL_COUNT)]
+
+    print(f'🚀 Benchmark Gemini dispatch ({SYMBOL_COUNT} simbol, mock lokal)')
+    print('=' * 78)
+    print(f'{"Mode":<22} | {"Total":>7} | {"Request":>7} | {"p50":>7} | {"p90":>7} | {"p99":>7}')
+    print('-' * 78)
+
+    for name, concurrency, batch_size in MODES:
+        app = create_gemini_app(latency=mock_latency)
+        runner, base_url = await start_server(app)
+        try:
+            async with HttpClient() as client:
+                dispatcher = GeminiDispatcher(
+                    'bench-key', concurrency=concurrency, batch_size=batch_size, cache=False,
+                    session=await client.get_session(),
+                    api_url=f'{base_url}/v1beta/models/gemini-1.5-flash-latest:generateContent')
+                started = time.perf_counter()
+                results = await dispatcher.run(jobs)
+                total = time.perf_counter() - started
+        finally:
+            await runner.cleanup()
+
+        assert all(result.source == 'gemini' for result in results)
+        p = dispatcher.percentiles()
+        print(f'{name:<22} | {total:>6.2f}s | {app["state"].requests:>7} | {p["p50"]:>5.0f}ms | '
+              f'{p["p90"]:>5.0f}ms | {p["p99"]:>5.0f}ms')
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark scan 200 simbol: ClientSession baru per request vs HttpClient yang di-pool
+"""
+import asyncio
+import sys
+sys.path.append('.')
+import aiohttp
+import binance_data
+from binance_data import get_binance_data
+import http_client
+from http_client import HttpClient
+from mock_servers import create_binance_app, start_server
+import time
+
+SYMBOL_COUNT = 200
+CONCURRENCY = 20
+
+
+async def fetch_with_new_session(symbol, interval, limit):
+    """Perilaku lama: session (dan koneksi) baru untuk setiap request"""
+    async with aiohttp.ClientSession() as session:
+        return await get_binance_data(symbol, interval, limit, session=session)
+
+
+async def scan(fetch, symbols, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def run(symbol):
+        async with semaphore:
+            start = time.perf_counter()
+            data = await fetch(symbol)
+            latencies.append(time.perf_counter() - start)
+            assert data
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(symbol) for symbol in symbols))
+    return time.perf_counter() - start, sum(latencies) / len(latencies)
+
+
+async def run_benchmark():
+    binance_data.console.quiet = True
+    http_client.console.quiet = True
+    symbols = [f'SYM{i:03d}USDT' for i in range(SYMBOL_COUNT)]
+
+    print(f'🚀 Benchmark HTTP client ({SYMBOL_COUNT} simbol, mock server lokal)')
+    print('=' * 72)
+    print(f'{"Mode":<28} | {"Conc":>4} | {"Total":>8} | {"Per request":>11} | {"Koneksi":>7}')
+    print('-' * 72)
+
+    for concurrency in (1, CONCURRENCY):
+        for mode in ('session per request', 'pooled HttpClient'):
+            app = create_binance_app()
+            runner, base_url = await start_server(app)
+            binance_data.BASE_URL = f'{base_url}/api/v3/klines'
+
+            if mode == 'session per request':
+                total, per_request = await scan(
+                    lambda s: fetch_with_new_session(s, '1h', 5), symbols, concurrency)
+            else:
+                async with HttpClient() as client:
+                    session = await client.get_session()
+                    total, per_request = await scan(
+                        lambda s: get_binance_data(s, '1h', 5, session=session), symbols, concurrency)
+
+            connections = len(app['state'].connections)
+            await runner.cleanup()
+            print(f'{mode:<28} | {concurrency:>4} | {total:>7.3f}s | {per_request * 1000:>9.2f}ms | {connections:>7}')
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
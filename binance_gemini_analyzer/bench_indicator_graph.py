@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Benchmark calculate_indicators: semua indikator vs hanya kolom yang diminta
+"""
+import sys
+sys.path.append('.')
+import indicators
+from bench_backtest import synthetic_klines
+from indicators import calculate_indicators
+from trading_signals import recommendation_columns
+import time
+
+BARS = 200_000
+REPEAT = 5
+
+SELECTIONS = {
+    'semua indikator': None,
+    'RSI + ATR': ['RSI', 'ATR'],
+    'Signal_Score': ['Signal_Score'],
+    'rekomendasi (scanner)': recommendation_columns,
+}
+
+
+def run_benchmark():
+    indicators.console.quiet = True
+    klines = synthetic_klines(BARS)
+
+    print(f'🚀 Benchmark indicator graph ({BARS:,} bar, rata-rata {REPEAT}x)')
+    print('=' * 60)
+
+    baseline = None
+    for label, columns in SELECTIONS.items():
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            result = calculate_indicators(klines, '1h', columns=columns)
+        elapsed = (time.perf_counter() - start) / REPEAT
+        baseline = baseline or elapsed
+        print(f'{label:<22} | {elapsed * 1000:>8.1f} ms | {len(result.df.columns):>3} kolom | '
+              f'speedup {baseline / elapsed:>5.1f}x')
+
+
+if __name__ == "__main__":
+    run_benchmark()
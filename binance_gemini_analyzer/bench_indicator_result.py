@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark hand-off hasil indikator: to_dict('records') + pd.DataFrame() per consumer vs IndicatorResult
+"""
+import sys
+sys.path.append('.')
+import indicators
+from indicators import calculate_indicators, IndicatorResult
+from test_with_simulation import generate_sample_klines
+import pandas as pd
+import numpy as np
+import time
+import tracemalloc
+
+# main.py, analyze_with_gemini dan demo_run masing-masing membangun ulang DataFrame
+CONSUMERS = 3
+
+
+def old_handoff(df, timeframe, params):
+    records = df.to_dict('records')
+    frames = [pd.DataFrame(records) for _ in range(CONSUMERS)]
+    return frames, records[-1]
+
+
+def new_handoff(df, timeframe, params):
+    result = IndicatorResult(df, timeframe, params)
+    frames = [result.df for _ in range(CONSUMERS)]
+    return frames, result.latest()
+
+
+def measure(func, *args, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def run_benchmark():
+    indicators.console.quiet = True
+    np.random.seed(42)
+    result = calculate_indicators(generate_sample_klines('BTCUSDT', 1050, 45000), '1h')
+    df = result.df
+    print(f'🚀 Benchmark hand-off hasil indikator ({len(df)} baris x {len(df.columns)} kolom, '
+          f'{CONSUMERS} consumer)')
+    print('=' * 60)
+
+    old_time, old_peak = measure(old_handoff, df, result.timeframe, result.params)
+    new_time, new_peak = measure(new_handoff, df, result.timeframe, result.params)
+
+    print(f'{"Mode":<22} | {"Waktu":>10} | {"Peak memori":>12}')
+    print('-' * 60)
+    print(f'{"records round-trip":<22} | {old_time * 1000:>8.2f}ms | {old_peak / 1e6:>10.2f}MB')
+    print(f'{"IndicatorResult":<22} | {new_time * 1000:>8.2f}ms | {new_peak / 1e6:>10.2f}MB')
+    print(f'Speedup: {old_time / new_time:.0f}x')
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingestion kline: json.loads + DataFrame object + to_numeric vs parse_klines_json
+"""
+import sys
+sys.path.append('.')
+from binance_data import parse_klines_json
+from indicators import klines_to_frame
+from mock_servers import mock_kline_rows
+import pandas as pd
+import numpy as np
+import json
+import time
+import tracemalloc
+
+OLD_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+]
+
+
+def old_ingestion(raw):
+    """Jalur lama: list-of-strings -> DataFrame object -> to_numeric per kolom"""
+    df = pd.DataFrame(json.loads(raw), columns=OLD_COLUMNS)
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def new_ingestion(raw):
+    return klines_to_frame(parse_klines_json(raw))
+
+
+def measure(func, raw):
+    # Waktu diukur tanpa tracemalloc (tracemalloc memperlambat alokasi objek)
+    start = time.perf_counter()
+    df = func(raw)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(raw)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, df
+
+
+def run_benchmark(sizes=(1_000, 100_000, 1_000_000)):
+    print('🚀 Benchmark kline ingestion (JSON bytes -> DataFrame OHLCV)')
+    print('=' * 78)
+    print(f'{"Rows":>10} | {"Lama":>9} | {"Baru":>9} | {"Speedup":>7} | {"Peak lama":>10} | {"Peak baru":>10}')
+    print('-' * 78)
+
+    for size in sizes:
+        raw = json.dumps(mock_kline_rows('BTCUSDT', '1m', range(0, size * 60_000, 60_000))).encode()
+
+        old_time, old_peak, old_df = measure(old_ingestion, raw)
+        new_time, new_peak, new_df = measure(new_ingestion, raw)
+
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            np.testing.assert_array_equal(old_df[col].values, new_df[col].values)
+
+        print(f'{size:>10,} | {old_time:>8.3f}s | {new_time:>8.3f}s | {old_time / new_time:>6.1f}x | '
+              f'{old_peak / 1e6:>8.1f}MB | {new_peak / 1e6:>8.1f}MB')
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark inference ML: prediksi full history vs bar terakhir vs batch banyak symbol
+"""
+import contextlib
+import io
+import sys
+sys.path.append('.')
+import indicators
+import trading_signals
+from indicators import calculate_indicators
+from test_with_simulation import generate_sample_klines
+from trading_signals import TradingSignalEngine
+import numpy as np
+import time
+
+SYMBOL_COUNT = 200
+CANDLES = 1000
+
+
+def timed(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark():
+    indicators.console.quiet = True
+    trading_signals.console.quiet = True
+    np.random.seed(42)
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = [calculate_indicators(generate_sample_klines('X', CANDLES, 100 + i), '1h').df
+                  for i in range(SYMBOL_COUNT)]
+
+    engine = TradingSignalEngine()
+    engine.train_model(frames[0].copy())
+
+    print(f'🚀 Benchmark inference ML ({SYMBOL_COUNT} symbol x {CANDLES} candle, model sudah ter-training)')
+    print('=' * 60)
+
+    full = timed(lambda: [engine.predict_signals(df.copy()) for df in frames], repeat=1)
+    latest = timed(lambda: [engine.latest_signal(df) for df in frames])
+    batch = timed(lambda: engine.predict_latest_batch(frames))
+
+    for name, elapsed in [('Full history per symbol', full), ('Bar terakhir per symbol', latest),
+                          ('Batch bar terakhir', batch)]:
+        print(f'{name:<26} | {elapsed * 1000:>9.1f} ms | {elapsed / SYMBOL_COUNT * 1000:>7.2f} ms/symbol | '
+              f'speedup {full / elapsed:>6.1f}x')
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark param sweep: calculate_indicators + run_backtest per kandidat vs RollingCache bersama
+"""
+import os
+import sys
+sys.path.append('.')
+import backtest
+import indicators
+import param_sweep
+from backtest import run_backtest
+from bench_backtest import synthetic_klines
+from indicators import calculate_indicators
+from param_sweep import RollingCache, random_candidates, run_sweep
+import time
+
+BARS = 100_000
+CANDIDATES = 200
+BASELINE_CANDIDATES = 10
+
+
+def run_benchmark():
+    indicators.console.quiet = True
+    backtest.console.quiet = True
+    param_sweep.console.quiet = True
+    klines = synthetic_klines(BARS)
+    candidates = random_candidates(CANDIDATES, seed=7)
+
+    print(f'🚀 Benchmark param sweep ({BARS:,} bar, {CANDIDATES} kandidat acak, {os.cpu_count()} core)')
+    print('=' * 60)
+
+    start = time.perf_counter()
+    for params in candidates[:BASELINE_CANDIDATES]:
+        run_backtest(calculate_indicators(klines, '1h', params=params), use_ml=False)
+    baseline = (time.perf_counter() - start) / BASELINE_CANDIDATES
+    print(f'{"calculate_indicators":<24} | {baseline * 1000:>8.1f} ms/kandidat')
+
+    start = time.perf_counter()
+    cache = RollingCache(klines, '1h')
+    for params in candidates:
+        cache.evaluate(params)
+    cached = (time.perf_counter() - start) / CANDIDATES
+    print(f'{"RollingCache (1 proses)":<24} | {cached * 1000:>8.1f} ms/kandidat | speedup {baseline / cached:>5.1f}x')
+    print(f'{"":<24} | intermediate dihitung: {dict(cache.stats)}')
+
+    start = time.perf_counter()
+    run_sweep('BENCH', '1h', klines, candidates, min_trades=1)
+    pooled = (time.perf_counter() - start) / CANDIDATES
+    print(f'{"run_sweep (pool)":<24} | {pooled * 1000:>8.1f} ms/kandidat | speedup {baseline / pooled:>5.1f}x')
+
+
+if __name__ == "__main__":
+    run_benchmark()
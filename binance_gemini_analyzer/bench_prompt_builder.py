@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark prompt Gemini: f-string lama (emoji + float mentah) vs PromptBuilder ringkas.
+Ukuran prompt, waktu build, dan latency upstream terhadap mock yang lambat sebanding jumlah token.
+"""
+import asyncio
+import sys
+import time
+sys.path.append('.')
+import numpy as np
+from analysis_context import AnalysisContext
+from gemini_analyzer import build_payload
+from http_client import HttpClient
+from indicators import calculate_indicators
+from mock_servers import create_gemini_app, start_server
+from prompt_builder import PromptBuilder, estimate_tokens
+from test_with_simulation import generate_sample_klines
+
+ITERATIONS = 2000
+REQUESTS = 30
+# Model latency mock: prefill sebanding jumlah token input
+PREFILL_SECONDS_PER_TOKEN = 0.0001
+# Harga input gemini-1.5-flash (USD per 1 juta token, prompt <= 128k)
+INPUT_PRICE_PER_MILLION = 0.075
+
+
+def legacy_prompt(symbol, timeframe, latest_data, trading_recommendation):
+    """Prompt versi sebelum PromptBuilder, disalin apa adanya untuk pembanding"""
+    return f"""
+    ANALISIS TRADING CRYPTOCURRENCY ADVANCED - {symbol} ({timeframe})
+
+    🔍 DATA TEKNIKAL TERKINI:
+    Current Price: ${latest_data.get('close', 'N/A')}
+    RSI: {latest_data.get('RSI', 'N/A')}
+    MACD: {latest_data.get('MACD', 'N/A')}
+    Signal Score: {latest_data.get('Signal_Score', 'N/A')}
+    Recommendation: {latest_data.get('Recommendation', 'N/A')}
+
+    🤖 MACHINE LEARNING ANALYSIS:
+    ML Signal: {trading_recommendation.get('ml_signal', 'N/A')}
+    ML Confidence: {trading_recommendation.get('ml_confidence', 'N/A')}%
+    Technical Score: {trading_recommendation.get('technical_score', 'N/A')}
+
+    📊 ADVANCED INDICATORS:
+    ADX: {latest_data.get('ADX', 'N/A')}
+    Williams %R: {latest_data.get('Williams_R', 'N/A')}
+    CCI: {latest_data.get('CCI', 'N/A')}
+    Trend Strength: {latest_data.get('Trend_Strength', 'N/A')}
+
+    🎯 TRADING RECOMMENDATION SYSTEM:
+    Action: {trading_recommendation.get('action', 'N/A')}
+    Confidence: {trading_recommendation.get('confidence', 'N/A')}%
+    Entry Price: ${trading_recommendation.get('entry_price', 'N/A')}
+    Stop Loss: ${trading_recommendation.get('stop_loss', 'N/A')}
+    Take Profit 1: ${trading_recommendation.get('take_profit_1', 'N/A')}
+    Take Profit 2: ${trading_recommendation.get('take_profit_2', 'N/A')}
+    Risk/Reward: {trading_recommendation.get('risk_reward_ratio', 'N/A')}
+
+    📈 SUPPORT/RESISTANCE:
+    Support: ${trading_recommendation.get('support', 'N/A')}
+    Resistance: ${trading_recommendation.get('resistance', 'N/A')}
+
+    ⚡ VOLATILITY & RISK:
+    Volatility: {trading_recommendation.get('volatility', 'N/A')}%
+    ATR%: {trading_recommendation.get('atr_percent', 'N/A')}%
+
+    🔥 CANDLESTICK PATTERNS:
+    Doji: {latest_data.get('Doji', False)}
+    Hammer: {latest_data.get('Hammer', False)}
+    Shooting Star: {latest_data.get('Shooting_Star', False)}
+    Bullish Engulfing: {latest_data.get('Bullish_Engulfing', False)}
+    Bearish Engulfing: {latest_data.get('Bearish_Engulfing', False)}
+
+    Berdasarkan analisis teknikal advanced dan machine learning di atas, berikan analisis mendalam dengan format:
+
+    🎯 EXECUTIVE SUMMARY:
+    [Ringkasan singkat kondisi pasar dan rekomendasi utama]
+
+    📊 ANALISIS TEKNIKAL MENDALAM:
+    1. Trend Analysis: [Analisis trend multi-timeframe]
+    2. Momentum Indicators: [RSI, MACD, Stochastic analysis]
+    3. Volatility Analysis: [Bollinger Bands, ATR analysis]
+    4. Volume Analysis: [Volume patterns dan VWAP]
+    5. Advanced Indicators: [ADX, CCI, Williams %R]
+
+    🤖 MACHINE LEARNING INSIGHTS:
+    [Interpretasi hasil ML dan confidence level]
+
+    🎯 TRADING STRATEGY:
+    - Entry Strategy: [Kapan dan bagaimana masuk]
+    - Exit Strategy: [Target profit dan stop loss]
+    - Position Sizing: [Berapa % portfolio untuk trade ini]
+    - Risk Management: [Strategi manajemen risiko]
+
+    ⚠️ RISK ASSESSMENT:
+    - Risk Level: [Low/Medium/High]
+    - Key Risks: [Faktor risiko utama]
+    - Market Conditions: [Kondisi pasar saat ini]
+
+    🔮 MARKET OUTLOOK:
+    [Prediksi pergerakan harga jangka pendek dan menengah]
+
+    💡 TRADING TIPS:
+    [Tips praktis untuk eksekusi trading]
+
+    Berikan analisis yang objektif, data-driven, dan actionable!
+    """
+    
+
+
+def time_build(build, iterations=ITERATIONS):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def upstream_latency(prompt):
+    app = create_gemini_app(latency=lambda text: estimate_tokens(text) * PREFILL_SECONDS_PER_TOKEN)
+    runner, base_url = await start_server(app)
+    url = f'{base_url}/v1beta/models/gemini-1.5-flash-latest:generateContent?key=bench'
+    try:
+        async with HttpClient() as client:
+            session = await client.get_session()
+            started = time.perf_counter()
+            for _ in range(REQUESTS):
+                async with session.post(url, json=build_payload(prompt)) as response:
+                    await response.read()
+            return (time.perf_counter() - started) / REQUESTS * 1000
+    finally:
+        await runner.cleanup()
+
+
+def run_benchmark():
+    np.random.seed(42)
+    result = calculate_indicators(generate_sample_klines('BTCUSDT', 500, 45000), '1h')
+    recommendation = AnalysisContext().recommendation(result, 'BTCUSDT', '1h')
+    latest = result.latest()
+    builder = PromptBuilder()
+
+    variants = [
+        ('f-string lama', lambda: legacy_prompt('BTCUSDT', '1h', latest, recommendation)),
+        ('builder tanpa riwayat', lambda: builder.build('BTCUSDT', '1h', latest, recommendation)),
+        ('builder + riwayat', lambda: builder.build('BTCUSDT', '1h', latest, recommendation, history=result)),
+    ]
+
+    print(f'🚀 Benchmark prompt Gemini (BTCUSDT 1h, mock prefill {PREFILL_SECONDS_PER_TOKEN * 1e3:.1f} ms/token)')
+    print('=' * 86)
+    print(f'{"Varian":<22} | {"Karakter":>8} | {"Token":>6} | {"Build":>9} | {"Latency":>9} | {"USD/1000 analisis":>17}')
+    print('-' * 86)
+    for name, build in variants:
+        prompt = build()
+        tokens = estimate_tokens(prompt)
+        build_us = time_build(build)
+        latency_ms = asyncio.run(upstream_latency(prompt))
+        cost = tokens * INPUT_PRICE_PER_MILLION / 1e6 * 1000
+        print(f'{name:<22} | {len(prompt):>8} | {tokens:>6} | {build_us:>7.1f}us | {latency_ms:>7.1f}ms | {cost:>17.4f}')
+
+
+if __name__ == "__main__":
+    run_benchmark()
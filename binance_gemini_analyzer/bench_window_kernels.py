@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark rolling MAD (CCI): rolling().apply(lambda) vs window_kernels.rolling_mad
+Benchmark rolling max/min: panggilan pandas berulang vs satu sparse table (rolling_extrema)
+"""
+import sys
+sys.path.append('.')
+from window_kernels import rolling_extrema, rolling_mad
+import pandas as pd
+import numpy as np
+import time
+
+WINDOW = 20
+
+# Window high/low yang dipakai indikator 1h: Stochastic & Williams %R 14,
+# Ichimoku 9/26/52, support/resistance 20 (center)
+EXTREMA_WINDOWS = [14, 9, 26, 52]
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run_benchmark(sizes=(1_000, 100_000, 1_000_000)):
+    print(f'🚀 Benchmark rolling MAD (window={WINDOW})')
+    print('=' * 60)
+    print(f'{"Rows":>10} | {"pandas apply":>14} | {"rolling_mad":>12} | {"Speedup":>8}')
+    print('-' * 60)
+
+    rng = np.random.default_rng(42)
+    for size in sizes:
+        series = pd.Series(45000 * np.cumprod(1 + rng.normal(0, 0.01, size)))
+        repeat = 3 if size <= 100_000 else 1
+
+        baseline_time, expected = best_of(
+            lambda: series.rolling(window=WINDOW).apply(lambda x: np.mean(np.abs(x - x.mean()))),
+            repeat)
+        kernel_time, result = best_of(lambda: rolling_mad(series, WINDOW), repeat)
+
+        np.testing.assert_allclose(result.values, expected.values, rtol=1e-10, equal_nan=True)
+        print(f'{size:>10,} | {baseline_time:>13.4f}s | {kernel_time:>11.4f}s | {baseline_time / kernel_time:>7.1f}x')
+
+
+def pandas_extrema(high, low):
+    """Pola lama: setiap indikator memanggil rolling().max()/min() sendiri"""
+    results = [high.rolling(14).max(), low.rolling(14).min()]  # Stochastic
+    results += [high.rolling(14).max(), high.rolling(14).max(), low.rolling(14).min()]  # Williams %R
+    for window in EXTREMA_WINDOWS[1:]:  # Ichimoku
+        results += [high.rolling(window).max(), low.rolling(window).min()]
+    results += [high.rolling(20, center=True).max(), low.rolling(20, center=True).min()]  # Support/resistance
+    return results
+
+
+def kernel_extrema(high, low):
+    highs = rolling_extrema(high, EXTREMA_WINDOWS, 'max')
+    lows = rolling_extrema(low, EXTREMA_WINDOWS, 'min')
+    return (highs, lows, rolling_extrema(high, [20], 'max', center=True),
+            rolling_extrema(low, [20], 'min', center=True))
+
+
+def run_extrema_benchmark(size=1_000_000, repeat=3):
+    print(f'\n🚀 Benchmark rolling max/min ({size:,} rows, window {EXTREMA_WINDOWS} + 20 center)')
+    print('=' * 60)
+
+    rng = np.random.default_rng(42)
+    close = 45000 * np.cumprod(1 + rng.normal(0, 0.01, size))
+    high = pd.Series(close * (1 + rng.uniform(0, 0.01, size)))
+    low = pd.Series(close * (1 - rng.uniform(0, 0.01, size)))
+
+    baseline_time, expected = best_of(lambda: pandas_extrema(high, low), repeat)
+    kernel_time, (highs, lows, center_high, center_low) = best_of(lambda: kernel_extrema(high, low), repeat)
+
+    assert highs[14].equals(expected[0]) and lows[52].equals(expected[-3])
+    assert center_high[20].equals(expected[-2]) and center_low[20].equals(expected[-1])
+    print(f'{"pandas berulang":<18} | {baseline_time:>8.4f}s')
+    print(f'{"rolling_extrema":<18} | {kernel_time:>8.4f}s | speedup {baseline_time / kernel_time:>5.1f}x')
+
+
+if __name__ == "__main__":
+    run_benchmark()
+    run_extrema_benchmark()
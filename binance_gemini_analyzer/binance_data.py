@@ -1,27 +1,207 @@
-import aiohttp
 import asyncio
+import json
+import time
+import warnings
+import numpy as np
+from datetime import datetime
 from rich.console import Console
+from http_client import get_session
+from request_scheduler import PRIORITY_BACKFILL, PRIORITY_LIVE, request_scheduler
 
 console = Console()
 BASE_URL = "https://api.binance.com/api/v3/klines"
+EXCHANGE_INFO_URL = "https://api.binance.com/api/v3/exchangeInfo"
 
-async def get_binance_data(symbol, interval, limit=1000):
-    async with aiohttp.ClientSession() as session:
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000,
+}
+
+# Kolom numerik kline Binance dengan tipe datanya (kolom 'ignore' tidak disimpan)
+KLINE_DTYPE = np.dtype([
+    ('timestamp', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+    ('close', '<f8'), ('volume', '<f8'), ('close_time', '<i8'),
+    ('quote_asset_volume', '<f8'), ('number_of_trades', '<i8'),
+    ('taker_buy_base_asset_volume', '<f8'), ('taker_buy_quote_asset_volume', '<f8'),
+])
+
+# Posisi setiap kolom di response kline (12 kolom, terakhir 'ignore')
+KLINE_FIELD_INDEX = {name: index for index, name in enumerate(KLINE_DTYPE.names)}
+KLINE_WIDTH = 12
+# Kolom yang dipakai calculate_indicators, kolom lain hanya diparse kalau diminta
+DEFAULT_KLINE_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+KLINES_PAGE_LIMIT = 1000
+KLINES_REQUEST_WEIGHT = 2
+EXCHANGE_INFO_WEIGHT = 20
+
+
+def to_milliseconds(value):
+    """Konversi datetime / detik / milidetik ke timestamp milidetik"""
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+def kline_dtype(columns=None):
+    """Sub-dtype KLINE_DTYPE untuk kolom yang diminta (None = semua kolom)"""
+    if columns is None:
+        return KLINE_DTYPE
+    return np.dtype([(name, KLINE_DTYPE.fields[name][0]) for name in columns])
+
+
+def klines_to_array(klines, columns=None):
+    """Konversi list kline (format REST Binance) ke structured array KLINE_DTYPE"""
+    dtype = kline_dtype(columns)
+    array = np.empty(len(klines), dtype=dtype)
+    for name in dtype.names:
+        index = KLINE_FIELD_INDEX[name]
+        array[name] = [kline[index] for kline in klines]
+    return array
+
+
+def parse_klines_json(raw, columns=DEFAULT_KLINE_COLUMNS):
+    """Parse body JSON kline langsung ke structured array tanpa list-of-strings.
+
+    Bracket dan tanda kutip dibuang, lalu semua angka diparse sekaligus oleh
+    numpy ke satu tabel float64 (n x 12). Kolom yang tidak diminta dilewati.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode()
+
+    text = raw.translate(None, b'[]" \n\r\t')
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            values = np.fromstring(text, dtype=np.float64, sep=',')
+    except (DeprecationWarning, ValueError):
+        values = None
+
+    if values is None or values.size % KLINE_WIDTH:
+        # Format tidak terduga, pakai parser JSON biasa
+        return klines_to_array(json.loads(raw), columns)
+
+    table = values.reshape(-1, KLINE_WIDTH)
+    dtype = kline_dtype(columns)
+    array = np.empty(len(table), dtype=dtype)
+    for name in dtype.names:
+        array[name] = table[:, KLINE_FIELD_INDEX[name]]
+    return array
+
+
+async def _request_klines(session, params, as_array=False, columns=DEFAULT_KLINE_COLUMNS, priority=PRIORITY_LIVE):
+    status, body = await request_scheduler.get(session, BASE_URL, params, KLINES_REQUEST_WEIGHT, priority)
+    if status == 200:
+        if as_array:
+            return parse_klines_json(body, columns), None
+        return json.loads(body), None
+    return None, f"{status} - {body.decode(errors='replace')}"
+
+
+async def get_binance_data(symbol, interval, limit=1000, session=None,
+                           as_array=False, columns=DEFAULT_KLINE_COLUMNS):
+    """Ambil kline terbaru. Dengan as_array=True hasilnya structured array (lihat parse_klines_json)"""
+    if session is None:
+        session = await get_session()
+
+    params = {
+        "symbol": symbol,
+        "interval": interval,
+        "limit": limit
+    }
+
+    console.log(f"[bold blue]Requesting data from Binance:[/bold blue] {BASE_URL}")
+    console.log(f"[blue]Params:[/blue] {params}")
+
+    data, error = await _request_klines(session, params, as_array, columns)
+    if data is not None:
+        console.log(f"[green]Successfully fetched {len(data)} candles[/green]")
+        return data
+    else:
+        console.log(f"[bold red]Error: {error}[/bold red]")
+        return None
+
+
+async def get_historical_klines(symbol, interval, start_time, end_time=None, session=None,
+                                max_concurrency=8, as_array=False, columns=DEFAULT_KLINE_COLUMNS):
+    """Backfill kline di rentang [start_time, end_time] lewat pagination startTime/endTime.
+
+    Halaman (maks 1000 candle) diambil paralel dengan prioritas backfill (jatah
+    weight backfill per window dibatasi request_scheduler), lalu disusun ulang
+    sesuai urutan waktu dan candle duplikat di batas halaman dibuang.
+    Return list kline format REST Binance (atau structured array kalau as_array=True),
+    None kalau ada halaman yang gagal.
+    """
+    if session is None:
+        session = await get_session()
+
+    interval_ms = INTERVAL_MS[interval]
+    start_ms = to_milliseconds(start_time)
+    end_ms = to_milliseconds(end_time) if end_time is not None else int(time.time() * 1000)
+    start_ms = -(-start_ms // interval_ms) * interval_ms  # bulatkan ke open time candle berikutnya
+
+    page_span = KLINES_PAGE_LIMIT * interval_ms
+    page_starts = list(range(start_ms, end_ms + 1, page_span))
+
+    console.log(f"[bold blue]Backfill {symbol} {interval}:[/bold blue] "
+                f"{len(page_starts)} halaman, concurrency {max_concurrency}")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    started = time.perf_counter()
+
+    async def fetch_page(page_start):
         params = {
             "symbol": symbol,
             "interval": interval,
-            "limit": limit
+            "startTime": page_start,
+            "endTime": min(page_start + page_span - 1, end_ms),
+            "limit": KLINES_PAGE_LIMIT
         }
-        
-        console.log(f"[bold blue]Requesting data from Binance:[/bold blue] {BASE_URL}")
-        console.log(f"[blue]Params:[/blue] {params}")
-        
-        async with session.get(BASE_URL, params=params) as response:
-            if response.status == 200:
-                data = await response.json()
-                console.log(f"[green]Successfully fetched {len(data)} candles[/green]")
-                return data
-            else:
-                console.log(f"[bold red]Error: {response.status}[/bold red]")
-                console.log(f"[red]Response: {await response.text()}[/red]")
-                return None
+        async with semaphore:
+            return await _request_klines(session, params, as_array, columns, PRIORITY_BACKFILL)
+
+    pages = await asyncio.gather(*(fetch_page(page_start) for page_start in page_starts))
+
+    for page_start, (data, error) in zip(page_starts, pages):
+        if data is None:
+            console.log(f"[bold red]Backfill gagal di halaman {page_start}: {error}[/bold red]")
+            return None
+
+    if as_array:
+        klines = np.concatenate([data for data, _ in pages]) if pages else np.empty(0, kline_dtype(columns))
+        if len(klines) > 1:
+            timestamps = klines['timestamp']
+            keep = np.ones(len(klines), dtype=bool)
+            keep[1:] = timestamps[1:] > np.maximum.accumulate(timestamps)[:-1]
+            klines = klines[keep]
+    else:
+        klines = []
+        last_open_time = None
+        for data, _ in pages:
+            for kline in data:
+                if last_open_time is None or kline[0] > last_open_time:
+                    klines.append(kline)
+                    last_open_time = kline[0]
+
+    elapsed = time.perf_counter() - started
+    console.log(f"[green]Backfill selesai: {len(klines)} candles dalam {elapsed:.2f}s[/green]")
+    return klines
+
+
+async def get_exchange_symbols(quote_asset='USDT', session=None):
+    """Daftar symbol yang sedang TRADING untuk quote asset tertentu (dari exchangeInfo)"""
+    if session is None:
+        session = await get_session()
+
+    console.log(f"[bold blue]Requesting exchange info:[/bold blue] {EXCHANGE_INFO_URL}")
+    status, body = await request_scheduler.get(session, EXCHANGE_INFO_URL, weight=EXCHANGE_INFO_WEIGHT)
+    if status != 200:
+        console.log(f"[bold red]Error: {status} - {body.decode(errors='replace')}[/bold red]")
+        return None
+    info = json.loads(body)
+
+    return [
+        item['symbol'] for item in info.get('symbols', [])
+        if item.get('status') == 'TRADING' and (quote_asset is None or item.get('quoteAsset') == quote_asset)
+    ]
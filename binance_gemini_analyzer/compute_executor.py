@@ -0,0 +1,135 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import indicators
+import model_registry
+import trading_signals
+from binance_data import DEFAULT_KLINE_COLUMNS, kline_dtype, klines_to_array
+
+COMPUTE_DTYPE = kline_dtype(DEFAULT_KLINE_COLUMNS)
+
+
+def _init_worker():
+    """Matikan log rich di worker supaya output tidak berantakan"""
+    indicators.console.quiet = True
+    trading_signals.console.quiet = True
+    model_registry.console.quiet = True
+
+
+def analyze_klines(klines, symbol, timeframe):
+    """Hitung indikator + rekomendasi untuk satu symbol (hanya indikator yang dipakai rekomendasi)"""
+    result = indicators.calculate_indicators(klines, timeframe, symbol=symbol, columns=trading_signals.recommendation_columns)
+    recommendation = model_registry.model_registry.generate_trading_recommendation(result, symbol, timeframe)
+    if 'error' in recommendation:
+        return {'symbol': symbol, 'timeframe': timeframe, 'error': recommendation['error']}
+    latest = result.latest()
+    recommendation['price'] = latest.get('close', 0)
+    recommendation['signal_score'] = latest.get('Signal_Score', 0)
+    recommendation['signal_recommendation'] = latest.get('Recommendation', 'HOLD')
+    # Baris candle terakhir (timestamp + indikator) untuk prompt Gemini dan fingerprint cache per bar
+    recommendation['latest'] = latest
+    return recommendation
+
+
+def _analyze_shared(shm_name, offset, count, symbol, timeframe):
+    """Worker: baca kline dari shared memory lalu analisis"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = np.ndarray((count,), dtype=COMPUTE_DTYPE, buffer=shm.buf, offset=offset)
+        # Salin ke memori lokal supaya buffer shared memory bisa langsung dilepas
+        klines = view.copy()
+        del view
+    finally:
+        shm.close()
+    return analyze_klines(klines, symbol, timeframe)
+
+
+def _to_compute_array(klines):
+    """Samakan format kline ke structured array OHLCV yang dipakai worker"""
+    if not (isinstance(klines, np.ndarray) and klines.dtype.names):
+        return klines_to_array(klines, DEFAULT_KLINE_COLUMNS)
+    if klines.dtype == COMPUTE_DTYPE:
+        return klines
+    array = np.empty(len(klines), dtype=COMPUTE_DTYPE)
+    for name in COMPUTE_DTYPE.names:
+        array[name] = klines[name]
+    return array
+
+
+class IndicatorComputeExecutor:
+    """Menjalankan calculate_indicators + rekomendasi untuk banyak symbol di process pool.
+
+    Array kline satu batch ditulis ke satu blok shared memory, worker hanya
+    menerima nama blok + offset, jadi data numerik tidak perlu di-pickle.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+
+    def _pack(self, batch):
+        arrays = [_to_compute_array(klines) for _, _, klines in batch]
+        total = sum(array.nbytes for array in arrays)
+        shm = shared_memory.SharedMemory(create=True, size=max(total, 1))
+        jobs = []
+        offset = 0
+        for (symbol, timeframe, _), array in zip(batch, arrays):
+            target = np.ndarray((len(array),), dtype=COMPUTE_DTYPE, buffer=shm.buf, offset=offset)
+            target[:] = array
+            del target
+            jobs.append((shm.name, offset, len(array), symbol, timeframe))
+            offset += array.nbytes
+        return shm, jobs
+
+    @staticmethod
+    def _release(shm):
+        shm.close()
+        shm.unlink()
+
+    def run_batch_sync(self, batch):
+        """Versi blocking dari run_batch (untuk script/benchmark tanpa event loop)"""
+        shm, jobs = self._pack(batch)
+        try:
+            futures = [self._pool.submit(_analyze_shared, *job) for job in jobs]
+            return [self._collect(future, job) for future, job in zip(futures, jobs)]
+        finally:
+            self._release(shm)
+
+    async def run_batch(self, batch):
+        """Analisis batch [(symbol, timeframe, klines), ...], hasil sesuai urutan batch.
+
+        Symbol yang gagal menghasilkan dict dengan key 'error'.
+        """
+        loop = asyncio.get_running_loop()
+        shm, jobs = self._pack(batch)
+        try:
+            futures = [loop.run_in_executor(self._pool, _analyze_shared, *job) for job in jobs]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+        finally:
+            self._release(shm)
+        return [
+            {'symbol': job[3], 'timeframe': job[4], 'error': str(result)} if isinstance(result, Exception) else result
+            for job, result in zip(jobs, results)
+        ]
+
+    async def submit(self, symbol, timeframe, klines):
+        """Analisis satu symbol"""
+        return (await self.run_batch([(symbol, timeframe, klines)]))[0]
+
+    @staticmethod
+    def _collect(future, job):
+        try:
+            return future.result()
+        except Exception as e:
+            return {'symbol': job[3], 'timeframe': job[4], 'error': str(e)}
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
@@ -2,3 +2,28 @@
 import os
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', 'demo_key_for_testing')
 
+
+# Folder penyimpanan kline lokal (satu file per symbol & interval)
+KLINE_STORE_DIR = os.getenv('KLINE_STORE_DIR', 'data/klines')
+
+# Folder model ML per symbol/timeframe
+MODEL_DIR = os.getenv('MODEL_DIR', 'data/models')
+
+# Parameter indikator hasil optimasi (param_sweep.py) per symbol/timeframe
+PARAMS_DIR = os.getenv('PARAMS_DIR', 'data/params')
+
+# Cache jawaban Gemini per fingerprint kondisi pasar (detik sebelum jawaban dianggap basi)
+GEMINI_CACHE_DIR = os.getenv('GEMINI_CACHE_DIR', 'data/gemini_cache')
+GEMINI_CACHE_TTL = int(os.getenv('GEMINI_CACHE_TTL', '900'))
+
+# Dispatch Gemini multi-symbol: maksimal request paralel dan deadline per request (detik)
+GEMINI_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', '4'))
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '30'))
+
+# Prompt Gemini: batas ukuran (perkiraan token) dan jumlah candle di tabel riwayat
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '1200'))
+PROMPT_HISTORY_ROWS = int(os.getenv('PROMPT_HISTORY_ROWS', '12'))
+
+# Watchlist: jeda setelah candle close sebelum refresh (detik) dan jeda coba lagi kalau candle baru belum ada
+WATCHLIST_CLOSE_DELAY = float(os.getenv('WATCHLIST_CLOSE_DELAY', '2'))
+WATCHLIST_RETRY_DELAY = float(os.getenv('WATCHLIST_RETRY_DELAY', '3'))
@@ -0,0 +1,214 @@
+"""
+Renderer dashboard terminal berbasis diff untuk blessed.
+
+Isi setiap window disimpan di screen buffer, dan setiap frame hanya baris yang
+berubah yang ditulis ke terminal (tanpa clear layar). Frame digambar oleh task
+asyncio dengan batas FPS, jadi update sebanyak apa pun tidak memblokir event
+loop dan tidak membuat layar berkedip. Input keyboard dibaca tanpa blocking.
+"""
+import asyncio
+import sys
+import textwrap
+from collections import Counter
+from blessed import Terminal
+from pyfiglet import Figlet
+
+DEFAULT_FPS = 20
+
+
+def figlet_header(term, title="Binance Gemini Analyzer", subtitle="dibuat oleh bobacheese"):
+    """Header Figlet (mahal dirender, jadi dibuat sekali per dashboard)"""
+    header_text = Figlet(font='slant').renderText(title)
+    return (term.bold_magenta + header_text + term.normal +
+            term.move_x(max(0, term.width // 2 - len(subtitle) // 2)) +
+            term.cyan + subtitle + term.normal)
+
+
+def main_layout(height):
+    """Posisi baris awal tiap window (sama dengan tampilan lama main.py)"""
+    return [('header', 0), ('input', height // 4), ('progress', height // 2),
+            ('result', height // 2 + 5), ('indicators', height - 15)]
+
+
+class Dashboard:
+    """Dashboard terminal non-blocking.
+
+    `update(nama=teks)` hanya mengganti isi window dan menandai dashboard kotor;
+    task `run()` menggambar paling banyak `fps` frame per detik. Setiap window
+    menempati baris dari posisinya sampai window berikutnya (`layout(height)`),
+    teks panjang di-wrap sesuai lebar terminal. `stats` mencatat frames,
+    lines_written dan bytes_written.
+    """
+
+    def __init__(self, term=None, layout=main_layout, fps=DEFAULT_FPS, stream=None, width=None, height=None):
+        self.term = term or Terminal()
+        self.layout = layout
+        self.fps = fps
+        self.stream = stream or sys.stdout
+        self._width = width
+        self._height = height
+        self.windows = {}
+        self.stats = Counter()
+        self._front = None  # baris yang sekarang tampil di layar
+        self._size = None
+        self._dirty = asyncio.Event()
+        self._task = None
+        self._line_cache = {}
+        self._next_line_cache = {}
+
+    @property
+    def width(self):
+        return self._width or self.term.width
+
+    @property
+    def height(self):
+        return self._height or self.term.height
+
+    def update(self, **windows):
+        """Ganti isi window (teks boleh mengandung escape warna blessed)"""
+        for name, text in windows.items():
+            if self.windows.get(name) != text:
+                self.windows[name] = text
+                self._dirty.set()
+
+    def invalidate(self):
+        """Paksa gambar ulang penuh di frame berikutnya (misal setelah ada output lain ke terminal)"""
+        self._front = None
+        self._dirty.set()
+
+    def _wrap_line(self, line, width):
+        """Wrap satu baris, hasilnya di-cache (saat streaming biasanya cuma baris terakhir yang berubah)"""
+        key = (line, width)
+        wrapped = self._line_cache.get(key)
+        if wrapped is None:
+            if '\x1b' not in line:
+                # Teks polos: len + textwrap jauh lebih cepat dari term.length/term.wrap
+                wrapped = (textwrap.wrap(line, width) or ['']) if len(line) > width else [line]
+            else:
+                # term.wrap paham escape sequence warna
+                wrapped = (self.term.wrap(line, width) or ['']) if self.term.length(line) > width else [line]
+        self._next_line_cache[key] = wrapped
+        return wrapped
+
+    def compose(self):
+        """Screen buffer (list baris) dari isi semua window sesuai layout"""
+        width, height = self.width, self.height
+        screen = [''] * height
+        positions = sorted((top, name) for name, top in self.layout(height) if 0 <= top < height)
+        self._next_line_cache = {}
+        for index, (top, name) in enumerate(positions):
+            text = self.windows.get(name)
+            if not text:
+                continue
+            bottom = positions[index + 1][0] if index + 1 < len(positions) else height
+            row = top
+            for line in text.split('\n'):
+                if row >= bottom:
+                    break
+                for wrapped in self._wrap_line(line, width)[:bottom - row]:
+                    screen[row] = wrapped
+                    row += 1
+        # Cache hanya menyimpan baris yang masih tampil
+        self._line_cache = self._next_line_cache
+        return screen
+
+    def render(self):
+        """Gambar satu frame, tulis hanya baris yang berubah. Return jumlah baris yang ditulis."""
+        self._dirty.clear()
+        screen = self.compose()
+        size = (self.width, self.height)
+        out = []
+        if self._front is None or self._size != size:
+            # Frame pertama / ukuran terminal berubah: satu kali clear layar
+            out.append(self.term.home + self.term.clear)
+            self._front = [''] * len(screen)
+            self._size = size
+
+        changed = 0
+        for row, line in enumerate(screen):
+            if line != self._front[row]:
+                out.append(self.term.move_yx(row, 0) + line + self.term.normal + self.term.clear_eol)
+                changed += 1
+        self._front = screen
+        self.stats['frames'] += 1
+        if out:
+            data = ''.join(out)
+            self.stream.write(data)
+            self.stream.flush()
+            self.stats['lines_written'] += changed
+            self.stats['bytes_written'] += len(data)
+        return changed
+
+    async def run(self):
+        """Loop gambar: tunggu ada perubahan, gambar, lalu tahan sampai interval frame berikutnya"""
+        interval = 1.0 / self.fps
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._dirty.wait()
+            started = loop.time()
+            self.render()
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+    async def _read_key(self, timeout=0.02):
+        """Satu tombol dari keyboard tanpa memblokir event loop (None kalau belum ada)"""
+        key = self.term.inkey(timeout=0)
+        if not key:
+            await asyncio.sleep(timeout)
+            return None
+        return key
+
+    async def read_key(self):
+        """Tunggu satu tombol sambil dashboard tetap digambar (terminal harus dalam mode cbreak)"""
+        while True:
+            key = await self._read_key()
+            if key is not None:
+                return key
+
+    async def read_line(self, prompt, window='input', prefix=''):
+        """Baca satu baris input sambil dashboard tetap digambar (pengganti input())"""
+        self.update(**{window: prefix + prompt})
+        if not self.term.is_a_tty:
+            # Bukan terminal interaktif (pipe/redirect): baca stdin di thread supaya loop tetap jalan
+            line = await asyncio.get_running_loop().run_in_executor(None, sys.stdin.readline)
+            return line.rstrip('\n')
+
+        buffer = ''
+        with self.term.cbreak():
+            while True:
+                key = await self._read_key()
+                if key is None:
+                    continue
+                if key.code == self.term.KEY_ENTER or key in ('\n', '\r'):
+                    return buffer
+                if key.code in (self.term.KEY_BACKSPACE, self.term.KEY_DELETE) or key in ('\x7f', '\b'):
+                    buffer = buffer[:-1]
+                elif not key.is_sequence and key.isprintable():
+                    buffer += key
+                self.update(**{window: prefix + prompt + buffer + self.term.reverse(' ')})
+
+    def start(self):
+        """Masuk layar penuh (cursor disembunyikan) dan mulai task render"""
+        self.stream.write(self.term.enter_fullscreen + self.term.hide_cursor)
+        self.invalidate()
+        self._task = asyncio.ensure_future(self.run())
+        return self
+
+    async def stop(self):
+        """Gambar frame terakhir, hentikan task render, dan kembalikan terminal"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._dirty.is_set():
+            self.render()
+        self.stream.write(self.term.normal_cursor + self.term.exit_fullscreen)
+        self.stream.flush()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
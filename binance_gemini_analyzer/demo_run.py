@@ -7,10 +7,9 @@ import sys
 sys.path.append('.')
 from binance_data import get_binance_data
 from indicators import calculate_indicators
-from trading_signals import signal_engine
+from model_registry import model_registry
 from gemini_analyzer import analyze_with_gemini
 from config import GEMINI_API_KEY
-import pandas as pd
 import numpy as np
 import time
 
@@ -68,8 +67,7 @@ async def demo_full_analysis():
     print(f'✅ Berhasil menghitung {len(data_with_indicators)} data dengan indikator')
     
     # Generate trading recommendation
-    df = pd.DataFrame(data_with_indicators)
-    trading_rec = signal_engine.generate_trading_recommendation(df, symbol, timeframe)
+    trading_rec = model_registry.generate_trading_recommendation(data_with_indicators, symbol, timeframe)
     
     print('\n🎯 HASIL ANALISIS TRADING LENGKAP:')
     print('=' * 60)
@@ -88,7 +86,7 @@ async def demo_full_analysis():
     print(f'📈 Volatility: {trading_rec["volatility"]:.2f}%')
     
     # Show detailed indicators
-    latest = data_with_indicators[-1]
+    latest = data_with_indicators.latest()
     print('\n📊 INDIKATOR TEKNIKAL DETAIL:')
     print('=' * 60)
     print(f'💵 Current Price: ${latest.get("close", 0):,.2f}')
@@ -138,8 +136,7 @@ async def demo_full_analysis():
         try:
             test_klines = generate_demo_data(symbol, 80, 45000)
             test_data = calculate_indicators(test_klines, tf)
-            test_df = pd.DataFrame(test_data)
-            test_rec = signal_engine.generate_trading_recommendation(test_df, symbol, tf)
+            test_rec = model_registry.generate_trading_recommendation(test_data, symbol, tf)
             print(f'{tf:>3}: {test_rec["action"]:>12} ({test_rec["confidence"]:>5.1f}%) - Score: {test_rec["technical_score"]:>2}')
         except Exception as e:
             print(f'{tf:>3}: Error - {str(e)[:30]}...')
@@ -1,134 +1,194 @@
+import asyncio
 import aiohttp
 import json
 from rich.console import Console
-from trading_signals import signal_engine
-import pandas as pd
+from analysis_context import AnalysisContext
+from gemini_cache import gemini_cache, market_fingerprint
+from http_client import get_session
+from indicators import as_frame
+from prompt_builder import PromptBudgetError, prompt_builder
 
 console = Console()
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent"
+GEMINI_STREAM_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:streamGenerateContent"
 
-async def analyze_with_gemini(data, api_key, symbol, timeframe):
-    """Analisis menggunakan Gemini AI dengan data yang diperkaya"""
-    console.log("[cyan]🤖 Memulai analisis AI dengan Gemini...[/cyan]")
 
-    # Convert data to DataFrame for signal analysis
-    df = pd.DataFrame(data)
+def build_payload(*texts):
+    """Body request generateContent, satu part per teks (beberapa part = request multi-symbol)"""
+    return {"contents": [{"parts": [{"text": text} for text in texts]}]}
 
-    # Generate advanced trading signals
-    trading_recommendation = signal_engine.generate_trading_recommendation(df, symbol, timeframe)
 
-    headers = {
-        "Content-Type": "application/json"
-    }
+def response_text(result):
+    """Ambil teks jawaban dari response generateContent"""
+    return result['candidates'][0]['content']['parts'][0]['text']
+
+
+def _prepare_analysis(data, symbol, timeframe, context, cache):
+    """Rekomendasi + fingerprint + payload, return (cache, fingerprint, jawaban cache atau None, payload)"""
+    # Generate advanced trading signals (hasil dari context dipakai ulang kalau sudah pernah dihitung)
+    if context is None:
+        context = AnalysisContext()
+    trading_recommendation = context.recommendation(data, symbol, timeframe)
 
     # Enhanced prompt with advanced analysis
-    latest_data = data[-1] if data else {}
-    previous_data = data[-2] if len(data) > 1 else {}
-
-    prompt = f"""
-    ANALISIS TRADING CRYPTOCURRENCY ADVANCED - {symbol} ({timeframe})
-
-    🔍 DATA TEKNIKAL TERKINI:
-    Current Price: ${latest_data.get('close', 'N/A')}
-    RSI: {latest_data.get('RSI', 'N/A')}
-    MACD: {latest_data.get('MACD', 'N/A')}
-    Signal Score: {latest_data.get('Signal_Score', 'N/A')}
-    Recommendation: {latest_data.get('Recommendation', 'N/A')}
-
-    🤖 MACHINE LEARNING ANALYSIS:
-    ML Signal: {trading_recommendation.get('ml_signal', 'N/A')}
-    ML Confidence: {trading_recommendation.get('ml_confidence', 'N/A')}%
-    Technical Score: {trading_recommendation.get('technical_score', 'N/A')}
-
-    📊 ADVANCED INDICATORS:
-    ADX: {latest_data.get('ADX', 'N/A')}
-    Williams %R: {latest_data.get('Williams_R', 'N/A')}
-    CCI: {latest_data.get('CCI', 'N/A')}
-    Trend Strength: {latest_data.get('Trend_Strength', 'N/A')}
-
-    🎯 TRADING RECOMMENDATION SYSTEM:
-    Action: {trading_recommendation.get('action', 'N/A')}
-    Confidence: {trading_recommendation.get('confidence', 'N/A')}%
-    Entry Price: ${trading_recommendation.get('entry_price', 'N/A')}
-    Stop Loss: ${trading_recommendation.get('stop_loss', 'N/A')}
-    Take Profit 1: ${trading_recommendation.get('take_profit_1', 'N/A')}
-    Take Profit 2: ${trading_recommendation.get('take_profit_2', 'N/A')}
-    Risk/Reward: {trading_recommendation.get('risk_reward_ratio', 'N/A')}
-
-    📈 SUPPORT/RESISTANCE:
-    Support: ${trading_recommendation.get('support', 'N/A')}
-    Resistance: ${trading_recommendation.get('resistance', 'N/A')}
-
-    ⚡ VOLATILITY & RISK:
-    Volatility: {trading_recommendation.get('volatility', 'N/A')}%
-    ATR%: {trading_recommendation.get('atr_percent', 'N/A')}%
-
-    🔥 CANDLESTICK PATTERNS:
-    Doji: {latest_data.get('Doji', False)}
-    Hammer: {latest_data.get('Hammer', False)}
-    Shooting Star: {latest_data.get('Shooting_Star', False)}
-    Bullish Engulfing: {latest_data.get('Bullish_Engulfing', False)}
-    Bearish Engulfing: {latest_data.get('Bearish_Engulfing', False)}
-
-    Berdasarkan analisis teknikal advanced dan machine learning di atas, berikan analisis mendalam dengan format:
-
-    🎯 EXECUTIVE SUMMARY:
-    [Ringkasan singkat kondisi pasar dan rekomendasi utama]
-
-    📊 ANALISIS TEKNIKAL MENDALAM:
-    1. Trend Analysis: [Analisis trend multi-timeframe]
-    2. Momentum Indicators: [RSI, MACD, Stochastic analysis]
-    3. Volatility Analysis: [Bollinger Bands, ATR analysis]
-    4. Volume Analysis: [Volume patterns dan VWAP]
-    5. Advanced Indicators: [ADX, CCI, Williams %R]
-
-    🤖 MACHINE LEARNING INSIGHTS:
-    [Interpretasi hasil ML dan confidence level]
-
-    🎯 TRADING STRATEGY:
-    - Entry Strategy: [Kapan dan bagaimana masuk]
-    - Exit Strategy: [Target profit dan stop loss]
-    - Position Sizing: [Berapa % portfolio untuk trade ini]
-    - Risk Management: [Strategi manajemen risiko]
-
-    ⚠️ RISK ASSESSMENT:
-    - Risk Level: [Low/Medium/High]
-    - Key Risks: [Faktor risiko utama]
-    - Market Conditions: [Kondisi pasar saat ini]
-
-    🔮 MARKET OUTLOOK:
-    [Prediksi pergerakan harga jangka pendek dan menengah]
-
-    💡 TRADING TIPS:
-    [Tips praktis untuk eksekusi trading]
-
-    Berikan analisis yang objektif, data-driven, dan actionable!
+    df = as_frame(data)
+    latest_data = df.iloc[-1].to_dict() if len(df) else {}
+
+    if cache is None:
+        cache = gemini_cache
+    fingerprint = market_fingerprint(symbol, timeframe, latest_data, trading_recommendation) if cache else None
+    cached = cache.get(fingerprint) if cache else None
+    if cached is not None:
+        console.log("[green]⚡ Kondisi pasar belum berubah, pakai analisis Gemini dari cache[/green]")
+        return cache, fingerprint, cached, None
+
+    prompt = prompt_builder.build(symbol, timeframe, latest_data, trading_recommendation, history=df)
+    return cache, fingerprint, None, build_payload(prompt)
+
+
+async def analyze_with_gemini(data, api_key, symbol, timeframe, session=None, context=None, cache=None):
+    """Analisis menggunakan Gemini AI dengan data yang diperkaya
+
+    Kirim `context` yang sama dengan caller supaya rekomendasi tidak dihitung ulang.
+    Jawaban di-cache per fingerprint kondisi pasar (default gemini_cache global,
+    cache=False untuk selalu memanggil API).
     """
-    
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt
-                    }
-                ]
-            }
-        ]
+    console.log("[cyan]🤖 Memulai analisis AI dengan Gemini...[/cyan]")
+
+    try:
+        cache, fingerprint, cached, payload = _prepare_analysis(data, symbol, timeframe, context, cache)
+    except PromptBudgetError as e:
+        error_msg = f"Error: {e}"
+        console.log(f"[bold red]{error_msg}[/bold red]")
+        return error_msg
+    if cached is not None:
+        return cached
+
+    headers = {
+        "Content-Type": "application/json"
     }
-    
+
     url = f"{GEMINI_API_URL}?key={api_key}"
     
     console.log(f"[bold blue]Ngirim request ke Gemini API:[/bold blue] {GEMINI_API_URL}")
     
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, headers=headers, json=payload) as response:
-            if response.status == 200:
-                result = await response.json()
-                console.log("[green]Berhasil dapet analisis dari Gemini[/green]")
-                analysis_text = result['candidates'][0]['content']['parts'][0]['text']
-                return analysis_text
-            else:
-                error_msg = f"Error: {response.status} - {await response.text()}"
+    if session is None:
+        session = await get_session()
+
+    async with session.post(url, headers=headers, json=payload) as response:
+        if response.status == 200:
+            try:
+                analysis_text = response_text(await response.json())
+            except (KeyError, IndexError, TypeError, aiohttp.ContentTypeError) as e:
+                # Jawaban diblokir (cuma finishReason SAFETY) atau body rusak: jangan di-cache
+                error_msg = f"Error: jawaban Gemini tidak valid - {e!r}"
                 console.log(f"[bold red]{error_msg}[/bold red]")
                 return error_msg
+            console.log("[green]Berhasil dapet analisis dari Gemini[/green]")
+            if cache:
+                cache.put(fingerprint, analysis_text, symbol=symbol, timeframe=timeframe)
+            return analysis_text
+        else:
+            error_msg = f"Error: {response.status} - {await response.text()}"
+            console.log(f"[bold red]{error_msg}[/bold red]")
+            return error_msg
+
+
+def chunk_text(event):
+    """Teks dari satu event streamGenerateContent (event terakhir bisa tanpa teks, cuma finishReason)"""
+    candidates = event.get('candidates') or [{}]
+    parts = candidates[0].get('content', {}).get('parts', [])
+    return ''.join(part.get('text', '') for part in parts)
+
+
+def finish_reason(event):
+    """finishReason event streamGenerateContent (None selama jawaban masih berjalan)"""
+    candidates = event.get('candidates') or [{}]
+    return candidates[0].get('finishReason')
+
+
+async def iter_sse_events(response):
+    """Parse body text/event-stream baris per baris, yield payload JSON setiap event 'data:'"""
+    data_lines = []
+    async for raw_line in response.content:
+        line = raw_line.decode('utf-8').rstrip('\r\n')
+        if line.startswith('data:'):
+            data_lines.append(line[5:].lstrip())
+        elif not line and data_lines:
+            # Baris kosong menutup satu event (data boleh terpecah beberapa baris)
+            yield json.loads('\n'.join(data_lines))
+            data_lines = []
+    if data_lines:
+        yield json.loads('\n'.join(data_lines))
+
+
+async def stream_gemini(session, url, payload):
+    """POST streamGenerateContent?alt=sse, async generator (potongan teks, finishReason) sesuai urutan datang.
+
+    Event tanpa teks dan tanpa finishReason dilewati. Status selain 200 dilempar
+    sebagai aiohttp.ClientResponseError.
+    """
+    async with session.post(url, json=payload) as response:
+        if response.status != 200:
+            message = await response.text()
+            raise aiohttp.ClientResponseError(response.request_info, response.history,
+                                              status=response.status, message=message)
+        async for event in iter_sse_events(response):
+            text, reason = chunk_text(event), finish_reason(event)
+            if text or reason:
+                yield text, reason
+
+
+async def stream_analysis_with_gemini(data, api_key, symbol, timeframe, session=None, context=None, cache=None):
+    """Versi streaming analyze_with_gemini: async generator potongan teks analisis.
+
+    Jawaban dari cache keluar sebagai satu potongan. Hanya jawaban stream yang selesai
+    dengan finishReason STOP disimpan ke cache; kalau gagal, potongan terakhir berisi
+    pesan "Error: ...".
+    """
+    console.log("[cyan]🤖 Memulai analisis AI dengan Gemini (streaming)...[/cyan]")
+
+    try:
+        cache, fingerprint, cached, payload = _prepare_analysis(data, symbol, timeframe, context, cache)
+    except PromptBudgetError as e:
+        error_msg = f"Error: {e}"
+        console.log(f"[bold red]{error_msg}[/bold red]")
+        yield error_msg
+        return
+    if cached is not None:
+        yield cached
+        return
+
+    if session is None:
+        session = await get_session()
+
+    console.log(f"[bold blue]Ngirim request streaming ke Gemini API:[/bold blue] {GEMINI_STREAM_URL}")
+    chunks = []
+    reason = None
+    try:
+        async for text, event_reason in stream_gemini(session, f"{GEMINI_STREAM_URL}?alt=sse&key={api_key}", payload):
+            reason = event_reason or reason
+            if text:
+                chunks.append(text)
+                yield text
+    except aiohttp.ClientResponseError as e:
+        error_msg = f"Error: {e.status} - {e.message}"
+        console.log(f"[bold red]{error_msg}[/bold red]")
+        yield ("\n\n" if chunks else "") + error_msg
+        return
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        error_msg = f"Error: stream Gemini terputus - {e}"
+        console.log(f"[bold red]{error_msg}[/bold red]")
+        yield ("\n\n" if chunks else "") + error_msg
+        return
+
+    if reason != 'STOP':
+        # SAFETY / MAX_TOKENS / RECITATION: jawaban terpotong atau diblokir, jangan di-cache
+        error_msg = f"Error: jawaban Gemini tidak lengkap (finishReason {reason})"
+        console.log(f"[bold yellow]⚠️ {error_msg}[/bold yellow]")
+        yield ("\n\n" if chunks else "") + error_msg
+        return
+
+    console.log("[green]Berhasil dapet analisis dari Gemini[/green]")
+    if cache and chunks:
+        cache.put(fingerprint, ''.join(chunks), symbol=symbol, timeframe=timeframe)
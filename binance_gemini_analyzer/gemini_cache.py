@@ -0,0 +1,194 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from rich.console import Console
+from config import GEMINI_CACHE_DIR, GEMINI_CACHE_TTL
+
+console = Console()
+
+# Pembulatan nilai input prompt sebelum di-hash: ('sig', n) = n angka penting, ('step', x) = kelipatan x.
+# Perubahan di bawah resolusi ini dianggap "tidak berarti" dan memakai jawaban Gemini yang sama.
+LATEST_QUANTIZATION = {
+    'close': ('sig', 5),
+    'RSI': ('step', 1.0),
+    'MACD': ('sig', 2),
+    'Signal_Score': ('step', 1),
+    'ADX': ('step', 1.0),
+    'Williams_R': ('step', 1.0),
+    'CCI': ('step', 5.0),
+    'Trend_Strength': ('sig', 2),
+}
+RECOMMENDATION_QUANTIZATION = {
+    'ml_signal': ('step', 1),
+    'ml_confidence': ('step', 5.0),
+    'technical_score': ('step', 1),
+    'confidence': ('step', 5.0),
+    'entry_price': ('sig', 5),
+    'stop_loss': ('sig', 4),
+    'take_profit_1': ('sig', 4),
+    'take_profit_2': ('sig', 4),
+    'risk_reward_ratio': ('step', 0.1),
+    'support': ('sig', 4),
+    'resistance': ('sig', 4),
+    'volatility': ('step', 0.5),
+    'atr_percent': ('step', 0.1),
+}
+# Nilai non-numerik yang ikut di-fingerprint apa adanya
+LATEST_LABELS = ('Recommendation', 'Doji', 'Hammer', 'Shooting_Star', 'Bullish_Engulfing', 'Bearish_Engulfing')
+RECOMMENDATION_LABELS = ('action',)
+
+
+def quantize(value, rule):
+    """Bulatkan angka sesuai aturan ('sig', n) atau ('step', x), nilai non-angka dikembalikan apa adanya"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return value
+    if not math.isfinite(value):
+        return None
+    kind, amount = rule
+    if kind == 'step':
+        return round(round(value / amount) * amount, 10)
+    if value == 0:
+        return 0.0
+    return float(f'{value:.{amount}g}')
+
+
+def market_fingerprint(symbol, timeframe, latest, recommendation):
+    """Hash kondisi pasar yang masuk ke prompt Gemini (bar, indikator dibulatkan, rekomendasi)"""
+    state = {
+        'symbol': symbol.upper(),
+        'timeframe': timeframe,
+        'timestamp': int(latest.get('timestamp', 0) or 0),
+        'latest': {key: quantize(latest.get(key), rule) for key, rule in LATEST_QUANTIZATION.items()},
+        'recommendation': {key: quantize(recommendation.get(key), rule)
+                           for key, rule in RECOMMENDATION_QUANTIZATION.items()},
+        'labels': [str(latest.get(key)) for key in LATEST_LABELS] +
+                  [str(recommendation.get(key)) for key in RECOMMENDATION_LABELS],
+    }
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+class GeminiResponseCache:
+    """Cache jawaban Gemini per fingerprint kondisi pasar, dua tier (memori + disk).
+
+    Entry kedaluwarsa setelah `ttl` detik. Tier memori dibatasi `max_entries`
+    (LRU), tier disk dibatasi `max_disk_entries` (file paling lama tidak dipakai
+    dihapus). Hit dari disk dinaikkan ke memori. `stats` berisi memory_hits,
+    disk_hits, misses, stores, expired dan evictions.
+    """
+
+    def __init__(self, cache_dir=GEMINI_CACHE_DIR, ttl=GEMINI_CACHE_TTL, max_entries=128, max_disk_entries=1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.stats = Counter()
+        self._memory = OrderedDict()  # key -> (expires_at, text)
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self):
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _remember(self, key, expires_at, text):
+        with self._lock:
+            self._memory[key] = (expires_at, text)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def _read_disk(self, key, now):
+        path = self.path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            console.log(f"[yellow]⚠️ Cache Gemini {path} rusak ({e}), diabaikan[/yellow]")
+            return None
+        if entry.get('expires_at', 0) <= now:
+            self.stats['expired'] += 1
+            self._remove(path)
+            return None
+        # mtime = waktu terakhir dipakai, dasar LRU tier disk
+        os.utime(path)
+        return entry
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key):
+        """Jawaban yang masih berlaku untuk fingerprint ini, atau None"""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return cached[1]
+                del self._memory[key]
+                self.stats['expired'] += 1
+
+        entry = self._read_disk(key, now)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['disk_hits'] += 1
+        self._remember(key, entry['expires_at'], entry['text'])
+        return entry['text']
+
+    def put(self, key, text, **meta):
+        """Simpan jawaban ke memori dan disk (meta, misal symbol/timeframe, ikut ditulis ke file)"""
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, text)
+        self.stats['stores'] += 1
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(key)
+        # Tulis ke file sementara lalu rename supaya proses lain tidak membaca file setengah jadi
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'expires_at': expires_at, 'text': text, **meta}, f)
+        os.replace(temp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        except OSError:
+            return
+        if len(names) <= self.max_disk_entries:
+            return
+        paths = sorted((os.path.join(self.cache_dir, name) for name in names), key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            self._remove(path)
+            self.stats['evictions'] += 1
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._memory.clear()
+        if disk and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    self._remove(os.path.join(self.cache_dir, name))
+
+
+# Global instance
+gemini_cache = GeminiResponseCache()
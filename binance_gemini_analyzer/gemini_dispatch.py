@@ -0,0 +1,267 @@
+"""
+Dispatch analisis Gemini untuk banyak symbol sekaligus.
+
+Request berjalan paralel dengan batas concurrency, beberapa symbol bisa digabung
+jadi satu request multi-part, setiap request punya deadline, dan symbol yang
+gagal / timeout memakai ringkasan dari rekomendasi lokal.
+"""
+import asyncio
+import random
+import time
+from collections import Counter
+import aiohttp
+import numpy as np
+from rich.console import Console
+import gemini_analyzer
+from analysis_context import AnalysisContext
+from config import GEMINI_CONCURRENCY, GEMINI_TIMEOUT
+from gemini_analyzer import build_payload, response_text
+from gemini_cache import gemini_cache, market_fingerprint
+from http_client import get_session
+from indicators import as_frame
+from prompt_builder import PromptBudgetError, prompt_builder
+
+console = Console()
+
+SECTION_PREFIX = '### '
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+BATCH_INSTRUCTIONS = f"""
+ANALISIS TRADING CRYPTOCURRENCY MULTI-SYMBOL
+
+Setiap part berikut berisi ringkasan teknikal + rekomendasi sistem untuk satu symbol.
+Untuk SETIAP symbol, tulis analisis singkat (trend, momentum, level entry/SL/TP, risiko utama)
+diawali baris header yang sama persis dengan header part-nya ({SECTION_PREFIX}SYMBOL TIMEFRAME).
+"""
+
+
+class GeminiJob:
+    """Satu permintaan analisis: symbol, timeframe, rekomendasi lokal, dan (opsional) candle terakhir + riwayat"""
+
+    __slots__ = ('symbol', 'timeframe', 'recommendation', 'latest', 'history')
+
+    def __init__(self, symbol, timeframe, recommendation, latest=None, history=None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.recommendation = recommendation
+        self.latest = latest
+        self.history = history
+
+    @classmethod
+    def from_analysis(cls, data, symbol, timeframe, context=None):
+        """Job dari hasil calculate_indicators (rekomendasi lewat AnalysisContext)"""
+        context = context or AnalysisContext()
+        df = as_frame(data)
+        latest = df.iloc[-1].to_dict() if len(df) else {}
+        return cls(symbol, timeframe, context.recommendation(data, symbol, timeframe), latest, df)
+
+    @property
+    def header(self):
+        return f'{SECTION_PREFIX}{self.symbol} {self.timeframe}'
+
+    @property
+    def fingerprint(self):
+        return market_fingerprint(self.symbol, self.timeframe, self.latest or {}, self.recommendation)
+
+    def summary(self):
+        """Ringkasan satu symbol untuk request multi-symbol"""
+        return prompt_builder.market_block(self.symbol, self.timeframe, self.latest, self.recommendation,
+                                           title=self.header)
+
+    def prompt_parts(self):
+        if self.latest:
+            return [prompt_builder.build(self.symbol, self.timeframe, self.latest, self.recommendation,
+                                         history=self.history)]
+        return [BATCH_INSTRUCTIONS, self.summary()]
+
+
+class DispatchResult:
+    """Hasil analisis satu job. source: 'gemini', 'cache', atau 'fallback' (rekomendasi lokal)"""
+
+    __slots__ = ('symbol', 'timeframe', 'text', 'source', 'latency_ms', 'error')
+
+    def __init__(self, symbol, timeframe, text, source, latency_ms=0.0, error=None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.text = text
+        self.source = source
+        self.latency_ms = latency_ms
+        self.error = error
+
+    def __repr__(self):
+        return f'DispatchResult({self.symbol} {self.timeframe} {self.source} {self.latency_ms:.1f}ms)'
+
+
+def local_analysis(job, reason):
+    """Teks pengganti dari rekomendasi lokal kalau Gemini tidak menjawab"""
+    rec = job.recommendation
+    return (f"⚠️ Analisis AI tidak tersedia ({reason}), memakai rekomendasi lokal.\n"
+            f"{job.symbol} {job.timeframe}: {rec.get('action', 'N/A')} (confidence {rec.get('confidence', 'N/A')}%)\n"
+            f"Entry {rec.get('entry_price', 'N/A')} | SL {rec.get('stop_loss', 'N/A')} | "
+            f"TP1 {rec.get('take_profit_1', 'N/A')} | TP2 {rec.get('take_profit_2', 'N/A')} | "
+            f"R:R {rec.get('risk_reward_ratio', 'N/A')}")
+
+
+def split_sections(text, jobs):
+    """Pecah jawaban multi-symbol per header, return {header: teks}"""
+    headers = {job.header for job in jobs}
+    sections = {}
+    current = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped in headers:
+            current = stripped
+            sections[current] = []
+        elif current is not None:
+            sections[current].append(line)
+    return {header: '\n'.join(lines).strip() for header, lines in sections.items()}
+
+
+def latency_percentiles(latencies, percentiles=(50, 90, 99)):
+    """Persentil latency (ms), kosong kalau belum ada data"""
+    if not latencies:
+        return {}
+    values = np.percentile(np.asarray(latencies, dtype=float), percentiles)
+    return {f'p{p}': float(value) for p, value in zip(percentiles, values)}
+
+
+class GeminiDispatcher:
+    """Fan-out analisis Gemini untuk banyak symbol.
+
+    Maksimal `concurrency` request berjalan bersamaan. Dengan `batch_size` > 1,
+    job tanpa data candle lengkap digabung jadi satu request multi-part dan
+    jawabannya dipecah per header symbol. Setiap request (termasuk retry 429/5xx)
+    dibatasi `timeout` detik; kalau lewat, gagal, atau section symbol tidak ada,
+    hasilnya jatuh ke local_analysis. Jawaban sukses disimpan ke cache.
+    """
+
+    def __init__(self, api_key, concurrency=GEMINI_CONCURRENCY, batch_size=1, timeout=GEMINI_TIMEOUT,
+                 max_retries=1, base_backoff=0.5, session=None, cache=None, api_url=None):
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.session = session
+        self.cache = gemini_cache if cache is None else cache
+        self.api_url = api_url
+        self.latencies = []  # ms per request HTTP (satu batch = satu latency)
+        self.stats = Counter()
+
+    def percentiles(self):
+        return latency_percentiles(self.latencies)
+
+    def _batches(self, jobs):
+        """Job dengan riwayat candle dikirim sendiri (prompt lengkap), sisanya digabung per batch_size"""
+        singles = [[job] for job in jobs if job.history is not None]
+        compact = [job for job in jobs if job.history is None]
+        size = self.batch_size
+        return singles + [compact[i:i + size] for i in range(0, len(compact), size)]
+
+    def _payload(self, batch):
+        if len(batch) == 1:
+            return build_payload(*batch[0].prompt_parts())
+        return build_payload(BATCH_INSTRUCTIONS, *(job.summary() for job in batch))
+
+    async def _post(self, session, payload):
+        """POST generateContent dengan retry untuk 429/5xx, return (status, teks jawaban / error)"""
+        # URL dibaca saat dipanggil supaya GEMINI_API_URL bisa diarahkan ke server lain (test/mock)
+        url = f"{self.api_url or gemini_analyzer.GEMINI_API_URL}?key={self.api_key}"
+        status, text = None, ''
+        for attempt in range(self.max_retries + 1):
+            async with session.post(url, json=payload) as response:
+                status = response.status
+                if status == 200:
+                    return status, response_text(await response.json())
+                text = await response.text()
+            if status not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            self.stats['retries'] += 1
+            delay = self.base_backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+            await asyncio.sleep(delay)
+        return status, text
+
+    async def _run_batch(self, session, semaphore, batch):
+        try:
+            payload = self._payload(batch)
+        except PromptBudgetError as e:
+            # Prompt terlalu besar tidak akan berubah kalau dikirim ulang: langsung pakai rekomendasi lokal
+            self.stats['over_budget'] += 1
+            console.log(f"[yellow]⚠️ {e}, pakai rekomendasi lokal[/yellow]")
+            return [self._fallback(job, 'prompt melebihi budget token', 0.0) for job in batch]
+
+        async with semaphore:
+            started = time.perf_counter()
+            error = None
+            try:
+                status, text = await asyncio.wait_for(self._post(session, payload), self.timeout)
+                if status != 200:
+                    error = f'HTTP {status}'
+            except asyncio.TimeoutError:
+                error = f'timeout {self.timeout:g}s'
+            except (KeyError, IndexError, TypeError, ValueError, aiohttp.ContentTypeError):
+                # 200 tanpa teks: diblokir safety filter, candidates kosong, atau body bukan JSON
+                error = 'jawaban Gemini tidak valid'
+            except aiohttp.ClientError as e:
+                error = f'koneksi gagal: {e}'
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.latencies.append(latency_ms)
+            self.stats['requests'] += 1
+
+        if error is not None:
+            self.stats['failed_requests'] += 1
+            console.log(f"[yellow]⚠️ Gemini {', '.join(job.symbol for job in batch)}: {error}, "
+                        f"pakai rekomendasi lokal[/yellow]")
+            return [self._fallback(job, error, latency_ms) for job in batch]
+
+        sections = split_sections(text, batch)
+        if len(batch) == 1 and not sections.get(batch[0].header):
+            sections = {batch[0].header: text.strip()}
+        results = []
+        for job in batch:
+            section = sections.get(job.header)
+            if not section:
+                results.append(self._fallback(job, 'section tidak ada di jawaban', latency_ms))
+                continue
+            if self.cache:
+                self.cache.put(job.fingerprint, section, symbol=job.symbol, timeframe=job.timeframe)
+            self.stats['gemini'] += 1
+            results.append(DispatchResult(job.symbol, job.timeframe, section, 'gemini', latency_ms))
+        return results
+
+    def _fallback(self, job, error, latency_ms):
+        self.stats['fallback'] += 1
+        return DispatchResult(job.symbol, job.timeframe, local_analysis(job, error), 'fallback', latency_ms, error)
+
+    async def dispatch(self, jobs):
+        """Async generator DispatchResult sesuai urutan selesai (hit cache langsung keluar duluan)"""
+        pending = []
+        for job in jobs:
+            cached = self.cache.get(job.fingerprint) if self.cache else None
+            if cached is not None:
+                self.stats['cache'] += 1
+                yield DispatchResult(job.symbol, job.timeframe, cached, 'cache')
+            else:
+                pending.append(job)
+        if not pending:
+            return
+
+        session = self.session or await get_session()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.ensure_future(self._run_batch(session, semaphore, batch)) for batch in self._batches(pending)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                for result in await task:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(self, jobs):
+        """Jalankan semua job, return list DispatchResult sesuai urutan input"""
+        jobs = list(jobs)
+        by_key = {}
+        async for result in self.dispatch(jobs):
+            by_key[(result.symbol, result.timeframe)] = result
+        return [by_key[(job.symbol, job.timeframe)] for job in jobs]
@@ -0,0 +1,74 @@
+import asyncio
+import aiohttp
+from rich.console import Console
+
+console = Console()
+
+
+class HttpClient:
+    """ClientSession aiohttp yang dipakai bareng oleh Binance dan Gemini.
+
+    Connector di-pool supaya koneksi TCP/TLS dipakai ulang (keep-alive),
+    dengan limit koneksi per host dan cache DNS.
+    """
+
+    def __init__(self, limit=100, limit_per_host=30, keepalive_timeout=60,
+                 ttl_dns_cache=300, timeout=30):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = timeout
+        self._session = None
+        self._loop = None
+
+    def _create_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def get_session(self):
+        """Ambil session aktif, dibuat saat pertama kali dipakai"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # Session dari event loop lain (mis. asyncio.run sebelumnya) tidak bisa dipakai ulang
+            self._session = self._create_session()
+            self._loop = loop
+            console.log("[blue]🔌 HTTP session baru dibuat (connection pool aktif)[/blue]")
+        return self._session
+
+    async def close(self):
+        """Tutup session dan semua koneksi di pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            # Beri waktu transport SSL menutup koneksi dengan bersih
+            await asyncio.sleep(0)
+        self._session = None
+        self._loop = None
+
+    async def __aenter__(self):
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+# Global instance
+http_client = HttpClient()
+
+
+async def get_session():
+    return await http_client.get_session()
+
+
+async def close_http_client():
+    await http_client.close()
@@ -0,0 +1,419 @@
+import math
+from collections import deque
+from indicators import get_indicator_params, load_tuned_params
+
+NAN = float('nan')
+
+# Recommendation per Signal_Score (|skor| >= 3 jadi STRONG_BUY / STRONG_SELL)
+RECOMMENDATIONS = {2: 'BUY', 1: 'WEAK_BUY', 0: 'HOLD', -1: 'WEAK_SELL', -2: 'SELL'}
+
+# Hitung ulang running sum dari isi window setiap (window * RESYNC_FACTOR) update
+# supaya error floating point tidak menumpuk di stream yang panjang
+RESYNC_FACTOR = 64
+
+
+def _div(a, b):
+    """Pembagian dengan semantik IEEE seperti numpy/pandas (x/0 = inf, 0/0 = NaN)"""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _nanmax(a, b):
+    """max() yang meneruskan NaN seperti np.maximum"""
+    if a != a or b != b:
+        return NAN
+    return a if a >= b else b
+
+
+class _RollingMean:
+    """Rolling mean O(1) per update, NaN di window menghasilkan NaN (min_periods=window)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nan_count = 0
+        self.updates = 0
+
+    def push(self, value):
+        self.values.append(value)
+        if value != value:
+            self.nan_count += 1
+        else:
+            self.total += value
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if old != old:
+                self.nan_count -= 1
+            else:
+                self.total -= old
+
+        self.updates += 1
+        if self.updates % (self.window * RESYNC_FACTOR) == 0:
+            self.total = math.fsum(v for v in self.values if v == v)
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window and self.nan_count == 0
+
+    @property
+    def sum(self):
+        return self.total if self.ready else NAN
+
+    @property
+    def mean(self):
+        return self.total / self.window if self.ready else NAN
+
+
+class _RollingStd:
+    """Rolling standard deviation (ddof=1) dengan sliding Welford update"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, value):
+        self.values.append(value)
+        n = len(self.values)
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+
+        if n > self.window:
+            old = self.values.popleft()
+            n -= 1
+            delta = old - self.mean
+            self.mean -= delta / n
+            self.m2 -= delta * (old - self.mean)
+
+    @property
+    def std(self):
+        if len(self.values) < self.window or self.window < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+
+class _RollingExtremum:
+    """Rolling max/min O(1) amortized memakai monotonic deque"""
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self.candidates = deque()  # (index, value)
+        self.index = -1
+
+    def push(self, value):
+        self.index += 1
+        if self.is_max:
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        self.candidates.append((self.index, value))
+
+        if self.candidates[0][0] <= self.index - self.window:
+            self.candidates.popleft()
+
+    @property
+    def value(self):
+        if self.index + 1 < self.window:
+            return NAN
+        return self.candidates[0][1]
+
+
+class _Ema:
+    """EMA recurrence, sama dengan ewm(span, adjust=False)"""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+
+    def push(self, value):
+        if self.value != self.value:
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class _Lag:
+    """Nilai dari `lag` bar sebelumnya (setara shift(lag))"""
+
+    def __init__(self, lag):
+        self.lag = lag
+        self.values = deque(maxlen=lag + 1)
+
+    def push(self, value):
+        self.values.append(value)
+        return self.values[0] if len(self.values) == self.lag + 1 else NAN
+
+
+class IncrementalIndicatorState:
+    """State indikator yang diupdate O(1) per candle tertutup.
+
+    Di-seed sekali dari history, lalu `update(kline)` dipanggil untuk setiap
+    candle baru. Nilai dari `snapshot()` sama dengan baris terakhir hasil
+    `calculate_indicators` untuk data yang sama (SMA, EMA, MACD, RSI,
+    Bollinger Bands, Stochastic, ATR, Williams %R, CCI, ADX, VWAP, Ichimoku,
+    Signal_Score dan Recommendation).
+    CCI butuh O(cci_period) per update karena MAD tidak bisa dihitung dari running sum.
+    `symbol` dan `params` digabung persis seperti di calculate_indicators
+    (default timeframe <- hasil param_sweep symbol <- override).
+    """
+
+    def __init__(self, timeframe, history=None, symbol=None, params=None):
+        self.timeframe = timeframe
+        self.symbol = symbol
+        tuned = load_tuned_params(symbol, timeframe) if symbol else {}
+        self.params = params = {**get_indicator_params(timeframe), **tuned, **(params or {})}
+        self.last_timestamp = None
+        self.count = 0
+        self.values = {}
+
+        self._prev_close = NAN
+        self._prev_high = NAN
+        self._prev_low = NAN
+
+        self._sma = {params[key]: _RollingMean(params[key]) for key in ('sma_fast', 'sma_slow', 'sma_long')}
+        self._ema = {params[key]: _Ema(params[key]) for key in ('ema_fast', 'ema_slow', 'ema_long')}
+        self._macd_signal = _Ema(params['macd_signal'])
+
+        self._gain = _RollingMean(params['rsi_period'])
+        self._loss = _RollingMean(params['rsi_period'])
+
+        self._bb_mean = _RollingMean(params['bb_period'])
+        self._bb_std = _RollingStd(params['bb_period'])
+
+        self._stoch_low = _RollingExtremum(params['stoch_k'], 'min')
+        self._stoch_high = _RollingExtremum(params['stoch_k'], 'max')
+        self._stoch_d = _RollingMean(params['stoch_d'])
+
+        self._atr = _RollingMean(params['atr_period'])
+
+        self._williams_low = _RollingExtremum(params['williams_period'], 'min')
+        self._williams_high = _RollingExtremum(params['williams_period'], 'max')
+
+        self._tp_mean = _RollingMean(params['cci_period'])
+        self._tp_values = deque(maxlen=params['cci_period'])
+
+        self._plus_dm = _RollingMean(params['adx_period'])
+        self._minus_dm = _RollingMean(params['adx_period'])
+        self._adx_tr = _RollingMean(params['adx_period'])
+        self._dx = _RollingMean(params['adx_period'])
+
+        self._vwap_pv = _RollingMean(params['vwap_period'])
+        self._vwap_volume = _RollingMean(params['vwap_period'])
+
+        self._ichimoku = {}
+        for key in ('ichimoku_tenkan', 'ichimoku_kijun', 'ichimoku_senkou'):
+            window = params[key]
+            self._ichimoku[key] = (_RollingExtremum(window, 'max'), _RollingExtremum(window, 'min'))
+        self._senkou_a_lag = _Lag(params['ichimoku_kijun'])
+        self._senkou_b_lag = _Lag(params['ichimoku_kijun'])
+
+        if history is not None:
+            self.seed(history)
+
+    def seed(self, klines):
+        """Isi state dari history kline (sekali di awal)"""
+        for kline in klines:
+            self.update(kline)
+        return self
+
+    def update(self, kline):
+        """Update semua indikator dengan satu kline tertutup, return snapshot terbaru.
+
+        Kline yang timestamp-nya tidak lebih baru dari kline terakhir diabaikan (return None).
+        """
+        timestamp = int(kline[0])
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return None
+
+        open_price, high, low, close, volume = (float(kline[i]) for i in range(1, 6))
+        params = self.params
+        prev_close = self._prev_close
+        values = {
+            'timestamp': timestamp, 'open': open_price, 'high': high,
+            'low': low, 'close': close, 'volume': volume
+        }
+
+        # Moving averages
+        for window, rolling in self._sma.items():
+            rolling.push(close)
+            values[f'SMA_{window}'] = rolling.mean
+        for span, ema in self._ema.items():
+            values[f'EMA_{span}'] = ema.push(close)
+
+        # MACD
+        macd = values[f'EMA_{params["ema_fast"]}'] - values[f'EMA_{params["ema_slow"]}']
+        macd_signal = self._macd_signal.push(macd)
+        values['MACD'] = macd
+        values['MACD_Signal'] = macd_signal
+        values['MACD_Histogram'] = macd - macd_signal
+
+        # RSI (delta pertama NaN dihitung sebagai 0 seperti di calculate_indicators)
+        delta = close - prev_close
+        self._gain.push(delta if delta > 0 else 0.0)
+        self._loss.push(-delta if delta < 0 else 0.0)
+        rs = _div(self._gain.mean, self._loss.mean)
+        values['RSI'] = 100 - _div(100, 1 + rs)
+
+        # Bollinger Bands
+        self._bb_mean.push(close)
+        self._bb_std.push(close)
+        bb_middle = self._bb_mean.mean
+        bb_std = self._bb_std.std
+        values['BB_Middle'] = bb_middle
+        values['BB_Upper'] = bb_middle + bb_std * params['bb_std']
+        values['BB_Lower'] = bb_middle - bb_std * params['bb_std']
+        values['BB_Width'] = _div(values['BB_Upper'] - values['BB_Lower'], bb_middle) * 100
+
+        # Stochastic
+        self._stoch_low.push(low)
+        self._stoch_high.push(high)
+        lowest_low = self._stoch_low.value
+        highest_high = self._stoch_high.value
+        stoch_k = _div(close - lowest_low, highest_high - lowest_low) * 100
+        self._stoch_d.push(stoch_k)
+        values['Lowest_Low'] = lowest_low
+        values['Highest_High'] = highest_high
+        values['%K'] = stoch_k
+        values['%D'] = self._stoch_d.mean
+
+        # ATR
+        tr = _nanmax(high - low, _nanmax(abs(high - prev_close), abs(low - prev_close)))
+        self._atr.push(tr)
+        values['TR'] = tr
+        values['ATR'] = self._atr.mean
+        values['ATR_Percent'] = _div(values['ATR'], close) * 100
+
+        # Williams %R
+        self._williams_low.push(low)
+        self._williams_high.push(high)
+        williams_high = self._williams_high.value
+        values['Williams_R'] = _div(williams_high - close, williams_high - self._williams_low.value) * -100
+
+        # CCI
+        typical_price = (high + low + close) / 3
+        self._tp_mean.push(typical_price)
+        self._tp_values.append(typical_price)
+        sma_tp = self._tp_mean.mean
+        if sma_tp == sma_tp:
+            window_mean = sum(self._tp_values) / len(self._tp_values)
+            mad = sum(abs(v - window_mean) for v in self._tp_values) / len(self._tp_values)
+        else:
+            mad = NAN
+        values['CCI'] = _div(typical_price - sma_tp, 0.015 * mad)
+
+        # ADX (mengikuti definisi di indicators.average_directional_index)
+        high_diff = high - self._prev_high
+        low_diff = low - self._prev_low
+        self._plus_dm.push(high_diff if (high_diff > low_diff and high_diff > 0) else 0.0)
+        self._minus_dm.push(low_diff if (low_diff > high_diff and low_diff > 0) else 0.0)
+        self._adx_tr.push(tr)
+        tr_mean = self._adx_tr.mean
+        plus_di = 100 * _div(self._plus_dm.mean, tr_mean)
+        minus_di = 100 * _div(self._minus_dm.mean, tr_mean)
+        self._dx.push(100 * _div(abs(plus_di - minus_di), plus_di + minus_di))
+        values['ADX'] = self._dx.mean
+        values['Plus_DI'] = plus_di
+        values['Minus_DI'] = minus_di
+
+        # VWAP
+        self._vwap_pv.push(close * volume)
+        self._vwap_volume.push(volume)
+        values['VWAP'] = _div(self._vwap_pv.sum, self._vwap_volume.sum)
+
+        # Ichimoku
+        midpoints = {}
+        for key, (rolling_high, rolling_low) in self._ichimoku.items():
+            rolling_high.push(high)
+            rolling_low.push(low)
+            midpoints[key] = (rolling_high.value + rolling_low.value) / 2
+        values['Tenkan_sen'] = midpoints['ichimoku_tenkan']
+        values['Kijun_sen'] = midpoints['ichimoku_kijun']
+        values['Senkou_A'] = self._senkou_a_lag.push((values['Tenkan_sen'] + values['Kijun_sen']) / 2)
+        values['Senkou_B'] = self._senkou_b_lag.push(midpoints['ichimoku_senkou'])
+        # Chikou span butuh data masa depan, untuk bar terbaru selalu kosong
+        values['Chikou_span'] = NAN
+
+        self._update_signal_score(values, self.values, open_price, high, low, close)
+
+        self._prev_close = close
+        self._prev_high = high
+        self._prev_low = low
+        self.last_timestamp = timestamp
+        self.count += 1
+        self.values = values
+        return self.snapshot()
+
+    def _update_signal_score(self, values, previous, open_price, high, low, close):
+        """Pola candlestick + Signal_Score/Recommendation (aturan sama dengan node indicators.signal_score)"""
+        params = self.params
+        prev_open = previous.get('open', NAN)
+        prev_close = previous.get('close', NAN)
+
+        # Candlestick
+        body_size = abs(close - open_price)
+        lower_shadow = open_price - low if close > open_price else close - low
+        upper_shadow = high - close if close > open_price else high - open_price
+        hammer = lower_shadow > 2 * body_size and upper_shadow < body_size and body_size > 0
+        shooting_star = upper_shadow > 2 * body_size and lower_shadow < body_size and body_size > 0
+        bullish_engulfing = (prev_close < prev_open and close > open_price and
+                             open_price < prev_close and close > prev_open)
+        bearish_engulfing = (prev_close > prev_open and close < open_price and
+                             open_price > prev_close and close < prev_open)
+
+        def crossed(fast, slow, direction):
+            now = values[fast] - values[slow]
+            before = previous.get(fast, NAN) - previous.get(slow, NAN)
+            return now * direction > 0 and before * direction <= 0
+
+        ema_fast = f'EMA_{params["ema_fast"]}'
+        ema_slow = f'EMA_{params["ema_slow"]}'
+        strong_trend = values['ADX'] > 25
+        buy = sum([
+            values['RSI'] < params['rsi_oversold'],
+            2 * crossed('MACD', 'MACD_Signal', 1),
+            values['%K'] < params['stoch_oversold'] and values['%K'] > values['%D'],
+            2 * crossed(ema_fast, ema_slow, 1),
+            close < values['BB_Lower'],
+            values['Williams_R'] < -80,
+            strong_trend and values['Plus_DI'] > values['Minus_DI'],
+            hammer or bullish_engulfing,
+        ])
+        sell = sum([
+            values['RSI'] > params['rsi_overbought'],
+            2 * crossed('MACD', 'MACD_Signal', -1),
+            values['%K'] > params['stoch_overbought'] and values['%K'] < values['%D'],
+            2 * crossed(ema_fast, ema_slow, -1),
+            close > values['BB_Upper'],
+            values['Williams_R'] > -20,
+            strong_trend and values['Plus_DI'] < values['Minus_DI'],
+            shooting_star or bearish_engulfing,
+        ])
+
+        score = max(-10, min(10, buy - sell))
+        values['Hammer'] = hammer
+        values['Shooting_Star'] = shooting_star
+        values['Bullish_Engulfing'] = bullish_engulfing
+        values['Bearish_Engulfing'] = bearish_engulfing
+        values['Signal_Score'] = score
+        values['Buy_Signals'] = buy
+        values['Sell_Signals'] = sell
+        values['Signal_Strength'] = abs(score) / 10 * 100
+        values['Recommendation'] = RECOMMENDATIONS.get(score, 'STRONG_BUY' if score > 0 else 'STRONG_SELL')
+
+    def snapshot(self, fill_value=0):
+        """Nilai indikator terbaru, NaN diganti fill_value (sama seperti fillna(0))"""
+        return {
+            key: (fill_value if isinstance(value, float) and value != value else value)
+            for key, value in self.values.items()
+        }
@@ -0,0 +1,132 @@
+from collections import Counter
+from window_kernels import RollingExtrema
+
+
+class IndicatorNode:
+    """Satu langkah perhitungan indikator beserta kolom input dan output-nya.
+
+    `inputs` / `outputs` boleh berupa list nama kolom atau fungsi params -> list,
+    untuk kolom yang namanya tergantung parameter (misal EMA_{ema_fast}).
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), log=None):
+        self.name = name
+        self.func = func
+        self._inputs = inputs
+        self._outputs = outputs
+        self.log = log
+
+    @staticmethod
+    def _resolve(columns, params):
+        return list(columns(params) if callable(columns) else columns)
+
+    def inputs(self, params):
+        return self._resolve(self._inputs, params)
+
+    def outputs(self, params):
+        return self._resolve(self._outputs, params)
+
+    def __repr__(self):
+        return f'IndicatorNode({self.name!r})'
+
+
+class Workspace:
+    """Subexpression bersama selama satu kali eksekusi graph.
+
+    Rolling window yang sama (misal high max 14 untuk Stochastic dan Williams %R)
+    cukup dihitung sekali, dan semua rolling max/min satu kolom (Stochastic,
+    Williams %R, Ichimoku, support/resistance) dijawab dari satu RollingExtrema.
+    `stats` mencatat berapa kali tiap window dihitung.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.stats = Counter()
+        self._cache = {}
+
+    def shared(self, key, compute):
+        if key not in self._cache:
+            self.stats[key] += 1
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def extrema(self, column, how):
+        """Sparse table max/min satu kolom, dipakai bersama oleh semua window"""
+        return self.shared(('extrema', column, how), lambda: RollingExtrema(self.df[column], how))
+
+    def rolling(self, column, window, how, center=False):
+        """Rolling `how` (mean/std/max/min/sum) dari kolom df, di-memoize per (kolom, window)"""
+        if how in ('max', 'min'):
+            compute = lambda: self.extrema(column, how).window(window, center)
+        else:
+            compute = lambda: getattr(self.df[column].rolling(window=window, center=center), how)()
+        return self.shared(('rolling', column, window, how, center), compute)
+
+
+class IndicatorGraph:
+    """Registry indikator deklaratif + planner.
+
+    Node didaftarkan berurutan (urutan pendaftaran = urutan kolom di hasil dan
+    harus sudah topologis). Planner hanya menjalankan subgraph yang dibutuhkan
+    untuk kolom yang diminta.
+    """
+
+    def __init__(self):
+        self.nodes = []
+
+    def node(self, name, inputs=(), outputs=(), log=None):
+        """Decorator untuk mendaftarkan fungsi func(df, params, workspace) -> {kolom: nilai}"""
+        def register(func):
+            if any(existing.name == name for existing in self.nodes):
+                raise ValueError(f"Node {name} sudah terdaftar")
+            self.nodes.append(IndicatorNode(name, func, inputs, outputs, log))
+            return func
+        return register
+
+    def producers(self, params):
+        """Peta kolom -> node yang menghasilkan kolom tersebut"""
+        producers = {}
+        for node in self.nodes:
+            for column in node.outputs(params):
+                producers.setdefault(column, node)
+        return producers
+
+    def plan(self, columns, params, available=()):
+        """Node yang perlu dijalankan (urutan eksekusi) untuk menghasilkan `columns`"""
+        producers = self.producers(params)
+        available = set(available)
+        needed = set()
+        pending = list(columns)
+        while pending:
+            column = pending.pop()
+            if column in available:
+                continue
+            node = producers.get(column)
+            if node is None:
+                raise KeyError(f"Kolom {column} tidak dihasilkan indikator mana pun")
+            if node.name not in needed:
+                needed.add(node.name)
+                pending.extend(node.inputs(params))
+
+        plan = [node for node in self.nodes if node.name in needed]
+        # Validasi urutan: semua input harus sudah tersedia saat node dijalankan
+        ready = set(available)
+        for node in plan:
+            missing = [column for column in node.inputs(params) if column not in ready]
+            if missing:
+                raise ValueError(f"Node {node.name} butuh {missing} dari node yang didaftarkan setelahnya")
+            ready.update(node.outputs(params))
+        return plan
+
+    def compute(self, df, params, columns=None, log=None):
+        """Jalankan node yang dibutuhkan untuk `columns` (None = semua) dan tulis hasilnya ke df"""
+        plan = self.nodes if columns is None else self.plan(columns, params, df.columns)
+        workspace = Workspace(df)
+        logged = set()
+        for node in plan:
+            if log and node.log and node.log not in logged:
+                logged.add(node.log)
+                log(node.log)
+            for column, values in node.func(df, params, workspace).items():
+                df[column] = values
+        return df
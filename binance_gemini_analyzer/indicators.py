@@ -1,9 +1,15 @@
+import json
+import os
 import numpy as np
 import pandas as pd
 from rich.console import Console
-from scipy import stats
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.linear_model import LinearRegression
+from numpy.lib.stride_tricks import sliding_window_view
+from window_kernels import rolling_linear_regression, rolling_mad
+from indicator_graph import IndicatorGraph
+from binance_data import DEFAULT_KLINE_COLUMNS, klines_to_array
+from config import PARAMS_DIR
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -20,7 +26,8 @@ def get_indicator_params(timeframe):
             'stoch_k': 5, 'stoch_d': 3, 'stoch_overbought': 80, 'stoch_oversold': 20,
             'atr_period': 7, 'adx_period': 7, 'cci_period': 10,
             'williams_period': 7, 'vwap_period': 20,
-            'ichimoku_tenkan': 4, 'ichimoku_kijun': 13, 'ichimoku_senkou': 26
+            'ichimoku_tenkan': 4, 'ichimoku_kijun': 13, 'ichimoku_senkou': 26,
+            'trend_window': 30
         }
     elif timeframe in ['15m', '30m', '1h']:
         return {
@@ -32,7 +39,8 @@ def get_indicator_params(timeframe):
             'stoch_k': 14, 'stoch_d': 3, 'stoch_overbought': 80, 'stoch_oversold': 20,
             'atr_period': 14, 'adx_period': 14, 'cci_period': 20,
             'williams_period': 14, 'vwap_period': 50,
-            'ichimoku_tenkan': 9, 'ichimoku_kijun': 26, 'ichimoku_senkou': 52
+            'ichimoku_tenkan': 9, 'ichimoku_kijun': 26, 'ichimoku_senkou': 52,
+            'trend_window': 50
         }
     else:  # 4h, 1d
         return {
@@ -44,293 +52,407 @@ def get_indicator_params(timeframe):
             'stoch_k': 21, 'stoch_d': 7, 'stoch_overbought': 75, 'stoch_oversold': 25,
             'atr_period': 21, 'adx_period': 21, 'cci_period': 30,
             'williams_period': 21, 'vwap_period': 100,
-            'ichimoku_tenkan': 20, 'ichimoku_kijun': 60, 'ichimoku_senkou': 120
+            'ichimoku_tenkan': 20, 'ichimoku_kijun': 60, 'ichimoku_senkou': 120,
+            'trend_window': 100
         }
 
-def calculate_advanced_indicators(df, params):
-    """Menghitung indikator teknikal advanced"""
-    console.log("[cyan]Menghitung indikator advanced...[/cyan]")
-
-    # Williams %R
-    df['Williams_R'] = ((df['high'].rolling(window=params['williams_period']).max() - df['close']) /
-                       (df['high'].rolling(window=params['williams_period']).max() -
-                        df['low'].rolling(window=params['williams_period']).min())) * -100
-
-    # Commodity Channel Index (CCI)
+def tuned_params_path(symbol, timeframe, params_dir=None):
+    """Lokasi file parameter hasil param_sweep untuk symbol/timeframe"""
+    return os.path.join(params_dir or PARAMS_DIR, f'{symbol.upper()}_{timeframe}.json')
+
+def load_tuned_params(symbol, timeframe, params_dir=None):
+    """Parameter hasil optimasi (dict kosong kalau belum ada / file rusak)"""
+    path = tuned_params_path(symbol, timeframe, params_dir)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f).get('params', {})
+    except (OSError, ValueError) as e:
+        console.log(f"[yellow]⚠️ File parameter {path} tidak bisa dibaca ({e}), pakai default[/yellow]")
+        return {}
+
+# Registry indikator: setiap node mendeklarasikan kolom input & output,
+# calculate_indicators(columns=[...]) hanya menjalankan node yang dibutuhkan
+INDICATOR_GRAPH = IndicatorGraph()
+indicator = INDICATOR_GRAPH.node
+
+BASIC_LOG = "[cyan]📊 Menghitung indikator dasar...[/cyan]"
+ADVANCED_LOG = "[cyan]Menghitung indikator advanced...[/cyan]"
+
+def _ema_column(key):
+    return lambda params: [f'EMA_{params[key]}']
+
+def _sma_column(key):
+    return lambda params: [f'SMA_{params[key]}']
+
+def _register_moving_averages():
+    for key in ('sma_fast', 'sma_slow', 'sma_long'):
+        @indicator(key, inputs=['close'], outputs=_sma_column(key), log=BASIC_LOG)
+        def simple_moving_average(df, params, ws, key=key):
+            return {f'SMA_{params[key]}': ws.rolling('close', params[key], 'mean')}
+
+    for key in ('ema_fast', 'ema_slow', 'ema_long'):
+        @indicator(key, inputs=['close'], outputs=_ema_column(key), log=BASIC_LOG)
+        def exponential_moving_average(df, params, ws, key=key):
+            span = params[key]
+            return {f'EMA_{span}': ws.shared(('ema', span), lambda: df['close'].ewm(span=span, adjust=False).mean())}
+
+_register_moving_averages()
+
+@indicator('macd', inputs=lambda p: [f'EMA_{p["ema_fast"]}', f'EMA_{p["ema_slow"]}'],
+           outputs=['MACD', 'MACD_Signal', 'MACD_Histogram'], log=BASIC_LOG)
+def macd(df, params, ws):
+    line = df[f'EMA_{params["ema_fast"]}'] - df[f'EMA_{params["ema_slow"]}']
+    signal = line.ewm(span=params['macd_signal'], adjust=False).mean()
+    return {'MACD': line, 'MACD_Signal': signal, 'MACD_Histogram': line - signal}
+
+@indicator('rsi', inputs=['close'], outputs=['RSI'], log=BASIC_LOG)
+def rsi(df, params, ws):
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=params['rsi_period']).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=params['rsi_period']).mean()
+    rs = gain / loss
+    return {'RSI': 100 - (100 / (1 + rs))}
+
+@indicator('bollinger', inputs=['close'], outputs=['BB_Middle', 'BB_Upper', 'BB_Lower', 'BB_Width'], log=BASIC_LOG)
+def bollinger_bands(df, params, ws):
+    middle = ws.rolling('close', params['bb_period'], 'mean')
+    bb_std = ws.rolling('close', params['bb_period'], 'std')
+    upper = middle + (bb_std * params['bb_std'])
+    lower = middle - (bb_std * params['bb_std'])
+    return {'BB_Middle': middle, 'BB_Upper': upper, 'BB_Lower': lower,
+            'BB_Width': (upper - lower) / middle * 100}
+
+@indicator('stochastic', inputs=['high', 'low', 'close'], outputs=['Lowest_Low', 'Highest_High', '%K', '%D'],
+           log=BASIC_LOG)
+def stochastic(df, params, ws):
+    lowest_low = ws.rolling('low', params['stoch_k'], 'min')
+    highest_high = ws.rolling('high', params['stoch_k'], 'max')
+    percent_k = (df['close'] - lowest_low) / (highest_high - lowest_low) * 100
+    return {'Lowest_Low': lowest_low, 'Highest_High': highest_high, '%K': percent_k,
+            '%D': percent_k.rolling(window=params['stoch_d']).mean()}
+
+@indicator('true_range', inputs=['high', 'low', 'close'], outputs=['TR'], log=BASIC_LOG)
+def true_range(df, params, ws):
+    return {'TR': np.maximum(df['high'] - df['low'],
+                             np.maximum(abs(df['high'] - df['close'].shift()),
+                                        abs(df['low'] - df['close'].shift())))}
+
+@indicator('atr', inputs=['TR', 'close'], outputs=['ATR', 'ATR_Percent'], log=BASIC_LOG)
+def average_true_range(df, params, ws):
+    atr = ws.rolling('TR', params['atr_period'], 'mean')
+    return {'ATR': atr, 'ATR_Percent': (atr / df['close']) * 100}
+
+@indicator('williams_r', inputs=['high', 'low', 'close'], outputs=['Williams_R'], log=ADVANCED_LOG)
+def williams_r(df, params, ws):
+    highest_high = ws.rolling('high', params['williams_period'], 'max')
+    lowest_low = ws.rolling('low', params['williams_period'], 'min')
+    return {'Williams_R': ((highest_high - df['close']) / (highest_high - lowest_low)) * -100}
+
+@indicator('cci', inputs=['high', 'low', 'close'], outputs=['CCI'], log=ADVANCED_LOG)
+def commodity_channel_index(df, params, ws):
     typical_price = (df['high'] + df['low'] + df['close']) / 3
     sma_tp = typical_price.rolling(window=params['cci_period']).mean()
-    mad = typical_price.rolling(window=params['cci_period']).apply(lambda x: np.mean(np.abs(x - x.mean())))
-    df['CCI'] = (typical_price - sma_tp) / (0.015 * mad)
+    mad = rolling_mad(typical_price, params['cci_period'])
+    return {'CCI': (typical_price - sma_tp) / (0.015 * mad)}
 
-    # Average Directional Index (ADX)
+@indicator('adx', inputs=['high', 'low', 'TR'], outputs=['ADX', 'Plus_DI', 'Minus_DI'], log=ADVANCED_LOG)
+def average_directional_index(df, params, ws):
     high_diff = df['high'].diff()
     low_diff = df['low'].diff()
     plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0)
     minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0)
 
-    tr = np.maximum(df['high'] - df['low'],
-                    np.maximum(abs(df['high'] - df['close'].shift()),
-                              abs(df['low'] - df['close'].shift())))
-
-    plus_di = 100 * (pd.Series(plus_dm).rolling(window=params['adx_period']).mean() /
-                     pd.Series(tr).rolling(window=params['adx_period']).mean())
-    minus_di = 100 * (pd.Series(minus_dm).rolling(window=params['adx_period']).mean() /
-                      pd.Series(tr).rolling(window=params['adx_period']).mean())
+    # TR dipakai bersama dengan ATR
+    tr_mean = ws.rolling('TR', params['adx_period'], 'mean')
+    plus_di = 100 * (pd.Series(plus_dm, index=df.index).rolling(window=params['adx_period']).mean() / tr_mean)
+    minus_di = 100 * (pd.Series(minus_dm, index=df.index).rolling(window=params['adx_period']).mean() / tr_mean)
 
     dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-    df['ADX'] = dx.rolling(window=params['adx_period']).mean()
-    df['Plus_DI'] = plus_di
-    df['Minus_DI'] = minus_di
-
-    # VWAP (Volume Weighted Average Price)
-    df['VWAP'] = (df['close'] * df['volume']).rolling(window=params['vwap_period']).sum() / df['volume'].rolling(window=params['vwap_period']).sum()
+    return {'ADX': dx.rolling(window=params['adx_period']).mean(), 'Plus_DI': plus_di, 'Minus_DI': minus_di}
 
-    return df
+@indicator('vwap', inputs=['close', 'volume'], outputs=['VWAP'], log=ADVANCED_LOG)
+def vwap(df, params, ws):
+    window = params['vwap_period']
+    return {'VWAP': (df['close'] * df['volume']).rolling(window=window).sum() / ws.rolling('volume', window, 'sum')}
 
-def calculate_ichimoku(df, params):
-    """Menghitung Ichimoku Cloud"""
-    console.log("[cyan]Menghitung Ichimoku Cloud...[/cyan]")
+ICHIMOKU_LOG = "[cyan]Menghitung Ichimoku Cloud...[/cyan]"
 
-    # Tenkan-sen (Conversion Line)
-    tenkan_high = df['high'].rolling(window=params['ichimoku_tenkan']).max()
-    tenkan_low = df['low'].rolling(window=params['ichimoku_tenkan']).min()
-    df['Tenkan_sen'] = (tenkan_high + tenkan_low) / 2
+def _midpoint(ws, window):
+    """(highest high + lowest low) / 2, window dipakai bersama Stochastic/Williams kalau sama"""
+    return (ws.rolling('high', window, 'max') + ws.rolling('low', window, 'min')) / 2
 
-    # Kijun-sen (Base Line)
-    kijun_high = df['high'].rolling(window=params['ichimoku_kijun']).max()
-    kijun_low = df['low'].rolling(window=params['ichimoku_kijun']).min()
-    df['Kijun_sen'] = (kijun_high + kijun_low) / 2
+@indicator('tenkan_sen', inputs=['high', 'low'], outputs=['Tenkan_sen'], log=ICHIMOKU_LOG)
+def tenkan_sen(df, params, ws):
+    return {'Tenkan_sen': _midpoint(ws, params['ichimoku_tenkan'])}
 
-    # Senkou Span A (Leading Span A)
-    df['Senkou_A'] = ((df['Tenkan_sen'] + df['Kijun_sen']) / 2).shift(params['ichimoku_kijun'])
+@indicator('kijun_sen', inputs=['high', 'low'], outputs=['Kijun_sen'], log=ICHIMOKU_LOG)
+def kijun_sen(df, params, ws):
+    return {'Kijun_sen': _midpoint(ws, params['ichimoku_kijun'])}
 
-    # Senkou Span B (Leading Span B)
-    senkou_high = df['high'].rolling(window=params['ichimoku_senkou']).max()
-    senkou_low = df['low'].rolling(window=params['ichimoku_senkou']).min()
-    df['Senkou_B'] = ((senkou_high + senkou_low) / 2).shift(params['ichimoku_kijun'])
+@indicator('senkou_a', inputs=['Tenkan_sen', 'Kijun_sen'], outputs=['Senkou_A'], log=ICHIMOKU_LOG)
+def senkou_span_a(df, params, ws):
+    return {'Senkou_A': ((df['Tenkan_sen'] + df['Kijun_sen']) / 2).shift(params['ichimoku_kijun'])}
 
-    # Chikou Span (Lagging Span)
-    df['Chikou_span'] = df['close'].shift(-params['ichimoku_kijun'])
+@indicator('senkou_b', inputs=['high', 'low'], outputs=['Senkou_B'], log=ICHIMOKU_LOG)
+def senkou_span_b(df, params, ws):
+    return {'Senkou_B': _midpoint(ws, params['ichimoku_senkou']).shift(params['ichimoku_kijun'])}
 
-    return df
+@indicator('chikou_span', inputs=['close'], outputs=['Chikou_span'], log=ICHIMOKU_LOG)
+def chikou_span(df, params, ws):
+    return {'Chikou_span': df['close'].shift(-params['ichimoku_kijun'])}
 
-def detect_candlestick_patterns(df):
-    """Mendeteksi pola candlestick"""
-    console.log("[cyan]Mendeteksi pola candlestick...[/cyan]")
+CANDLESTICK_COLUMNS = ['Doji', 'Hammer', 'Shooting_Star', 'Bullish_Engulfing', 'Bearish_Engulfing']
 
+@indicator('candlestick', inputs=['open', 'high', 'low', 'close'], outputs=CANDLESTICK_COLUMNS,
+           log="[cyan]Mendeteksi pola candlestick...[/cyan]")
+def candlestick_patterns(df, params, ws):
     # Doji
     body_size = abs(df['close'] - df['open'])
     total_range = df['high'] - df['low']
-    df['Doji'] = (body_size / total_range < 0.1) & (total_range > 0)
+    doji = (body_size / total_range < 0.1) & (total_range > 0)
 
     # Hammer
     lower_shadow = np.where(df['close'] > df['open'], df['open'] - df['low'], df['close'] - df['low'])
     upper_shadow = np.where(df['close'] > df['open'], df['high'] - df['close'], df['high'] - df['open'])
-    df['Hammer'] = (lower_shadow > 2 * body_size) & (upper_shadow < body_size) & (body_size > 0)
+    hammer = (lower_shadow > 2 * body_size) & (upper_shadow < body_size) & (body_size > 0)
 
     # Shooting Star
-    df['Shooting_Star'] = (upper_shadow > 2 * body_size) & (lower_shadow < body_size) & (body_size > 0)
+    shooting_star = (upper_shadow > 2 * body_size) & (lower_shadow < body_size) & (body_size > 0)
 
     # Engulfing Patterns
-    df['Bullish_Engulfing'] = ((df['close'].shift(1) < df['open'].shift(1)) &
-                               (df['close'] > df['open']) &
-                               (df['open'] < df['close'].shift(1)) &
-                               (df['close'] > df['open'].shift(1)))
-
-    df['Bearish_Engulfing'] = ((df['close'].shift(1) > df['open'].shift(1)) &
-                               (df['close'] < df['open']) &
-                               (df['open'] > df['close'].shift(1)) &
-                               (df['close'] < df['open'].shift(1)))
-
-    return df
-
-def calculate_support_resistance(df, window=20):
-    """Menghitung level support dan resistance"""
-    console.log("[cyan]Menghitung support/resistance...[/cyan]")
-
-    # Local maxima dan minima
-    df['Local_Max'] = df['high'].rolling(window=window, center=True).max() == df['high']
-    df['Local_Min'] = df['low'].rolling(window=window, center=True).min() == df['low']
-
-    # Resistance levels
-    resistance_levels = df[df['Local_Max']]['high'].tail(5).tolist()
-    df['Resistance_1'] = max(resistance_levels) if resistance_levels else df['high'].max()
-    df['Resistance_2'] = sorted(resistance_levels, reverse=True)[1] if len(resistance_levels) > 1 else df['Resistance_1']
-
-    # Support levels
-    support_levels = df[df['Local_Min']]['low'].tail(5).tolist()
-    df['Support_1'] = min(support_levels) if support_levels else df['low'].min()
-    df['Support_2'] = sorted(support_levels)[1] if len(support_levels) > 1 else df['Support_1']
-
-    return df
-
-def calculate_trend_strength(df):
-    """Menghitung kekuatan trend"""
-    console.log("[cyan]Menghitung kekuatan trend...[/cyan]")
-
-    # Linear regression untuk trend
-    x = np.arange(len(df))
-    y = df['close'].values
+    bullish_engulfing = ((df['close'].shift(1) < df['open'].shift(1)) &
+                         (df['close'] > df['open']) &
+                         (df['open'] < df['close'].shift(1)) &
+                         (df['close'] > df['open'].shift(1)))
 
-    if len(y) > 1:
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-        df['Trend_Slope'] = slope
-        df['Trend_R2'] = r_value ** 2
-        df['Trend_Strength'] = abs(slope) * (r_value ** 2)  # Kombinasi slope dan R²
-    else:
-        df['Trend_Slope'] = 0
-        df['Trend_R2'] = 0
-        df['Trend_Strength'] = 0
+    bearish_engulfing = ((df['close'].shift(1) > df['open'].shift(1)) &
+                         (df['close'] < df['open']) &
+                         (df['open'] > df['close'].shift(1)) &
+                         (df['close'] < df['open'].shift(1)))
 
-    # Moving average trend
-    df['MA_Trend'] = np.where(df['close'] > df['close'].rolling(20).mean(), 1, -1)
+    return dict(zip(CANDLESTICK_COLUMNS, [doji, hammer, shooting_star, bullish_engulfing, bearish_engulfing]))
 
+def detect_candlestick_patterns(df):
+    """Mendeteksi pola candlestick (node candlestick saja, tanpa parameter)"""
+    console.log("[cyan]Mendeteksi pola candlestick...[/cyan]")
+    for column, values in candlestick_patterns(df, {}, None).items():
+        df[column] = values
     return df
 
-def calculate_signal_score(df, params):
+# Pivot support/resistance: bar jadi pivot kalau high/low-nya ekstrem di window
+# PIVOT_WINDOW bar sekitarnya, dan baru dianggap terkonfirmasi setelah bar kanannya lengkap
+PIVOT_WINDOW = 20
+PIVOT_LEVELS = 5
+
+def _pivot_levels(confirmed, pivot_values, fallback, largest):
+    """Level terkuat & kedua dari PIVOT_LEVELS pivot terakhir yang sudah terkonfirmasi di setiap bar"""
+    pivots = pivot_values[confirmed]
+    if not len(pivots):
+        return fallback, fallback
+    key = pivots if largest else -pivots
+    padded = np.concatenate([np.full(PIVOT_LEVELS - 1, -np.inf), key])
+    ranked = -np.sort(-sliding_window_view(padded, PIVOT_LEVELS), axis=1)
+    first = ranked[:, 0]
+    second = np.where(np.isfinite(ranked[:, 1]), ranked[:, 1], first)
+    if not largest:
+        first, second = -first, -second
+
+    # Index pivot terakhir yang sudah terkonfirmasi sampai bar ini (-1 = belum ada)
+    latest = np.cumsum(confirmed) - 1
+    index = np.maximum(latest, 0)
+    return (np.where(latest >= 0, first[index], fallback),
+            np.where(latest >= 0, second[index], fallback))
+
+@indicator('support_resistance', inputs=['high', 'low'],
+           outputs=['Local_Max', 'Local_Min', 'Resistance_1', 'Resistance_2', 'Support_1', 'Support_2'],
+           log="[cyan]Menghitung support/resistance...[/cyan]")
+def support_resistance(df, params, ws, window=PIVOT_WINDOW):
+    """Support/resistance per bar dari pivot yang sudah terkonfirmasi (tanpa data masa depan).
+
+    Pivot di bar p (ekstrem window p - w//2 .. p + (w-1)//2, sama dengan rolling
+    center=True) baru diketahui di bar p + (w-1)//2. Local_Max/Local_Min ditandai
+    di bar konfirmasi tersebut. Level memakai PIVOT_LEVELS pivot terakhir,
+    sebelum ada pivot dipakai high tertinggi / low terendah sejauh ini.
+    """
+    delay = (window - 1) // 2
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    pivot_high = np.concatenate([np.full(delay, np.nan), high[:len(high) - delay]])
+    pivot_low = np.concatenate([np.full(delay, np.nan), low[:len(low) - delay]])
+
+    # Pivot = ekstrem window trailing yang berakhir di bar konfirmasi
+    local_max = ws.rolling('high', window, 'max').to_numpy() == pivot_high
+    local_min = ws.rolling('low', window, 'min').to_numpy() == pivot_low
+
+    resistance_1, resistance_2 = _pivot_levels(local_max, pivot_high, np.maximum.accumulate(high), True)
+    support_1, support_2 = _pivot_levels(local_min, pivot_low, np.minimum.accumulate(low), False)
+
+    index = df.index
+    return {'Local_Max': pd.Series(local_max, index=index), 'Local_Min': pd.Series(local_min, index=index),
+            'Resistance_1': resistance_1, 'Resistance_2': resistance_2,
+            'Support_1': support_1, 'Support_2': support_2}
+
+TREND_LOG = "[cyan]Menghitung kekuatan trend...[/cyan]"
+
+@indicator('trend_regression', inputs=['close'], outputs=['Trend_Slope', 'Trend_R2', 'Trend_Strength'],
+           log=TREND_LOG)
+def trend_regression(df, params, ws):
+    # Rolling linear regression: setiap bar hanya memakai trend_window bar terakhir
+    slope, r_squared = rolling_linear_regression(df['close'], params['trend_window'])
+    return {'Trend_Slope': slope, 'Trend_R2': r_squared,
+            'Trend_Strength': abs(slope) * r_squared}  # Kombinasi slope dan R²
+
+@indicator('ma_trend', inputs=['close'], outputs=['MA_Trend'], log=TREND_LOG)
+def moving_average_trend(df, params, ws):
+    return {'MA_Trend': np.where(df['close'] > ws.rolling('close', 20, 'mean'), 1, -1)}
+
+def _signal_score_inputs(params):
+    return ['RSI', 'MACD', 'MACD_Signal', '%K', '%D', f'EMA_{params["ema_fast"]}', f'EMA_{params["ema_slow"]}',
+            'close', 'BB_Lower', 'BB_Upper', 'Williams_R', 'ADX', 'Plus_DI', 'Minus_DI'] + CANDLESTICK_COLUMNS
+
+@indicator('signal_score', inputs=_signal_score_inputs,
+           outputs=['Signal_Score', 'Buy_Signals', 'Sell_Signals', 'Signal_Strength', 'Recommendation'],
+           log="[cyan]Menghitung skor sinyal trading...[/cyan]")
+def signal_score(df, params, ws):
     """Menghitung skor sinyal trading berdasarkan multiple indikator"""
-    console.log("[cyan]Menghitung skor sinyal trading...[/cyan]")
-
-    df['Signal_Score'] = 0
-    df['Buy_Signals'] = 0
-    df['Sell_Signals'] = 0
+    buy = pd.Series(0, index=df.index)
+    sell = pd.Series(0, index=df.index)
 
     # RSI Signals
-    df.loc[df['RSI'] < params['rsi_oversold'], 'Buy_Signals'] += 1
-    df.loc[df['RSI'] > params['rsi_overbought'], 'Sell_Signals'] += 1
+    buy += df['RSI'] < params['rsi_oversold']
+    sell += df['RSI'] > params['rsi_overbought']
 
     # MACD Signals
-    df.loc[(df['MACD'] > df['MACD_Signal']) & (df['MACD'].shift(1) <= df['MACD_Signal'].shift(1)), 'Buy_Signals'] += 2
-    df.loc[(df['MACD'] < df['MACD_Signal']) & (df['MACD'].shift(1) >= df['MACD_Signal'].shift(1)), 'Sell_Signals'] += 2
+    buy += 2 * ((df['MACD'] > df['MACD_Signal']) & (df['MACD'].shift(1) <= df['MACD_Signal'].shift(1)))
+    sell += 2 * ((df['MACD'] < df['MACD_Signal']) & (df['MACD'].shift(1) >= df['MACD_Signal'].shift(1)))
 
     # Stochastic Signals
-    df.loc[(df['%K'] < params['stoch_oversold']) & (df['%K'] > df['%D']), 'Buy_Signals'] += 1
-    df.loc[(df['%K'] > params['stoch_overbought']) & (df['%K'] < df['%D']), 'Sell_Signals'] += 1
+    buy += (df['%K'] < params['stoch_oversold']) & (df['%K'] > df['%D'])
+    sell += (df['%K'] > params['stoch_overbought']) & (df['%K'] < df['%D'])
 
     # Moving Average Signals
-    ma_fast_col = f'EMA_{params["ema_fast"]}'
-    ma_slow_col = f'EMA_{params["ema_slow"]}'
-    df.loc[(df[ma_fast_col] > df[ma_slow_col]) & (df[ma_fast_col].shift(1) <= df[ma_slow_col].shift(1)), 'Buy_Signals'] += 2
-    df.loc[(df[ma_fast_col] < df[ma_slow_col]) & (df[ma_fast_col].shift(1) >= df[ma_slow_col].shift(1)), 'Sell_Signals'] += 2
+    ma_fast = df[f'EMA_{params["ema_fast"]}']
+    ma_slow = df[f'EMA_{params["ema_slow"]}']
+    buy += 2 * ((ma_fast > ma_slow) & (ma_fast.shift(1) <= ma_slow.shift(1)))
+    sell += 2 * ((ma_fast < ma_slow) & (ma_fast.shift(1) >= ma_slow.shift(1)))
 
     # Bollinger Bands Signals
-    df.loc[df['close'] < df['BB_Lower'], 'Buy_Signals'] += 1
-    df.loc[df['close'] > df['BB_Upper'], 'Sell_Signals'] += 1
+    buy += df['close'] < df['BB_Lower']
+    sell += df['close'] > df['BB_Upper']
 
     # Williams %R Signals
-    df.loc[df['Williams_R'] < -80, 'Buy_Signals'] += 1
-    df.loc[df['Williams_R'] > -20, 'Sell_Signals'] += 1
+    buy += df['Williams_R'] < -80
+    sell += df['Williams_R'] > -20
 
     # ADX Trend Strength
     strong_trend = df['ADX'] > 25
-    df.loc[strong_trend & (df['Plus_DI'] > df['Minus_DI']), 'Buy_Signals'] += 1
-    df.loc[strong_trend & (df['Plus_DI'] < df['Minus_DI']), 'Sell_Signals'] += 1
+    buy += strong_trend & (df['Plus_DI'] > df['Minus_DI'])
+    sell += strong_trend & (df['Plus_DI'] < df['Minus_DI'])
 
     # Candlestick Pattern Signals
-    df.loc[df['Hammer'] | df['Bullish_Engulfing'], 'Buy_Signals'] += 1
-    df.loc[df['Shooting_Star'] | df['Bearish_Engulfing'], 'Sell_Signals'] += 1
+    buy += df['Hammer'] | df['Bullish_Engulfing']
+    sell += df['Shooting_Star'] | df['Bearish_Engulfing']
 
     # Final Signal Score (-10 to +10)
-    df['Signal_Score'] = df['Buy_Signals'] - df['Sell_Signals']
-    df['Signal_Score'] = np.clip(df['Signal_Score'], -10, 10)
-
-    # Signal Strength
-    df['Signal_Strength'] = abs(df['Signal_Score']) / 10 * 100  # Percentage
+    score = np.clip(buy - sell, -10, 10)
 
     # Trading Recommendation
-    df['Recommendation'] = 'HOLD'
-    df.loc[df['Signal_Score'] >= 3, 'Recommendation'] = 'STRONG_BUY'
-    df.loc[df['Signal_Score'] == 2, 'Recommendation'] = 'BUY'
-    df.loc[df['Signal_Score'] == 1, 'Recommendation'] = 'WEAK_BUY'
-    df.loc[df['Signal_Score'] == -1, 'Recommendation'] = 'WEAK_SELL'
-    df.loc[df['Signal_Score'] == -2, 'Recommendation'] = 'SELL'
-    df.loc[df['Signal_Score'] <= -3, 'Recommendation'] = 'STRONG_SELL'
-
-    return df
-
-def calculate_indicators(klines, timeframe):
-    """Fungsi utama untuk menghitung semua indikator teknikal"""
+    recommendation = np.select(
+        [score >= 3, score == 2, score == 1, score == -1, score == -2, score <= -3],
+        ['STRONG_BUY', 'BUY', 'WEAK_BUY', 'WEAK_SELL', 'SELL', 'STRONG_SELL'], default='HOLD')
+
+    return {'Signal_Score': score, 'Buy_Signals': buy, 'Sell_Signals': sell,
+            'Signal_Strength': abs(score) / 10 * 100,  # Percentage
+            'Recommendation': pd.Series(recommendation, index=df.index, dtype=object)}
+
+class IndicatorResult:
+    """Hasil calculate_indicators dalam bentuk kolom (DataFrame), tanpa list of dict per baris"""
+
+    def __init__(self, df, timeframe, params):
+        self.df = df
+        self.timeframe = timeframe
+        self.params = params
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def row(self, index):
+        """Satu baris sebagai dict (index posisi, -1 = terbaru)"""
+        return self.df.iloc[index].to_dict()
+
+    def latest(self):
+        """Baris terbaru sebagai dict, dict kosong kalau tidak ada data"""
+        return self.row(-1) if len(self.df) else {}
+
+    def column(self, name):
+        """Array numpy untuk satu kolom"""
+        return self.df[name].to_numpy()
+
+    def to_records(self):
+        """Format lama (list of dict), hanya untuk kompatibilitas"""
+        return self.df.to_dict('records')
+
+
+def as_frame(data):
+    """DataFrame dari IndicatorResult, DataFrame, atau list of dict (format lama)"""
+    if isinstance(data, IndicatorResult):
+        return data.df
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame(data)
+
+def klines_to_frame(klines):
+    """DataFrame OHLCV dari structured array atau list kline, tanpa kolom object.
+
+    Kolom structured array dipakai langsung sebagai view (copy=False), list kline
+    diparse ke array bertipe dulu. Kolom yang tidak dipakai indikator dilewati.
+    """
+    if not (isinstance(klines, np.ndarray) and klines.dtype.names):
+        klines = klines_to_array(klines, DEFAULT_KLINE_COLUMNS)
+    columns = [name for name in DEFAULT_KLINE_COLUMNS if name in klines.dtype.names]
+    return pd.DataFrame({name: klines[name] for name in columns}, copy=False)
+
+def calculate_indicators(klines, timeframe, params=None, symbol=None, columns=None):
+    """Fungsi utama untuk menghitung semua indikator teknikal
+
+    `params` (opsional) menimpa sebagian parameter dari get_indicator_params,
+    dipakai backtest / parameter sweep. Kalau `symbol` diisi, parameter hasil
+    param_sweep untuk symbol/timeframe tersebut dipakai (kalau ada).
+    `columns` (opsional) membatasi perhitungan ke indikator yang dibutuhkan
+    kolom tersebut (lihat INDICATOR_GRAPH), None = semua indikator. Boleh juga
+    berupa fungsi params -> list untuk kolom yang namanya tergantung parameter.
+    """
     console.log("[bold green]🚀 Memulai analisis teknikal advanced...[/bold green]")
 
-    params = get_indicator_params(timeframe)
+    tuned = load_tuned_params(symbol, timeframe) if symbol else {}
+    params = {**get_indicator_params(timeframe), **tuned, **(params or {})}
 
     # Konversi data ke DataFrame
-    df = pd.DataFrame(klines, columns=[
-        'timestamp', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'quote_asset_volume', 'number_of_trades',
-        'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-    ])
-
-    # Konversi tipe data
-    numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = klines_to_frame(klines)
 
     console.log("[green]✅ Data berhasil dikonversi[/green]")
 
-    # Indikator Dasar
-    console.log("[cyan]📊 Menghitung indikator dasar...[/cyan]")
-
-    # Simple Moving Averages
-    df[f'SMA_{params["sma_fast"]}'] = df['close'].rolling(window=params['sma_fast']).mean()
-    df[f'SMA_{params["sma_slow"]}'] = df['close'].rolling(window=params['sma_slow']).mean()
-    df[f'SMA_{params["sma_long"]}'] = df['close'].rolling(window=params['sma_long']).mean()
-
-    # Exponential Moving Averages
-    df[f'EMA_{params["ema_fast"]}'] = df['close'].ewm(span=params['ema_fast'], adjust=False).mean()
-    df[f'EMA_{params["ema_slow"]}'] = df['close'].ewm(span=params['ema_slow'], adjust=False).mean()
-    df[f'EMA_{params["ema_long"]}'] = df['close'].ewm(span=params['ema_long'], adjust=False).mean()
-
-    # MACD
-    df['MACD'] = df[f'EMA_{params["ema_fast"]}'] - df[f'EMA_{params["ema_slow"]}']
-    df['MACD_Signal'] = df['MACD'].ewm(span=params['macd_signal'], adjust=False).mean()
-    df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-
-    # RSI
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=params['rsi_period']).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=params['rsi_period']).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-
-    # Bollinger Bands
-    df['BB_Middle'] = df['close'].rolling(window=params['bb_period']).mean()
-    bb_std = df['close'].rolling(window=params['bb_period']).std()
-    df['BB_Upper'] = df['BB_Middle'] + (bb_std * params['bb_std'])
-    df['BB_Lower'] = df['BB_Middle'] - (bb_std * params['bb_std'])
-    df['BB_Width'] = (df['BB_Upper'] - df['BB_Lower']) / df['BB_Middle'] * 100
-
-    # Stochastic Oscillator
-    df['Lowest_Low'] = df['low'].rolling(window=params['stoch_k']).min()
-    df['Highest_High'] = df['high'].rolling(window=params['stoch_k']).max()
-    df['%K'] = (df['close'] - df['Lowest_Low']) / (df['Highest_High'] - df['Lowest_Low']) * 100
-    df['%D'] = df['%K'].rolling(window=params['stoch_d']).mean()
-
-    # ATR
-    df['TR'] = np.maximum(df['high'] - df['low'],
-                          np.maximum(abs(df['high'] - df['close'].shift()),
-                                     abs(df['low'] - df['close'].shift())))
-    df['ATR'] = df['TR'].rolling(window=params['atr_period']).mean()
-    df['ATR_Percent'] = (df['ATR'] / df['close']) * 100
-
-    # Indikator Advanced
-    df = calculate_advanced_indicators(df, params)
-    df = calculate_ichimoku(df, params)
-    df = detect_candlestick_patterns(df)
-    df = calculate_support_resistance(df)
-    df = calculate_trend_strength(df)
-    df = calculate_signal_score(df, params)
+    if callable(columns):
+        columns = columns(params)
+    df = INDICATOR_GRAPH.compute(df, params, columns, log=console.log)
 
     console.log("[bold green]🎯 Semua indikator berhasil dihitung![/bold green]")
     console.log(f"[yellow]📈 Total data points: {len(df)}[/yellow]")
-    console.log(f"[yellow]🔍 Sinyal terakhir: {df['Recommendation'].iloc[-1] if not df.empty else 'N/A'}[/yellow]")
-
-    # Fill NaN values instead of dropping them
-    df = df.fillna(0)
+    if 'Recommendation' in df.columns:
+        console.log(f"[yellow]🔍 Sinyal terakhir: {df['Recommendation'].iloc[-1] if not df.empty else 'N/A'}[/yellow]")
 
     # Only return data where we have enough for meaningful analysis
     min_periods = max(params.get('sma_slow', 50), params.get('bb_period', 20))
     if len(df) > min_periods:
-        return df.iloc[min_periods:].to_dict('records')
-    else:
-        return df.to_dict('records')
+        df = df.iloc[min_periods:]
+
+    # Fill NaN values instead of dropping them
+    df = df.fillna(0)
+
+    return IndicatorResult(df, timeframe, params)
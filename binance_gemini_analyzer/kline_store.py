@@ -0,0 +1,106 @@
+import os
+import time
+import numpy as np
+from rich.console import Console
+from binance_data import (KLINE_DTYPE, INTERVAL_MS, klines_to_array,
+                          get_binance_data, get_historical_klines)
+from config import KLINE_STORE_DIR
+
+console = Console()
+
+
+class KlineStore:
+    """Penyimpanan kline lokal, satu file per symbol & interval.
+
+    File berisi record biner KLINE_DTYPE (int64 timestamp, float64 OHLCV, ...)
+    yang ditulis berurutan, jadi bisa dibaca via memory-map dan ditambah di ujung
+    tanpa menulis ulang file.
+    """
+
+    def __init__(self, root=KLINE_STORE_DIR):
+        self.root = root
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, f'{symbol.upper()}_{interval}.klines')
+
+    def _record_count(self, path):
+        if not os.path.exists(path):
+            return 0
+        size = os.path.getsize(path)
+        if size % KLINE_DTYPE.itemsize:
+            # Sisa penulisan yang terputus di tengah record, buang
+            with open(path, 'r+b') as f:
+                f.truncate(size - size % KLINE_DTYPE.itemsize)
+        return size // KLINE_DTYPE.itemsize
+
+    def load(self, symbol, interval):
+        """Baca semua kline tersimpan sebagai structured array (memory-mapped, read-only)"""
+        path = self.path(symbol, interval)
+        count = self._record_count(path)
+        if count == 0:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.memmap(path, dtype=KLINE_DTYPE, mode='r', shape=(count,))
+
+    def last_timestamp(self, symbol, interval):
+        path = self.path(symbol, interval)
+        count = self._record_count(path)
+        if count == 0:
+            return None
+        with open(path, 'rb') as f:
+            f.seek((count - 1) * KLINE_DTYPE.itemsize)
+            return int(np.frombuffer(f.read(KLINE_DTYPE.itemsize), dtype=KLINE_DTYPE)['timestamp'][0])
+
+    def append(self, symbol, interval, klines):
+        """Tambahkan kline yang lebih baru dari data tersimpan, return jumlah yang ditulis"""
+        array = klines if isinstance(klines, np.ndarray) else klines_to_array(klines)
+        last = self.last_timestamp(symbol, interval)
+        if last is not None:
+            array = array[array['timestamp'] > last]
+        if len(array) == 0:
+            return 0
+
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.path(symbol, interval), 'ab') as f:
+            f.write(np.ascontiguousarray(array, dtype=KLINE_DTYPE).tobytes())
+        return len(array)
+
+
+async def sync_klines(symbol, interval, store=None, session=None, initial_limit=1000):
+    """Sinkronkan store lokal dengan Binance, return semua kline (tersimpan + candle berjalan).
+
+    Hanya candle yang lebih baru dari timestamp terakhir yang diambil dari network.
+    Candle yang belum close tidak disimpan, tapi tetap ikut di hasil.
+    """
+    if store is None:
+        store = KlineStore()
+
+    if interval not in INTERVAL_MS:
+        console.log(f"[bold red]Interval tidak dikenal: {interval}[/bold red]")
+        return np.empty(0, dtype=KLINE_DTYPE)
+
+    interval_ms = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000)
+    last = store.last_timestamp(symbol, interval)
+
+    if last is None:
+        fresh = await get_binance_data(symbol, interval, limit=initial_limit, session=session,
+                                       as_array=True, columns=KLINE_DTYPE.names)
+    elif last + interval_ms > now_ms:
+        fresh = np.empty(0, dtype=KLINE_DTYPE)
+    else:
+        fresh = await get_historical_klines(symbol, interval, last + interval_ms, now_ms, session=session,
+                                            as_array=True, columns=KLINE_DTYPE.names)
+
+    if fresh is None:
+        console.log(f"[yellow]⚠️ Sync {symbol} {interval} gagal, pakai data lokal saja[/yellow]")
+        return store.load(symbol, interval)
+
+    closed = fresh[fresh['close_time'] < now_ms]
+    written = store.append(symbol, interval, closed)
+    console.log(f"[green]💾 {symbol} {interval}: {written} candle baru disimpan[/green]")
+
+    stored = store.load(symbol, interval)
+    tail = fresh[fresh['timestamp'] > (stored['timestamp'][-1] if len(stored) else -1)]
+    if len(tail) == 0:
+        return stored
+    return np.concatenate([stored, tail])
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Ingestion kline live lewat satu koneksi WebSocket combined stream Binance.
+
+Setiap candle yang close langsung masuk ke IncrementalIndicatorState per symbol,
+jadi Signal_Score / Recommendation terbaru tersedia dalam hitungan milidetik.
+Kalau koneksi putus, reconnect dengan backoff lalu candle yang terlewat diisi lewat REST.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import aiohttp
+from rich.console import Console
+from binance_data import INTERVAL_MS, get_binance_data, get_historical_klines
+from http_client import close_http_client, get_session
+from incremental_indicators import IncrementalIndicatorState
+
+console = Console()
+STREAM_URL = "wss://stream.binance.com:9443/stream"
+
+# Binance menutup koneksi stream setelah 24 jam dan membatasi 1024 stream per koneksi
+MAX_STREAMS_PER_CONNECTION = 1024
+
+
+def kline_from_event(k):
+    """Kline format REST Binance dari payload 'k' event WebSocket"""
+    return [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], '0']
+
+
+def stream_name(symbol, interval):
+    return f'{symbol.lower()}@kline_{interval}'
+
+
+class StreamUpdate:
+    """Hasil satu candle close: snapshot indikator terbaru + latency dari event ke update"""
+
+    __slots__ = ('symbol', 'interval', 'snapshot', 'latency_ms', 'source')
+
+    def __init__(self, symbol, interval, snapshot, latency_ms, source):
+        self.symbol = symbol
+        self.interval = interval
+        self.snapshot = snapshot
+        self.latency_ms = latency_ms
+        self.source = source  # 'stream' atau 'rest' (gap fill)
+
+    @property
+    def recommendation(self):
+        return self.snapshot.get('Recommendation')
+
+    def __repr__(self):
+        return (f'StreamUpdate({self.symbol} {self.interval} {self.snapshot.get("timestamp")} '
+                f'{self.recommendation} {self.latency_ms:.1f}ms {self.source})')
+
+
+class KlineStream:
+    """Multiplexed kline stream untuk banyak symbol dengan satu interval.
+
+    `on_update(update)` (fungsi biasa atau coroutine) dipanggil untuk setiap
+    candle close yang mengubah state, baik dari WebSocket maupun gap fill REST.
+    `clock()` (ms) dipakai untuk memisahkan candle REST yang masih berjalan.
+    """
+
+    def __init__(self, symbols, interval, on_update=None, session=None, history=500,
+                 stream_url=None, initial_backoff=0.5, max_backoff=30.0, heartbeat=20.0, clock=None):
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Interval tidak dikenal: {interval}")
+        if len(symbols) > MAX_STREAMS_PER_CONNECTION:
+            raise ValueError(f"Maksimal {MAX_STREAMS_PER_CONNECTION} symbol per koneksi")
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.interval = interval
+        self.interval_ms = INTERVAL_MS[interval]
+        self.on_update = on_update
+        self.session = session
+        self.history = history
+        self.stream_url = stream_url
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.heartbeat = heartbeat
+        # Jam (ms) untuk menentukan candle REST yang sudah close, default jam lokal
+        self.clock = clock or (lambda: int(time.time() * 1000))
+
+        self.states = {symbol: IncrementalIndicatorState(interval, symbol=symbol) for symbol in self.symbols}
+        self.latencies = []
+        self.stats = {'connections': 0, 'reconnects': 0, 'stream_candles': 0, 'gap_candles': 0, 'gap_fills': 0}
+        self._ws = None
+        self._stopped = asyncio.Event()
+
+    @property
+    def url(self):
+        streams = '/'.join(stream_name(symbol, self.interval) for symbol in self.symbols)
+        return f'{self.stream_url or STREAM_URL}?streams={streams}'
+
+    def snapshot(self, symbol):
+        return self.states[symbol.upper()].snapshot()
+
+    async def _emit(self, update):
+        self.latencies.append(update.latency_ms)
+        if self.on_update is not None:
+            result = self.on_update(update)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def _apply(self, symbol, kline, source, event_time=None):
+        """Masukkan satu candle close ke state, return True kalau state berubah"""
+        snapshot = self.states[symbol].update(kline)
+        if snapshot is None:
+            return False
+        reference = event_time if event_time is not None else int(kline[6]) + 1
+        latency_ms = max(0.0, time.time() * 1000 - reference)
+        await self._emit(StreamUpdate(symbol, self.interval, snapshot, latency_ms, source))
+        return True
+
+    async def _fill_symbol(self, session, symbol, until_open=None):
+        """Ambil candle close yang belum ada di state lewat REST (seed awal atau gap).
+
+        Return jumlah candle gap yang dimasukkan (seed awal tidak dihitung dan tidak di-emit).
+        """
+        state = self.states[symbol]
+        seeding = state.last_timestamp is None
+        if seeding:
+            klines = await get_binance_data(symbol, self.interval, limit=self.history, session=session)
+        else:
+            klines = await get_historical_klines(symbol, self.interval, state.last_timestamp + self.interval_ms,
+                                                 session=session)
+        if klines is None:
+            console.log(f"[yellow]⚠️ Gap fill {symbol} gagal, lanjut dari stream[/yellow]")
+            return 0
+
+        now_ms = self.clock()
+        applied = 0
+        for kline in klines:
+            # Candle yang masih berjalan / yang sudah ada di event stream berikutnya berhenti di sini
+            if int(kline[6]) >= now_ms or (until_open is not None and kline[0] >= until_open):
+                break
+            if seeding:
+                state.update(kline)
+            elif await self._apply(symbol, kline, 'rest'):
+                applied += 1
+        return applied
+
+    async def fill_gaps(self, session=None):
+        """Seed / isi gap semua symbol secara paralel lewat REST"""
+        session = session or self.session or await get_session()
+        started = time.perf_counter()
+        counts = await asyncio.gather(*(self._fill_symbol(session, symbol) for symbol in self.symbols))
+        self.stats['gap_fills'] += 1
+        self.stats['gap_candles'] += sum(counts)
+        console.log(f"[green]🔄 Gap fill {len(self.symbols)} symbol: {sum(counts)} candle "
+                    f"dalam {time.perf_counter() - started:.2f}s[/green]")
+
+    async def _handle_message(self, session, payload):
+        data = payload.get('data', payload)
+        if data.get('e') != 'kline':
+            return
+        k = data['k']
+        if not k.get('x'):
+            return  # Hanya candle yang sudah close
+        symbol = data.get('s', k.get('s', '')).upper()
+        state = self.states.get(symbol)
+        if state is None:
+            return
+
+        kline = kline_from_event(k)
+        if state.last_timestamp is not None and kline[0] > state.last_timestamp + self.interval_ms:
+            # Ada candle terlewat di tengah stream: isi dulu lewat REST supaya urutan state benar
+            self.stats['gap_candles'] += await self._fill_symbol(session, symbol, until_open=kline[0])
+        if await self._apply(symbol, kline, 'stream', data.get('E')):
+            self.stats['stream_candles'] += 1
+
+    async def _consume(self, session):
+        async with session.ws_connect(self.url, heartbeat=self.heartbeat) as ws:
+            self._ws = ws
+            self.stats['connections'] += 1
+            console.log(f"[bold green]📡 Stream tersambung: {len(self.symbols)} symbol {self.interval}[/bold green]")
+            # Gap fill setelah tersambung: event yang datang selama fill tertahan di buffer socket
+            await self.fill_gaps(session)
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    await self._handle_message(session, message.json())
+                elif message.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                    break
+        self._ws = None
+
+    def _backoff(self, attempt):
+        """Exponential backoff dengan jitter (full jitter di setengah atas)"""
+        delay = min(self.max_backoff, self.initial_backoff * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def run(self):
+        """Jalankan stream sampai stop() dipanggil, reconnect otomatis kalau putus"""
+        session = self.session or await get_session()
+        attempt = 0
+        while not self._stopped.is_set():
+            connections = self.stats['connections']
+            try:
+                await self._consume(session)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                console.log(f"[yellow]⚠️ Stream error: {e}[/yellow]")
+            if self._stopped.is_set():
+                break
+
+            # Koneksi sempat berhasil: mulai backoff dari awal lagi
+            attempt = 0 if self.stats['connections'] > connections else attempt + 1
+            delay = self._backoff(attempt)
+            self.stats['reconnects'] += 1
+            console.log(f"[yellow]🔌 Stream terputus, reconnect dalam {delay:.2f}s[/yellow]")
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        self._stopped.set()
+        if self._ws is not None:
+            await self._ws.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Live kline stream + indikator incremental')
+    parser.add_argument('symbols', nargs='+', help='Symbol, misal BTCUSDT ETHUSDT')
+    parser.add_argument('--interval', default='1m', choices=sorted(INTERVAL_MS))
+    parser.add_argument('--history', type=int, default=500, help='Jumlah candle untuk seed awal')
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+
+    def show(update):
+        snapshot = update.snapshot
+        console.log(f"[bold]{update.symbol}[/bold] close {snapshot['close']:.6f} | "
+                    f"RSI {snapshot['RSI']:.1f} | skor {snapshot['Signal_Score']} "
+                    f"[cyan]{update.recommendation}[/cyan] | {update.latency_ms:.1f} ms")
+
+    stream = KlineStream(args.symbols, args.interval, on_update=show, history=args.history)
+    try:
+        await stream.run()
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        console.log("[yellow]Stream dihentikan[/yellow]")
@@ -1,32 +1,35 @@
+import argparse
 import asyncio
-import signal
+import functools
+import sys
 import time
 from blessed import Terminal
-from pyfiglet import Figlet
-from binance_data import get_binance_data
+import analysis_context
+import binance_data
+import gemini_analyzer
+import gemini_cache
+import http_client
+import indicators
+import kline_store
+import model_registry
+import prompt_builder
+import request_scheduler
+import trading_signals
+import watchlist
+from kline_store import sync_klines
 from indicators import calculate_indicators
-from gemini_analyzer import analyze_with_gemini
-from trading_signals import signal_engine
+from gemini_analyzer import stream_analysis_with_gemini
+from analysis_context import AnalysisContext
+from compute_executor import IndicatorComputeExecutor
 from config import GEMINI_API_KEY
-import pandas as pd
+from dashboard import Dashboard, figlet_header
+from http_client import close_http_client
+from watchlist import SORT_KEYS, Watchlist, run_dashboard, watchlist_layout
 
 term = Terminal()
 
-def handle_sigint(signum, frame):
-    print(term.clear)
-    print(term.bold_red + "\nProgram dihentikan oleh user!" + term.normal)
-    exit(0)
-
-signal.signal(signal.SIGINT, handle_sigint)
-
-def create_header():
-    f = Figlet(font='slant')
-    header_text = f.renderText("Binance Gemini Analyzer")
-    subheader = "dibuat oleh bobacheese"
-    
-    return (term.bold_magenta + header_text + term.normal +
-            term.move_x(term.width // 2 - len(subheader) // 2) +
-            term.cyan + subheader + term.normal)
+QUIET_MODULES = (analysis_context, binance_data, gemini_analyzer, gemini_cache, http_client, indicators,
+                 kline_store, model_registry, prompt_builder, request_scheduler, trading_signals, watchlist)
 
 def create_advanced_table(data, trading_rec):
     """Membuat tabel informasi trading yang komprehensif"""
@@ -73,72 +76,108 @@ def create_advanced_table(data, trading_rec):
 
     return table
 
-def display_windows(header, input_window, progress_window, result_window, indicator_window):
-    print(term.clear + term.home + header)
-    print(term.move_y(term.height // 4) + input_window)
-    print(term.move_y(term.height // 2) + progress_window)
-    print(term.move_y(term.height // 2 + 5) + result_window)
-    print(term.move_y(term.height - 15) + indicator_window)
-
-async def main():
-    header = create_header()
-    
-    while True:
-        input_window = ""
-        progress_window = ""
-        result_window = ""
-        indicator_window = ""
-        
-        display_windows(header, input_window, progress_window, result_window, indicator_window)
-        
-        symbol = input(term.bold_yellow + "Masukkin pair (contoh: BTCUSDT): " + term.normal).upper()
-        timeframe = input(term.bold_yellow + "Pilih timeframe (1m, 5m, 15m, 1h, 4h, 1d): " + term.normal)
-        
-        input_window = f"Pair: {symbol}\nTimeframe: {timeframe}"
-        display_windows(header, input_window, progress_window, result_window, indicator_window)
-        
-        progress_window = term.cyan + "Ngambil data dari Binance..." + term.normal
-        display_windows(header, input_window, progress_window, result_window, indicator_window)
-        klines = await get_binance_data(symbol, timeframe)
-        
-        if not klines:
-            progress_window = term.bold_red + "Gagal ngambil data. Coba lagi ya!" + term.normal
-            display_windows(header, input_window, progress_window, result_window, indicator_window)
-            time.sleep(2)
-            continue
-        
-        progress_window = term.green + "🔄 Menghitung indikator advanced..." + term.normal
-        display_windows(header, input_window, progress_window, result_window, indicator_window)
-        data_with_indicators = calculate_indicators(klines, timeframe)
-
-        progress_window = term.yellow + "🤖 Menganalisis dengan ML & AI..." + term.normal
-        display_windows(header, input_window, progress_window, result_window, indicator_window)
-
-        # Generate trading recommendation
-        df = pd.DataFrame(data_with_indicators)
-        trading_recommendation = signal_engine.generate_trading_recommendation(df, symbol, timeframe)
-
-        progress_window = term.magenta + "🚀 Mengirim ke Gemini untuk analisis final..." + term.normal
-        display_windows(header, input_window, progress_window, result_window, indicator_window)
-        analysis = await analyze_with_gemini(data_with_indicators, GEMINI_API_KEY, symbol, timeframe)
-
-        result_window = term.bold_white + "🎯 HASIL ANALISIS AI:\n" + term.normal + analysis
-
-        last_data = data_with_indicators[-1]
-        indicator_window = term.cyan + create_advanced_table(last_data, trading_recommendation) + term.normal
-        
-        display_windows(header, input_window, progress_window, result_window, indicator_window)
-        
-        lanjut = input(term.bold_green + "\nMau analisis lagi? (y/n): " + term.normal)
-        if lanjut.lower() != 'y':
-            break
-    
+async def analyze(dashboard, symbol, timeframe):
+    """Satu siklus analisis; semua tampilan lewat dashboard, komputasi berat di thread pool"""
+    loop = asyncio.get_running_loop()
+    dashboard.update(input=f"Pair: {symbol}\nTimeframe: {timeframe}", result="", indicators="",
+                     progress=term.cyan + "Ngambil data dari Binance..." + term.normal)
+    # Data lokal + candle baru dari Binance, dianalisis 1000 candle terakhir
+    klines = (await sync_klines(symbol, timeframe))[-1000:]
+
+    if len(klines) == 0:
+        dashboard.update(progress=term.bold_red + "Gagal ngambil data. Coba lagi ya!" + term.normal)
+        await asyncio.sleep(2)
+        return
+
+    dashboard.update(progress=term.green + "🔄 Menghitung indikator advanced..." + term.normal)
+    data_with_indicators = await loop.run_in_executor(
+        None, functools.partial(calculate_indicators, klines, timeframe, symbol=symbol))
+
+    dashboard.update(progress=term.yellow + "🤖 Menganalisis dengan ML & AI..." + term.normal)
+    # Generate trading recommendation (context dipakai bareng analyze_with_gemini, jadi cuma dihitung sekali)
+    context = AnalysisContext()
+    trading_recommendation = await loop.run_in_executor(
+        None, context.recommendation, data_with_indicators, symbol, timeframe)
+
+    # Tabel indikator sudah bisa tampil selagi Gemini masih menulis jawaban
+    last_data = data_with_indicators.latest()
+    dashboard.update(indicators=term.cyan + create_advanced_table(last_data, trading_recommendation) + term.normal,
+                     progress=term.magenta + "🚀 Mengirim ke Gemini untuk analisis final..." + term.normal)
+
+    # Jawaban Gemini di-stream: setiap potongan cukup di-update, dashboard yang membatasi frame rate
+    analysis = ""
+    started = time.perf_counter()
+    async for chunk in stream_analysis_with_gemini(data_with_indicators, GEMINI_API_KEY, symbol, timeframe,
+                                                   context=context):
+        if not analysis:
+            dashboard.update(progress=term.magenta + f"✍️ Gemini menulis analisis "
+                             f"(respon pertama {time.perf_counter() - started:.2f}s)..." + term.normal)
+        analysis += chunk
+        dashboard.update(result=term.bold_white + "🎯 HASIL ANALISIS AI:\n" + term.normal + analysis)
+
+    dashboard.update(progress=term.green + f"✅ Analisis selesai dalam {time.perf_counter() - started:.2f}s"
+                     + term.normal)
+
+
+async def watch(symbols, timeframes, sort_key, limit, workers):
+    """Mode watchlist: tabel live banyak symbol x timeframe, refresh setiap candle close"""
+    with IndicatorComputeExecutor(max_workers=workers) as executor:
+        watched = Watchlist(symbols, timeframes, limit=limit, sort_key=sort_key, executor=executor)
+        async with Dashboard(term, layout=watchlist_layout) as dashboard:
+            await run_dashboard(watched, dashboard)
+
+
+async def interactive():
+    """Mode interaktif: prompt pair & timeframe, analisis, ulangi sampai user berhenti"""
+    async with Dashboard(term) as dashboard:
+        dashboard.update(header=figlet_header(term))
+        while True:
+            dashboard.update(input="", progress="", result="", indicators="")
+            symbol = (await dashboard.read_line(term.bold_yellow + "Masukkin pair (contoh: BTCUSDT): "
+                                                + term.normal)).strip().upper()
+            timeframe = (await dashboard.read_line(term.bold_yellow + "Pilih timeframe (1m, 5m, 15m, 1h, 4h, 1d): "
+                                                   + term.normal, prefix=f"Pair: {symbol}\n")).strip()
+
+            await analyze(dashboard, symbol, timeframe)
+
+            lanjut = await dashboard.read_line(term.bold_green + "Mau analisis lagi? (y/n): " + term.normal,
+                                               window='progress')
+            if lanjut.lower() != 'y':
+                break
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Binance Gemini Analyzer")
+    parser.add_argument('--watch', nargs='+', metavar='SYMBOL',
+                        help="Mode watchlist live untuk daftar symbol (tanpa prompt)")
+    parser.add_argument('--timeframes', nargs='+', default=['1h'], help="Timeframe watchlist, contoh: 1m 15m 1h")
+    parser.add_argument('--sort', default='score', choices=list(SORT_KEYS), help="Urutan awal tabel watchlist")
+    parser.add_argument('--limit', type=int, default=500, help="Jumlah candle per analisis watchlist")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah worker process (default: jumlah core)")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    # Log rich dari modul analisis akan menimpa layar dashboard, progres sudah tampil di window progress
+    for module in QUIET_MODULES:
+        module.console.quiet = True
+
+    # Ctrl+C membatalkan task ini (asyncio.run), jadi dashboard dipulihkan dan session HTTP tetap ditutup
+    try:
+        if args.watch:
+            await watch([symbol.upper() for symbol in args.watch], args.timeframes, args.sort, args.limit,
+                        args.workers)
+        else:
+            await interactive()
+    finally:
+        await close_http_client()
     print(term.clear)
     print(term.bold_cyan + "Makasih udah pake Binance Gemini Analyzer!" + term.normal)
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        asyncio.run(main(sys.argv[1:]))
     except KeyboardInterrupt:
         print(term.clear)
         print(term.bold_red + "\nProgram dihentikan oleh user. Dadah!" + term.normal)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Server lokal pengganti API Binance dan Gemini untuk test dan benchmark (tanpa internet)
+"""
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+from aiohttp import WSMsgType, web
+from binance_data import EXCHANGE_INFO_WEIGHT, INTERVAL_MS, KLINES_REQUEST_WEIGHT
+from request_scheduler import WEIGHT_HEADER
+
+# Weight per endpoint REST mock (sama dengan yang diasumsikan binance_data)
+ENDPOINT_WEIGHTS = {'/api/v3/klines': KLINES_REQUEST_WEIGHT, '/api/v3/exchangeInfo': EXCHANGE_INFO_WEIGHT}
+
+
+def mock_kline_rows(symbol, interval, open_times):
+    """Kline deterministik (format REST Binance) untuk daftar open time"""
+    interval_ms = INTERVAL_MS[interval]
+    offset = sum(ord(c) for c in symbol) % 97
+    base_price = 10 + offset * 37.5
+    rows = []
+    for open_time in open_times:
+        k = open_time // interval_ms
+        open_price = base_price * (1 + 0.05 * math.sin((k - 1 + offset) / 50) + 0.01 * math.sin((k - 1) / 7.3))
+        close_price = base_price * (1 + 0.05 * math.sin((k + offset) / 50) + 0.01 * math.sin(k / 7.3))
+        high = max(open_price, close_price) * (1 + 0.002 * (1 + math.sin(k / 3.1)))
+        low = min(open_price, close_price) * (1 - 0.002 * (1 + math.cos(k / 4.7)))
+        volume = 1000 + 500 * (1 + math.sin(k / 11.0))
+        rows.append([
+            open_time, f'{open_price:.8f}', f'{high:.8f}', f'{low:.8f}', f'{close_price:.8f}',
+            f'{volume:.8f}', open_time + interval_ms - 1, f'{volume * close_price:.8f}',
+            int(volume // 10), f'{volume * 0.6:.8f}', f'{volume * close_price * 0.6:.8f}', '0'
+        ])
+    return rows
+
+
+class MockBinanceState:
+    """Konfigurasi dan statistik server mock Binance"""
+
+    def __init__(self, now_ms=None, history_candles=5000, latency=0.0, symbols=None,
+                 stream_candles=0, stream_delay=0.0, stream_drop_after=None, stream_skip=(),
+                 weight_limit=None, weight_window=60.0, error_statuses=(), retry_after=None):
+        self.now_ms = now_ms
+        self.symbols = symbols or ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT', 'ETHBTC']
+        self.history_candles = history_candles
+        self.latency = latency
+        self.requests = 0
+        self.connections = set()
+        self.last_query = None
+
+        # WebSocket /stream: replay `stream_candles` candle setelah now_ms (now_ms ikut maju),
+        # putus setiap `stream_drop_after` candle, candle ke-i di `stream_skip` tidak dikirim
+        self.stream_candles = stream_candles
+        self.stream_delay = stream_delay
+        self.stream_drop_after = stream_drop_after
+        self.stream_skip = set(stream_skip)
+        self.streamed = 0
+        self.stream_connections = 0
+        self.stream_messages = 0
+        self.stream_queries = []
+
+        # Rate limit: weight per window (sejajar jam, seperti counter 1 menit Binance),
+        # request yang melebihi `weight_limit` dibalas 429. `error_statuses` dipakai
+        # berurutan untuk request-request pertama (misal [429, 500]).
+        self.weight_limit = weight_limit
+        self.weight_window = weight_window
+        self.error_statuses = list(error_statuses)
+        self.retry_after = retry_after
+        self.window_weights = Counter()
+        self.rate_limited = 0
+        self.request_log = []  # (waktu, path, status)
+
+    def current_time(self):
+        return self.now_ms if self.now_ms is not None else int(time.time() * 1000)
+
+
+async def _klines_handler(request):
+    state = request.app['state']
+    state.requests += 1
+    state.connections.add(request.transport.get_extra_info('peername'))
+    if state.latency:
+        await asyncio.sleep(state.latency)
+
+    query = request.query
+    state.last_query = dict(query)
+    symbol = query.get('symbol')
+    interval = query.get('interval')
+    if not symbol or interval not in INTERVAL_MS:
+        return web.json_response({'code': -1120, 'msg': 'Invalid interval.'}, status=400)
+
+    interval_ms = INTERVAL_MS[interval]
+    limit = min(int(query.get('limit', 500)), 1000)
+    last_open = state.current_time() // interval_ms * interval_ms
+    first_open = last_open - (state.history_candles - 1) * interval_ms
+
+    end_time = min(int(query['endTime']), last_open) if 'endTime' in query else last_open
+    if 'startTime' in query:
+        start_time = max(int(query['startTime']), first_open)
+        start_time = -(-start_time // interval_ms) * interval_ms
+        stop = min(end_time, start_time + (limit - 1) * interval_ms)
+    else:
+        stop = end_time // interval_ms * interval_ms
+        start_time = max(first_open, stop - (limit - 1) * interval_ms)
+
+    open_times = range(start_time, stop + 1, interval_ms) if start_time <= stop else []
+    return web.json_response(mock_kline_rows(symbol, interval, open_times))
+
+
+async def _exchange_info_handler(request):
+    state = request.app['state']
+    state.requests += 1
+    symbols = []
+    for symbol in state.symbols:
+        quote = next(q for q in ('USDT', 'BTC', 'BUSD', 'ETH') if symbol.endswith(q))
+        symbols.append({'symbol': symbol, 'status': 'TRADING',
+                        'baseAsset': symbol[:-len(quote)], 'quoteAsset': quote})
+    symbols.append({'symbol': 'OLDUSDT', 'status': 'BREAK', 'baseAsset': 'OLD', 'quoteAsset': 'USDT'})
+    return web.json_response({'timezone': 'UTC', 'symbols': symbols})
+
+
+def kline_event(row, symbol, interval, closed, event_time=None):
+    """Event kline WebSocket (format combined stream Binance) dari satu kline format REST"""
+    stream = f'{symbol.lower()}@kline_{interval}'
+    return {'stream': stream, 'data': {
+        'e': 'kline', 'E': event_time if event_time is not None else int(time.time() * 1000), 's': symbol,
+        'k': {'t': row[0], 'T': row[6], 's': symbol, 'i': interval, 'o': row[1], 'c': row[4],
+              'h': row[2], 'l': row[3], 'v': row[5], 'n': row[8], 'x': closed, 'q': row[7],
+              'V': row[9], 'Q': row[10], 'B': '0'},
+    }}
+
+
+async def _stream_handler(request):
+    """Replay kline lewat WebSocket combined stream (?streams=btcusdt@kline_1h/...)"""
+    state = request.app['state']
+    state.stream_connections += 1
+    streams = [name for name in request.query.get('streams', '').split('/') if name]
+    state.stream_queries.append(streams)
+    subscriptions = []
+    for name in streams:
+        symbol, _, interval = name.partition('@kline_')
+        subscriptions.append((symbol.upper(), interval))
+
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    interval_ms = INTERVAL_MS[subscriptions[0][1]] if subscriptions else 60_000
+
+    sent = 0
+    while state.streamed < state.stream_candles and not ws.closed:
+        if state.stream_delay:
+            await asyncio.sleep(state.stream_delay)
+        # Candle yang sedang berjalan selesai: waktu mock maju satu interval
+        open_time = state.current_time() // interval_ms * interval_ms
+        state.now_ms = open_time + interval_ms
+        sequence = state.streamed
+        state.streamed += 1
+        if sequence in state.stream_skip:
+            continue
+
+        for symbol, interval in subscriptions:
+            row = mock_kline_rows(symbol, interval, [open_time])[0]
+            await ws.send_json(kline_event(row, symbol, interval, closed=False))
+            await ws.send_json(kline_event(row, symbol, interval, closed=True))
+            state.stream_messages += 2
+
+        sent += 1
+        if state.stream_drop_after and sent >= state.stream_drop_after:
+            await ws.close()
+            return ws
+
+    # Semua candle sudah dikirim, tahan koneksi sampai client menutup
+    async for message in ws:
+        if message.type == WSMsgType.ERROR:
+            break
+    return ws
+
+
+@web.middleware
+async def _weight_middleware(request, handler):
+    """Hitung weight per window, kirim X-MBX-USED-WEIGHT-1M, tolak dengan 429 kalau melebihi limit"""
+    weight = ENDPOINT_WEIGHTS.get(request.path)
+    if weight is None:
+        return await handler(request)
+
+    state = request.app['state']
+    now = time.time()
+    window = int(now // state.weight_window)
+    state.window_weights[window] += weight
+    used = state.window_weights[window]
+    headers = {WEIGHT_HEADER: str(used)}
+
+    status = state.error_statuses.pop(0) if state.error_statuses else None
+    if status is None and state.weight_limit is not None and used > state.weight_limit:
+        status = 429
+        state.rate_limited += 1
+    if status is not None:
+        state.request_log.append((now, request.path, status))
+        if status in (429, 418):
+            retry_after = state.retry_after
+            if retry_after is None:
+                retry_after = (window + 1) * state.weight_window - now
+            headers['Retry-After'] = str(retry_after)
+        return web.json_response({'code': -1003, 'msg': 'Too many requests.'}, status=status, headers=headers)
+
+    response = await handler(request)
+    response.headers.update(headers)
+    state.request_log.append((now, request.path, response.status))
+    return response
+
+
+def create_binance_app(**kwargs):
+    """Buat aplikasi aiohttp yang meniru endpoint REST Binance (+ WebSocket /stream)"""
+    app = web.Application(middlewares=[_weight_middleware])
+    app['state'] = MockBinanceState(**kwargs)
+    app.router.add_get('/api/v3/klines', _klines_handler)
+    app.router.add_get('/api/v3/exchangeInfo', _exchange_info_handler)
+    app.router.add_get('/stream', _stream_handler)
+    return app
+
+
+class MockGeminiState:
+    """Konfigurasi dan statistik server mock Gemini.
+
+    `latency` boleh angka (detik) atau fungsi prompt -> detik, misal supaya symbol
+    tertentu lambat. Part yang diawali '### ' (request multi-symbol) dijawab per
+    section dengan header yang sama. `response` (fungsi prompt -> body JSON atau
+    None) mengganti jawaban normal, misal prompt yang diblokir safety filter.
+    """
+
+    def __init__(self, text='Analisis mock Gemini', latency=0.0, status=200, chunk_words=3, chunk_delay=0.0,
+                 stream_break_after=None, response=None, finish_reason='STOP'):
+        self.text = text
+        self.response = response
+        self.latency = latency
+        self.status = status
+        # Endpoint streaming: teks dipecah per `chunk_words` kata, jeda `chunk_delay` antar event,
+        # koneksi diputus setelah `stream_break_after` event (None = selesai normal),
+        # event terakhir membawa `finish_reason` (misal 'MAX_TOKENS' untuk jawaban terpotong)
+        self.chunk_words = chunk_words
+        self.chunk_delay = chunk_delay
+        self.stream_break_after = stream_break_after
+        self.finish_reason = finish_reason
+        self.requests = 0
+        self.prompts = []
+        self.inflight = 0
+        self.max_inflight = 0
+
+
+def _mock_gemini_text(state, parts):
+    headers = [part.split('\n', 1)[0] for part in parts if part.startswith('### ')]
+    if not headers:
+        return state.text
+    return '\n\n'.join(f'{header}\n{state.text}' for header in headers)
+
+
+async def _generate_content_handler(request):
+    state = request.app['state']
+    state.requests += 1
+    state.inflight += 1
+    state.max_inflight = max(state.max_inflight, state.inflight)
+    try:
+        payload = await request.json()
+        parts = [part['text'] for part in payload['contents'][0]['parts']]
+        prompt = '\n'.join(parts)
+        state.prompts.append(prompt)
+        latency = state.latency(prompt) if callable(state.latency) else state.latency
+        if latency:
+            await asyncio.sleep(latency)
+    finally:
+        state.inflight -= 1
+    if state.status != 200:
+        return web.json_response({'error': {'code': state.status, 'message': 'Mock error'}}, status=state.status)
+    body = state.response(prompt) if state.response else None
+    if body is not None:
+        return web.json_response(body)
+    text = _mock_gemini_text(state, parts)
+    return web.json_response({'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}]})
+
+
+def stream_chunks(text, words):
+    """Pecah teks jadi potongan `words` kata (spasi ikut potongan) seperti token streaming"""
+    tokens = text.split(' ')
+    return [' '.join(tokens[i:i + words]) + (' ' if i + words < len(tokens) else '')
+            for i in range(0, len(tokens), words)]
+
+
+async def _stream_generate_content_handler(request):
+    """streamGenerateContent?alt=sse: satu event 'data: {json}' per potongan teks, chunked transfer"""
+    state = request.app['state']
+    state.requests += 1
+    payload = await request.json()
+    state.prompts.append('\n'.join(part['text'] for part in payload['contents'][0]['parts']))
+    latency = state.latency(state.prompts[-1]) if callable(state.latency) else state.latency
+    if latency:
+        await asyncio.sleep(latency)
+    if state.status != 200:
+        return web.json_response({'error': {'code': state.status, 'message': 'Mock error'}}, status=state.status)
+
+    response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    chunks = stream_chunks(state.text, state.chunk_words)
+    for index, chunk in enumerate(chunks):
+        if state.stream_break_after is not None and index >= state.stream_break_after:
+            # Putus di tengah jalan: event setengah jadi lalu koneksi ditutup
+            await response.write(b'data: {"candidates": [')
+            request.transport.close()
+            return response
+        event = {'candidates': [{'content': {'parts': [{'text': chunk}], 'role': 'model'}}]}
+        await response.write(f'data: {json.dumps(event)}\r\n\r\n'.encode())
+        if state.chunk_delay:
+            await asyncio.sleep(state.chunk_delay)
+    final = {'candidates': [{'content': {'parts': [], 'role': 'model'}, 'finishReason': state.finish_reason}]}
+    await response.write(f'data: {json.dumps(final)}\r\n\r\n'.encode())
+    await response.write_eof()
+    return response
+
+
+def create_gemini_app(**kwargs):
+    """Buat aplikasi aiohttp yang meniru endpoint generateContent Gemini"""
+    app = web.Application()
+    app['state'] = MockGeminiState(**kwargs)
+    app.router.add_post('/v1beta/models/{model}:generateContent', _generate_content_handler)
+    app.router.add_post('/v1beta/models/{model}:streamGenerateContent', _stream_generate_content_handler)
+    return app
+
+
+async def start_server(app, host='127.0.0.1', port=0):
+    """Jalankan app di port bebas, return (runner, base_url)"""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://{host}:{port}'
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import joblib
+from rich.console import Console
+from config import MODEL_DIR
+from indicators import as_frame
+from trading_signals import TradingSignalEngine
+
+console = Console()
+
+# Naikkan kalau definisi fitur berubah tanpa ganti nama kolom, supaya model lama tidak dipakai lagi
+# (2: Trend_Strength jadi rolling regression, bukan satu nilai untuk seluruh seri)
+FEATURE_VERSION = 2
+
+
+def feature_schema_hash(features):
+    """Hash pendek dari daftar fitur (urutan ikut dihitung) dan FEATURE_VERSION"""
+    return hashlib.sha1('|'.join([f'v{FEATURE_VERSION}', *features]).encode()).hexdigest()[:12]
+
+
+class ModelRegistry:
+    """Registry TradingSignalEngine per (symbol, timeframe, schema fitur).
+
+    Model di-fit sekali, disimpan ke disk, di-load saat pertama dibutuhkan,
+    dan engine di memori dibatasi dengan LRU (file di disk tetap ada).
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, max_models=32):
+        self.model_dir = model_dir
+        self.max_models = max_models
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        symbol, timeframe, schema = key
+        return os.path.join(self.model_dir, f'{symbol.upper()}_{timeframe}_{schema}.joblib')
+
+    def _remember(self, key, engine):
+        with self._lock:
+            self._engines[key] = engine
+            self._engines.move_to_end(key)
+            while len(self._engines) > self.max_models:
+                self._engines.popitem(last=False)
+
+    def _load(self, key, features):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            saved = joblib.load(path)
+        except Exception as e:
+            console.log(f"[yellow]⚠️ Model {path} tidak bisa dibaca ({e}), training ulang[/yellow]")
+            return None
+        if saved.get('features') != features:
+            return None
+
+        engine = TradingSignalEngine()
+        engine.scaler = saved['scaler']
+        engine.model = saved['model']
+        engine.is_trained = True
+        console.log(f"[green]📦 Model {key[0]} {key[1]} di-load dari disk[/green]")
+        return engine
+
+    def _save(self, key, engine, features):
+        os.makedirs(self.model_dir, exist_ok=True)
+        path = self.path(key)
+        # Tulis ke file sementara lalu rename supaya proses lain tidak membaca file setengah jadi
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        joblib.dump({'scaler': engine.scaler, 'model': engine.model, 'features': features}, temp_path)
+        os.replace(temp_path, path)
+
+    def get_engine(self, symbol, timeframe, data, retrain=False):
+        """Engine yang sudah di-fit untuk symbol/timeframe ini (training hanya kalau belum ada)"""
+        df = as_frame(data)
+        engine = TradingSignalEngine()
+        features = engine.feature_columns(df)
+        key = (symbol, timeframe, feature_schema_hash(features))
+
+        if not retrain:
+            with self._lock:
+                cached = self._engines.get(key)
+                if cached is not None:
+                    self._engines.move_to_end(key)
+                    return cached
+
+            loaded = self._load(key, features)
+            if loaded is not None:
+                self._remember(key, loaded)
+                return loaded
+
+        engine.train_model(df)
+        if engine.is_trained:
+            self._save(key, engine, features)
+            self._remember(key, engine)
+        # Engine yang belum ter-training tidak di-cache, biar data berikutnya bisa dipakai training
+        return engine
+
+    def generate_trading_recommendation(self, data, symbol, timeframe):
+        """Shortcut: ambil engine dari registry lalu generate rekomendasi"""
+        if len(as_frame(data)) == 0:
+            return {"error": "No data available"}
+        engine = self.get_engine(symbol, timeframe, data)
+        return engine.generate_trading_recommendation(data, symbol, timeframe)
+
+    def predict_latest_batch(self, items):
+        """Prediksi bar terakhir untuk [(symbol, timeframe, data), ...].
+
+        Item yang memakai engine yang sama diprediksi dalam satu predict_proba.
+        Return list (ml_signal, ml_confidence) sesuai urutan items.
+        """
+        groups = {}
+        for index, (symbol, timeframe, data) in enumerate(items):
+            engine = self.get_engine(symbol, timeframe, data)
+            groups.setdefault(id(engine), (engine, []))[1].append(index)
+
+        results = [(0, 0)] * len(items)
+        for engine, indexes in groups.values():
+            if not engine.is_trained:
+                continue
+            predictions = engine.predict_latest_batch([items[i][2] for i in indexes])
+            for index, prediction in zip(indexes, predictions):
+                results[index] = prediction
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._engines.clear()
+
+
+# Global instance
+model_registry = ModelRegistry()
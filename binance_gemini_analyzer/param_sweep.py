@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Optimasi parameter indikator per symbol/timeframe (grid / random search + backtest)
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from rich.console import Console
+from rich.progress import Progress
+import backtest
+import indicators
+from backtest import atr_multiplier_for, entry_directions, simulate_trades, summarize_trades
+from binance_data import DEFAULT_KLINE_COLUMNS, INTERVAL_MS, get_historical_klines
+from http_client import close_http_client
+from indicators import detect_candlestick_patterns, get_indicator_params, klines_to_frame, tuned_params_path
+from window_kernels import RollingExtrema
+
+console = Console()
+
+# Parameter yang dioptimasi (sisanya tetap dari get_indicator_params)
+SEARCH_SPACE = {
+    'rsi_period': [7, 14, 21],
+    'rsi_oversold': [25, 30, 35],
+    'rsi_overbought': [65, 70, 75],
+    'ema_fast': [6, 12, 21],
+    'ema_slow': [13, 26, 55],
+    'macd_signal': [4, 9, 13],
+    'bb_period': [10, 20, 50],
+    'bb_std': [2, 2.5],
+    'stoch_k': [5, 14, 21],
+    'stoch_d': [3, 7],
+    'williams_period': [7, 14, 21],
+    'adx_period': [7, 14, 21],
+    'atr_period': [7, 14, 21],
+}
+
+
+def _shift(values):
+    """Sama dengan Series.shift(1): NaN di posisi pertama"""
+    return np.concatenate([[np.nan], values[:-1]])
+
+
+class RollingCache:
+    """Intermediate indikator yang dipakai bersama oleh semua kandidat parameter.
+
+    Rolling mean/std dihitung dari prefix sum (sekali per seri, O(1) per window),
+    EMA / rolling max-min / seri turunan di-memoize per window atau span, jadi
+    kandidat yang berbagi parameter tidak menghitung ulang. `stats` mencatat
+    berapa kali tiap jenis intermediate benar-benar dihitung.
+    """
+
+    def __init__(self, klines, timeframe):
+        df = klines_to_frame(klines)
+        self.timeframe = timeframe
+        self.defaults = get_indicator_params(timeframe)
+        self.n = len(df)
+        self.high = df['high'].to_numpy(dtype=float)
+        self.low = df['low'].to_numpy(dtype=float)
+        self.close = df['close'].to_numpy(dtype=float)
+        self.stats = Counter()
+        self._prefix = {}
+        self._memo = {}
+
+        prev_close = _shift(self.close)
+        with np.errstate(invalid='ignore'):
+            self.series = {
+                'close': self.close,
+                'tr': np.maximum(self.high - self.low,
+                                 np.maximum(np.abs(self.high - prev_close), np.abs(self.low - prev_close))),
+            }
+            delta = np.diff(self.close, prepend=np.nan)
+            self.series['gain'] = np.where(delta > 0, delta, 0.0)
+            self.series['loss'] = np.where(delta < 0, -delta, 0.0)
+            high_diff = np.diff(self.high, prepend=np.nan)
+            low_diff = np.diff(self.low, prepend=np.nan)
+            self.series['plus_dm'] = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0.0)
+            self.series['minus_dm'] = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0.0)
+
+        patterns = detect_candlestick_patterns(df[['open', 'high', 'low', 'close']].copy())
+        self.bullish_pattern = (patterns['Hammer'] | patterns['Bullish_Engulfing']).to_numpy()
+        self.bearish_pattern = (patterns['Shooting_Star'] | patterns['Bearish_Engulfing']).to_numpy()
+
+    def _cached(self, kind, key, compute):
+        memo_key = (kind, key)
+        if memo_key not in self._memo:
+            self.stats[kind] += 1
+            self._memo[memo_key] = compute()
+        return self._memo[memo_key]
+
+    def _prefix_sums(self, name):
+        """Prefix sum nilai, nilai kuadrat, dan jumlah NaN (seri dipusatkan supaya presisi terjaga)"""
+        if name not in self._prefix:
+            self.stats['prefix'] += 1
+            values = self.series[name]
+            missing = np.isnan(values)
+            offset = float(np.nanmean(values)) if (~missing).any() else 0.0
+            centered = np.where(missing, 0.0, values - offset)
+            self._prefix[name] = (
+                offset,
+                np.concatenate([[0.0], np.cumsum(centered)]),
+                np.concatenate([[0.0], np.cumsum(centered * centered)]),
+                np.concatenate([[0], np.cumsum(missing)]),
+            )
+        return self._prefix[name]
+
+    def _window_sums(self, name, window):
+        offset, sums, squares, missing = self._prefix_sums(name)
+        total = sums[window:] - sums[:-window]
+        total_sq = squares[window:] - squares[:-window]
+        # Sama dengan rolling(window) pandas: window yang mengandung NaN hasilnya NaN
+        valid = (missing[window:] - missing[:-window]) == 0
+        return offset, total, total_sq, valid
+
+    def rolling_mean(self, name, window):
+        def compute():
+            result = np.full(self.n, np.nan)
+            if self.n >= window:
+                offset, total, _, valid = self._window_sums(name, window)
+                result[window - 1:] = np.where(valid, total / window + offset, np.nan)
+            return result
+        return self._cached('mean', (name, window), compute)
+
+    def rolling_std(self, name, window):
+        def compute():
+            result = np.full(self.n, np.nan)
+            if self.n >= window > 1:
+                _, total, total_sq, valid = self._window_sums(name, window)
+                variance = np.maximum((total_sq - total * total / window) / (window - 1), 0.0)
+                result[window - 1:] = np.where(valid, np.sqrt(variance), np.nan)
+            return result
+        return self._cached('std', (name, window), compute)
+
+    def rolling_extremum(self, values_name, window, kind):
+        def compute():
+            extrema = self._cached('extrema', (values_name, kind),
+                                   lambda: RollingExtrema(self.high if values_name == 'high' else self.low, kind))
+            return extrema.window(window)
+        return self._cached('extremum', (values_name, window, kind), compute)
+
+    def ema(self, span):
+        return self._cached('ema', span, lambda: pd.Series(self.close).ewm(span=span, adjust=False).mean().to_numpy())
+
+    def macd(self, fast, slow, signal):
+        def compute():
+            line = self.ema(fast) - self.ema(slow)
+            return line, pd.Series(line).ewm(span=signal, adjust=False).mean().to_numpy()
+        return self._cached('macd', (fast, slow, signal), compute)
+
+    def _derived(self, name, key, compute):
+        """Seri turunan (misal %K, DX) juga masuk prefix sum supaya rolling mean-nya O(1) per window"""
+        series_name = (name, key)
+        if series_name not in self.series:
+            self.stats[name] += 1
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.series[series_name] = compute()
+        return series_name
+
+    def rsi(self, period):
+        def compute():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rs = self.rolling_mean('gain', period) / self.rolling_mean('loss', period)
+                return 100 - (100 / (1 + rs))
+        return self._cached('rsi', period, compute)
+
+    def stochastic(self, k_period, d_period):
+        def percent_k():
+            lowest = self.rolling_extremum('low', k_period, 'min')
+            highest = self.rolling_extremum('high', k_period, 'max')
+            return (self.close - lowest) / (highest - lowest) * 100
+
+        k_name = self._derived('stoch_k', k_period, percent_k)
+        return self.series[k_name], self.rolling_mean(k_name, d_period)
+
+    def williams_r(self, period):
+        def compute():
+            highest = self.rolling_extremum('high', period, 'max')
+            lowest = self.rolling_extremum('low', period, 'min')
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return (highest - self.close) / (highest - lowest) * -100
+        return self._cached('williams', period, compute)
+
+    def adx(self, period):
+        def directional():
+            tr_mean = self.rolling_mean('tr', period)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                plus_di = 100 * (self.rolling_mean('plus_dm', period) / tr_mean)
+                minus_di = 100 * (self.rolling_mean('minus_dm', period) / tr_mean)
+            return plus_di, minus_di
+
+        plus_di, minus_di = self._cached('di', period, directional)
+        dx_name = self._derived('dx', period, lambda: 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di))
+        return self.rolling_mean(dx_name, period), plus_di, minus_di
+
+    def signal_score(self, params):
+        """Signal_Score per bar, aturan sama dengan node indicators.signal_score"""
+        close = self.close
+        buy = np.zeros(self.n, dtype=np.int64)
+        sell = np.zeros(self.n, dtype=np.int64)
+
+        with np.errstate(invalid='ignore'):
+            rsi = self.rsi(params['rsi_period'])
+            buy += rsi < params['rsi_oversold']
+            sell += rsi > params['rsi_overbought']
+
+            macd, macd_signal = self.macd(params['ema_fast'], params['ema_slow'], params['macd_signal'])
+            prev_macd, prev_signal = _shift(macd), _shift(macd_signal)
+            buy += 2 * ((macd > macd_signal) & (prev_macd <= prev_signal))
+            sell += 2 * ((macd < macd_signal) & (prev_macd >= prev_signal))
+
+            percent_k, percent_d = self.stochastic(params['stoch_k'], params['stoch_d'])
+            buy += (percent_k < params['stoch_oversold']) & (percent_k > percent_d)
+            sell += (percent_k > params['stoch_overbought']) & (percent_k < percent_d)
+
+            fast, slow = self.ema(params['ema_fast']), self.ema(params['ema_slow'])
+            prev_fast, prev_slow = _shift(fast), _shift(slow)
+            buy += 2 * ((fast > slow) & (prev_fast <= prev_slow))
+            sell += 2 * ((fast < slow) & (prev_fast >= prev_slow))
+
+            middle = self.rolling_mean('close', params['bb_period'])
+            width = self.rolling_std('close', params['bb_period']) * params['bb_std']
+            buy += close < middle - width
+            sell += close > middle + width
+
+            williams = self.williams_r(params['williams_period'])
+            buy += williams < -80
+            sell += williams > -20
+
+            adx, plus_di, minus_di = self.adx(params['adx_period'])
+            strong_trend = adx > 25
+            buy += strong_trend & (plus_di > minus_di)
+            sell += strong_trend & (plus_di < minus_di)
+
+        buy += self.bullish_pattern
+        sell += self.bearish_pattern
+        return np.clip(buy - sell, -10, 10)
+
+    def evaluate(self, params, threshold=1.0, max_holding=48, fee_rate=0.001, allow_overlap=False):
+        """Backtest satu kandidat parameter, hasilnya sama dengan
+        run_backtest(calculate_indicators(klines, timeframe, params), use_ml=False)"""
+        params = {**self.defaults, **params}
+        score = self.signal_score(params)
+        atr = self.rolling_mean('tr', params['atr_period'])
+
+        # Trim awal data seperti calculate_indicators, lalu fillna(0)
+        min_periods = max(params.get('sma_slow', 50), params.get('bb_period', 20))
+        start = min_periods if self.n > min_periods else 0
+        atr = np.where(np.isnan(atr[start:]), 0.0, atr[start:])
+
+        direction = entry_directions(score[start:], threshold=threshold)
+        trades = simulate_trades(self.close[start:], self.high[start:], self.low[start:], atr, direction,
+                                 atr_multiplier=atr_multiplier_for(self.timeframe), max_holding=max_holding,
+                                 fee_rate=fee_rate, allow_overlap=allow_overlap)
+        return summarize_trades(trades)
+
+
+def candidate_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def is_valid_candidate(params):
+    """Buang kombinasi yang tidak masuk akal (EMA cepat >= EMA lambat, dsb)"""
+    if params.get('ema_fast', 0) >= params.get('ema_slow', float('inf')):
+        return False
+    if params.get('rsi_oversold', 0) >= params.get('rsi_overbought', 100):
+        return False
+    return True
+
+
+def grid_candidates(space=None):
+    """Semua kombinasi valid dari search space"""
+    space = space or SEARCH_SPACE
+    names = list(space)
+    candidates = (dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names)))
+    return [params for params in candidates if is_valid_candidate(params)]
+
+
+def random_candidates(count, space=None, seed=42):
+    """Sampel acak kombinasi valid (tanpa duplikat) dari search space"""
+    space = space or SEARCH_SPACE
+    rng = random.Random(seed)
+    seen = {}
+    attempts = 0
+    while len(seen) < count and attempts < count * 50:
+        attempts += 1
+        params = {name: rng.choice(values) for name, values in space.items()}
+        if is_valid_candidate(params):
+            seen.setdefault(candidate_key(params), params)
+    return list(seen.values())
+
+
+def _data_fingerprint(klines):
+    df = klines_to_frame(klines)
+    return {'bars': len(df), 'last_timestamp': int(df['timestamp'].iloc[-1]) if len(df) else 0}
+
+
+def load_checkpoint(path, symbol, timeframe, fingerprint):
+    """Hasil kandidat dari sweep sebelumnya (kosong kalau data/symbol berbeda)"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (OSError, ValueError) as e:
+        console.log(f"[yellow]⚠️ Checkpoint {path} tidak bisa dibaca ({e}), mulai dari awal[/yellow]")
+        return {}
+    if (saved.get('symbol'), saved.get('timeframe'), saved.get('data')) != (symbol, timeframe, fingerprint):
+        console.log("[yellow]⚠️ Checkpoint untuk data lain, mulai dari awal[/yellow]")
+        return {}
+    return saved.get('results', {})
+
+
+def _write_json(path, payload):
+    """Tulis ke file sementara lalu rename supaya file tidak pernah setengah jadi"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def save_checkpoint(path, symbol, timeframe, fingerprint, results):
+    _write_json(path, {'symbol': symbol, 'timeframe': timeframe, 'data': fingerprint, 'results': results})
+
+
+def save_best_params(symbol, timeframe, params, metrics, params_dir=None):
+    """Simpan parameter terbaik supaya dipakai calculate_indicators(..., symbol=symbol)"""
+    path = tuned_params_path(symbol, timeframe, params_dir)
+    _write_json(path, {'symbol': symbol, 'timeframe': timeframe, 'params': params,
+                       'metrics': metrics, 'updated_at': int(time.time())})
+    return path
+
+
+_worker_cache = None
+
+
+def _init_worker(klines, timeframe):
+    """Worker membangun RollingCache sekali, dipakai untuk semua kandidat yang diterimanya"""
+    global _worker_cache
+    indicators.console.quiet = True
+    backtest.console.quiet = True
+    console.quiet = True
+    _worker_cache = RollingCache(klines, timeframe)
+
+
+def _evaluate_chunk(chunk, backtest_kwargs):
+    return [(params, _worker_cache.evaluate(params, **backtest_kwargs)) for params in chunk]
+
+
+def rank_candidates(results, metric='total_r', min_trades=10):
+    """Hasil sweep terurut dari metric terbaik, kandidat dengan trade < min_trades ditaruh paling bawah"""
+    return sorted(results.values(),
+                  key=lambda entry: (entry['metrics']['trades'] >= min_trades, entry['metrics'][metric]),
+                  reverse=True)
+
+
+def run_sweep(symbol, timeframe, klines, candidates, workers=None, checkpoint_path=None,
+              metric='total_r', min_trades=10, chunk_size=8, **backtest_kwargs):
+    """Backtest semua kandidat di process pool, bisa dilanjutkan dari checkpoint.
+
+    Return (DataFrame hasil terurut, {'params', 'metrics'} kandidat terbaik atau
+    None kalau tidak ada kandidat dengan trade >= min_trades).
+    """
+    fingerprint = _data_fingerprint(klines)
+    results = load_checkpoint(checkpoint_path, symbol, timeframe, fingerprint)
+    pending = [params for params in candidates if candidate_key(params) not in results]
+    console.log(f"[cyan]🔧 Sweep {symbol} {timeframe}: {len(candidates)} kandidat, "
+                f"{len(candidates) - len(pending)} dari checkpoint, {len(pending)} dihitung[/cyan]")
+
+    if pending:
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(klines, timeframe)) as pool, Progress(console=console) as progress:
+            task = progress.add_task("Backtest kandidat", total=len(pending))
+            futures = [pool.submit(_evaluate_chunk, chunk, backtest_kwargs) for chunk in chunks]
+            for future in as_completed(futures):
+                evaluated = future.result()
+                for params, metrics in evaluated:
+                    results[candidate_key(params)] = {'params': params, 'metrics': metrics}
+                progress.advance(task, len(evaluated))
+                if checkpoint_path:
+                    save_checkpoint(checkpoint_path, symbol, timeframe, fingerprint, results)
+
+    ranked = rank_candidates(results, metric, min_trades)
+    table = pd.DataFrame([{**entry['params'], **entry['metrics']} for entry in ranked])
+    if not ranked or ranked[0]['metrics']['trades'] < min_trades:
+        return table, None
+    return table, ranked[0]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Optimasi parameter indikator Binance Gemini Analyzer")
+    parser.add_argument('symbol', help="Symbol, contoh: BTCUSDT")
+    parser.add_argument('interval', help="Timeframe, contoh: 1h")
+    parser.add_argument('--days', type=int, default=180, help="Panjang history yang di-backtest (hari)")
+    parser.add_argument('--samples', type=int, default=200, help="Jumlah kandidat acak (0 = full grid)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed random search")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah worker process (default: jumlah core)")
+    parser.add_argument('--metric', default='total_r', help="Kolom hasil backtest yang dimaksimalkan")
+    parser.add_argument('--min-trades', type=int, default=20, help="Minimal jumlah trade agar kandidat valid")
+    parser.add_argument('--checkpoint', default=None, help="File checkpoint (default: di samping file parameter)")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    symbol = args.symbol.upper()
+    if args.interval not in INTERVAL_MS:
+        console.log(f"[bold red]Timeframe {args.interval} tidak dikenal[/bold red]")
+        return None
+
+    start_time = int(time.time() * 1000) - args.days * 86_400_000
+    try:
+        klines = await get_historical_klines(symbol, args.interval, start_time, as_array=True,
+                                             columns=DEFAULT_KLINE_COLUMNS)
+    finally:
+        await close_http_client()
+    if klines is None or len(klines) == 0:
+        console.log("[bold red]Gagal ngambil history kline[/bold red]")
+        return None
+
+    candidates = random_candidates(args.samples, seed=args.seed) if args.samples else grid_candidates()
+    checkpoint = args.checkpoint or tuned_params_path(symbol, args.interval).replace('.json', '.checkpoint.json')
+    table, best = run_sweep(symbol, args.interval, klines, candidates, workers=args.workers,
+                            checkpoint_path=checkpoint, metric=args.metric, min_trades=args.min_trades)
+    if best is None:
+        console.log(f"[yellow]⚠️ Tidak ada kandidat dengan minimal {args.min_trades} trade[/yellow]")
+        return None
+
+    console.print(table.head(10).to_string(index=False))
+    path = save_best_params(symbol, args.interval, best['params'], best['metrics'])
+    console.log(f"[bold green]✅ Parameter terbaik disimpan ke {path}[/bold green]")
+    return best['params']
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        console.print("[bold red]\nSweep dihentikan oleh user (lanjutkan dari checkpoint).[/bold red]")
@@ -0,0 +1,208 @@
+"""
+Prompt builder ringkas untuk analisis Gemini.
+
+Nilai dirender dengan presisi tetap (tidak ada float mentah 17 digit), riwayat
+candle terakhir ditulis sebagai tabel CSV kecil, dan ukuran prompt dijaga di
+bawah budget token. Bagian template yang tidak berubah dibangun sekali saat import.
+"""
+import math
+import time
+from collections import Counter
+import numpy as np
+from rich.console import Console
+from config import PROMPT_HISTORY_ROWS, PROMPT_TOKEN_BUDGET
+from indicators import as_frame
+
+console = Console()
+
+# Rata-rata ~4 karakter per token untuk tokenizer Gemini (cukup untuk budget, bukan untuk billing)
+CHARS_PER_TOKEN = 4
+
+CANDLESTICK_PATTERNS = ('Doji', 'Hammer', 'Shooting_Star', 'Bullish_Engulfing', 'Bearish_Engulfing')
+
+# Instruksi format jawaban: sama untuk semua request, jadi cukup dibangun sekali
+INSTRUCTIONS = '\n'.join([
+    "Tulis analisis dalam Bahasa Indonesia dengan format:",
+    "1. RINGKASAN: kondisi pasar + rekomendasi utama",
+    "2. TEKNIKAL: trend multi-timeframe, momentum (RSI/MACD/Stochastic), volatilitas (Bollinger/ATR), "
+    "volume (VWAP), ADX/CCI/Williams %R",
+    "3. ML: interpretasi sinyal dan confidence",
+    "4. STRATEGI: entry, exit (TP/SL), ukuran posisi (% portfolio), manajemen risiko",
+    "5. RISIKO: level (Low/Medium/High), risiko utama, kondisi pasar",
+    "6. OUTLOOK: jangka pendek dan menengah",
+    "7. TIPS eksekusi",
+    "Objektif, berbasis data, actionable.",
+])
+
+
+
+class PromptBudgetError(ValueError):
+    """Prompt tanpa riwayat candle pun masih melebihi budget token (retry tidak akan membantu)"""
+
+
+HISTORY_COLUMNS = ('waktu', 'close', 'chg%', 'rsi', 'macd', 'vol', 'skor')
+HISTORY_HEADER = ','.join(HISTORY_COLUMNS)
+
+
+def estimate_tokens(text):
+    """Perkiraan jumlah token prompt dari panjang teks"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def format_price(value):
+    """Harga dengan ~6 angka penting tanpa notasi eksponen (45123.45, 0.0000123400)"""
+    value = _number(value)
+    if value is None:
+        return '-'
+    if value == 0:
+        return '0'
+    decimals = max(2, 5 - math.floor(math.log10(abs(value))))
+    return f'{value:.{decimals}f}'
+
+
+def fixed(decimals):
+    """Formatter angka dengan jumlah desimal tetap"""
+    def render(value):
+        value = _number(value)
+        return '-' if value is None else f'{value:.{decimals}f}'
+    return render
+
+
+def significant(digits):
+    """Formatter angka dengan `digits` angka penting tanpa notasi eksponen (MACD bisa 1e-6 sampai 1e3)"""
+    def render(value):
+        value = _number(value)
+        if value is None:
+            return '-'
+        if value == 0:
+            return '0'
+        decimals = max(0, digits - 1 - math.floor(math.log10(abs(value))))
+        return f'{value:.{decimals}f}'
+    return render
+
+
+def text(value):
+    return '-' if value is None else str(value)
+
+
+# Baris data per request: (label, [(nama, sumber, key, formatter)]). sumber 'latest' = candle
+# terakhir, 'rec' = rekomendasi; key latest punya fallback ke field rekomendasi (job scanner).
+LINES = (
+    ('HARGA', [('close', 'latest', ('close', 'price'), format_price),
+               ('skor', 'latest', ('Signal_Score', 'signal_score'), text),
+               ('sinyal', 'latest', ('Recommendation',), text)]),
+    ('MOMENTUM', [('RSI', 'latest', ('RSI', 'current_rsi'), fixed(1)),
+                  ('MACD', 'latest', ('MACD', 'current_macd'), significant(4)),
+                  ('ADX', 'latest', ('ADX',), fixed(1)),
+                  ('W%R', 'latest', ('Williams_R',), fixed(1)),
+                  ('CCI', 'latest', ('CCI',), fixed(0)),
+                  ('tren', 'latest', ('Trend_Strength', 'trend_strength'), significant(3))]),
+    ('ML', [('sinyal', 'rec', ('ml_signal',), text),
+            ('conf%', 'rec', ('ml_confidence',), fixed(1)),
+            ('skor teknikal', 'rec', ('technical_score',), text)]),
+    ('REKOMENDASI', [('action', 'rec', ('action',), text),
+                     ('conf%', 'rec', ('confidence',), fixed(1)),
+                     ('entry', 'rec', ('entry_price',), format_price),
+                     ('SL', 'rec', ('stop_loss',), format_price),
+                     ('TP1', 'rec', ('take_profit_1',), format_price),
+                     ('TP2', 'rec', ('take_profit_2',), format_price),
+                     ('R:R', 'rec', ('risk_reward_ratio',), fixed(2))]),
+    ('LEVEL', [('support', 'rec', ('support',), format_price),
+               ('resistance', 'rec', ('resistance',), format_price),
+               ('volatilitas%', 'rec', ('volatility',), fixed(2)),
+               ('ATR%', 'rec', ('atr_percent',), fixed(2))]),
+)
+# Template baris data dirakit sekali dari LINES, tiap request tinggal mengisi nilai
+MARKET_TEMPLATE = '\n'.join(f"{label}: {' | '.join(f'{name} {{}}' for name, _, _, _ in fields)}"
+                             for label, fields in LINES)
+MARKET_FIELDS = tuple((source, keys, render) for _, fields in LINES for _, source, keys, render in fields)
+
+
+class PromptBuilder:
+    """Bangun prompt analisis dengan presisi tetap, tabel riwayat, dan budget token.
+
+    Kalau prompt melebihi `token_budget`, tabel riwayat dipangkas (dibagi dua)
+    sampai muat; kalau tanpa riwayat pun masih lewat, ValueError. Ukuran prompt
+    terakhir ada di `last_tokens`, total per sesi di `stats`.
+    """
+
+    def __init__(self, token_budget=PROMPT_TOKEN_BUDGET, history_rows=PROMPT_HISTORY_ROWS):
+        self.token_budget = token_budget
+        self.history_rows = history_rows
+        self.last_tokens = 0
+        self.stats = Counter()
+
+    @staticmethod
+    def _value(latest, recommendation, source, keys):
+        if source == 'rec':
+            return recommendation.get(keys[0])
+        for key in keys:
+            if latest.get(key) is not None:
+                return latest[key]
+        return recommendation.get(keys[-1]) if len(keys) > 1 else None
+
+    def market_block(self, symbol, timeframe, latest, recommendation, title=None):
+        """Ringkasan pasar satu symbol (tanpa riwayat dan instruksi)"""
+        latest = latest or {}
+        values = [render(self._value(latest, recommendation, source, keys)) for source, keys, render in MARKET_FIELDS]
+        patterns = [name for name in CANDLESTICK_PATTERNS if latest.get(name)]
+        return (f"{title or f'ANALISIS TRADING {symbol} {timeframe}'}\n{MARKET_TEMPLATE.format(*values)}\n"
+                f"POLA: {', '.join(patterns) if patterns else '-'}")
+
+    def history_table(self, data, rows):
+        """Tabel CSV `rows` candle terakhir (lama -> baru), string kosong kalau tidak ada data"""
+        df = as_frame(data) if data is not None else None
+        if rows <= 0 or df is None or len(df) == 0:
+            return ''
+        # Satu candle ekstra di depan hanya untuk menghitung chg% baris pertama
+        tail = df.iloc[-(rows + 1):]
+        close = tail['close'].to_numpy(dtype=float)
+        change = np.full(len(close), np.nan)
+        change[1:] = (close[1:] / close[:-1] - 1) * 100
+        first = 1 if len(tail) > rows else 0
+
+        columns = {name: tail[name].to_numpy() if name in tail else [None] * len(tail)
+                   for name in ('timestamp', 'RSI', 'MACD', 'volume', 'Signal_Score')}
+        render_change, render_rsi, render_macd, render_volume = fixed(2), fixed(1), significant(3), significant(4)
+        lines = [f'RIWAYAT {len(tail) - first} candle terakhir (lama -> baru):', HISTORY_HEADER]
+        for i in range(first, len(tail)):
+            timestamp = _number(columns['timestamp'][i])
+            when = time.strftime('%m-%d %H:%M', time.gmtime(timestamp / 1000)) if timestamp is not None else '-'
+            lines.append(','.join((when, format_price(close[i]), render_change(change[i]),
+                                   render_rsi(columns['RSI'][i]), render_macd(columns['MACD'][i]),
+                                   render_volume(columns['volume'][i]), text(columns['Signal_Score'][i]))))
+        return '\n'.join(lines)
+
+    def build(self, symbol, timeframe, latest, recommendation, history=None):
+        """Prompt lengkap: ringkasan pasar + riwayat (opsional) + instruksi, dijaga di bawah budget"""
+        core = self.market_block(symbol, timeframe, latest, recommendation)
+        rows = self.history_rows if history is not None else 0
+        while True:
+            table = self.history_table(history, rows)
+            prompt = '\n\n'.join(part for part in (core, table, INSTRUCTIONS) if part)
+            tokens = estimate_tokens(prompt)
+            if tokens <= self.token_budget:
+                break
+            if rows == 0:
+                raise PromptBudgetError(f"Prompt {symbol} {timeframe} {tokens} token, melebihi budget {self.token_budget}")
+            rows //= 2
+            self.stats['trimmed'] += 1
+            console.log(f"[yellow]✂️ Prompt {symbol} {timeframe} {tokens} token > budget {self.token_budget}, "
+                        f"riwayat dipangkas ke {rows} candle[/yellow]")
+
+        self.last_tokens = tokens
+        self.stats['prompts'] += 1
+        self.stats['tokens'] += tokens
+        return prompt
+
+
+# Global instance
+prompt_builder = PromptBuilder()
@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+import aiohttp
+from rich.console import Console
+
+console = Console()
+
+# Limit weight REST Binance per IP (reset setiap menit)
+BINANCE_WEIGHT_LIMIT = 6000
+WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+
+# Angka kecil = didahulukan
+PRIORITY_LIVE = 0
+PRIORITY_BACKFILL = 10
+
+RATE_LIMIT_STATUSES = (429, 418)
+
+# Backfill cuma boleh memakai sebagian limit per window, sisanya untuk request live
+BACKFILL_WEIGHT_LIMIT = 2400
+
+
+class RequestScheduler:
+    """Scheduler request REST Binance yang sadar rate limit.
+
+    Token bucket berisi `max_weight` per window (default 1 menit, sejajar jam
+    seperti counter Binance) dan diisi ulang setiap pergantian window. Pemakaian
+    disinkronkan dari header X-MBX-USED-WEIGHT-1M, jadi pemakaian proses lain di IP
+    yang sama ikut terhitung. Request menunggu token sesuai prioritas (live dulu,
+    backfill belakangan), 429/418 menghentikan semua request sampai Retry-After,
+    dan request identik yang sedang berjalan digabung jadi satu. Weight request
+    yang belum dijawab saat window berganti ikut dibebankan ke window baru,
+    karena server bisa saja baru menghitungnya di sana. `priority_limits`
+    ({prioritas: weight}) membatasi jatah weight per window untuk prioritas
+    tertentu; selama jatahnya habis, request prioritas lebih tinggi tetap jalan.
+    """
+
+    def __init__(self, max_weight=BINANCE_WEIGHT_LIMIT, window_seconds=60.0, safety_margin=0.05,
+                 max_retries=4, base_backoff=0.5, max_backoff=30.0, priority_limits=None):
+        self.max_weight = max_weight
+        self.capacity = int(max_weight * (1 - safety_margin))
+        self.window_seconds = window_seconds
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.priority_limits = dict(priority_limits or {})
+
+        self.used = 0
+        self.window = None
+        # Weight request yang sudah di-grant tapi belum dijawab, per window grant. Saat window
+        # berganti, sisa dari window sebelumnya bisa saja baru dihitung server di window baru.
+        self._pending = Counter()
+        self.priority_used = Counter()
+        self.paused_until = 0.0
+        self.stats = Counter()
+        self._waiters = []  # heap (prioritas, urutan, weight, future)
+        self._sequence = itertools.count()
+        self._pump_task = None
+        self._inflight = {}
+        self._wakeup = None  # future yang membangunkan _pump saat ada request baru
+
+    def _current_window(self):
+        return int(time.time() // self.window_seconds)
+
+    def _refill(self):
+        window = self._current_window()
+        if window != self.window:
+            self.used = self._pending[self.window] if self.window is not None and window == self.window + 1 else 0
+            self.window = window
+            self.priority_used = Counter()
+
+    def observe(self, headers, window):
+        """Sinkronkan pemakaian dari header response request yang di-grant di `window`"""
+        used = headers.get(WEIGHT_HEADER) if headers else None
+        if used is None:
+            return
+        self._refill()
+        if window == self.window:
+            self.used = max(self.used, int(used))
+
+    def _backoff(self, attempt):
+        """Exponential backoff dengan jitter"""
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def acquire(self, weight, priority=PRIORITY_LIVE):
+        """Tunggu sampai `weight` tersedia, return id window tempat weight dipakai"""
+        limit = min(self.capacity, self.priority_limits.get(priority, self.capacity))
+        if weight > limit:
+            raise ValueError(f"Weight {weight} melebihi kapasitas {limit}")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), weight, future))
+        wakeup = self._wakeup
+        if wakeup is not None and not wakeup.done() and wakeup.get_loop() is loop:
+            wakeup.set_result(None)
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.ensure_future(self._pump())
+        return await future
+
+    async def _pump(self):
+        """Bagikan token ke antrean sesuai prioritas, tidur sampai window berikutnya kalau habis"""
+        while self._waiters:
+            now = time.time()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+
+            self._refill()
+            priority, _, weight, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            fits = self.used + weight <= self.capacity
+            limit = self.priority_limits.get(priority)
+            if fits and (limit is None or self.priority_used[priority] + weight <= limit):
+                heapq.heappop(self._waiters)
+                self.used += weight
+                self.priority_used[priority] += weight
+                future.set_result(self.window)
+                continue
+
+            self.stats['throttled'] += 1
+            delay = max(0.0, (self.window + 1) * self.window_seconds - time.time()) + 0.001
+            if not fits:
+                await asyncio.sleep(delay)
+                continue
+            # Cuma jatah prioritas ini yang habis: bangun lebih awal kalau ada request baru
+            # (yang prioritasnya lebih tinggi bisa langsung dapat token)
+            self._wakeup = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait([self._wakeup], timeout=delay)
+            finally:
+                self._wakeup = None
+
+    async def get(self, session, url, params=None, weight=1, priority=PRIORITY_LIVE):
+        """GET dengan rate limit + retry, return (status, body bytes). Status None = error jaringan."""
+        key = (url, tuple(sorted((params or {}).items())))
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self.stats['coalesced'] += 1
+        else:
+            task = asyncio.ensure_future(self._request(session, url, params, weight, priority))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key, task=task: self._inflight.pop(key, None)
+                                   if self._inflight.get(key) is task else None)
+        # shield: request yang dipakai bersama tidak ikut batal kalau satu pemanggil dibatalkan
+        return await asyncio.shield(task)
+
+    async def _request(self, session, url, params, weight, priority):
+        status, body = None, b''
+        for attempt in range(self.max_retries + 1):
+            window = await self.acquire(weight, priority)
+            self.stats['requests'] += 1
+            self._pending[window] += weight
+            retry_after = None
+            try:
+                async with session.get(url, params=params) as response:
+                    status = response.status
+                    body = await response.read()
+                    self.observe(response.headers, window)
+                    retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, body = None, str(e).encode()
+            finally:
+                self._pending[window] -= weight
+                if self._pending[window] <= 0:
+                    del self._pending[window]
+
+            if status is not None and status < 500 and status not in RATE_LIMIT_STATUSES:
+                return status, body
+
+            self.stats[status or 'network_error'] += 1
+            if attempt == self.max_retries:
+                break
+
+            delay = self._backoff(attempt)
+            if status in RATE_LIMIT_STATUSES:
+                # Semua request berhenti dulu, 418 berarti IP sedang di-ban
+                wait = float(retry_after) if retry_after is not None else delay
+                self.paused_until = max(self.paused_until, time.time() + wait)
+                delay = max(delay, wait)
+                console.log(f"[bold red]⛔ Binance rate limit ({status}), jeda {wait:.1f}s[/bold red]")
+            else:
+                console.log(f"[yellow]⚠️ Request gagal ({status}), retry {attempt + 1} dalam {delay:.2f}s[/yellow]")
+            await asyncio.sleep(delay)
+        return status, body
+
+
+# Global scheduler untuk semua request REST Binance dalam satu proses
+request_scheduler = RequestScheduler(priority_limits={PRIORITY_BACKFILL: BACKFILL_WEIGHT_LIMIT})
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Scanner multi-symbol headless: ambil kline paralel, hitung indikator di process pool,
+lalu tampilkan tabel ranking rekomendasi secara streaming
+"""
+import argparse
+import asyncio
+import sys
+import time
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+import binance_data
+from binance_data import get_binance_data, get_exchange_symbols
+from compute_executor import IndicatorComputeExecutor, analyze_klines
+from config import GEMINI_API_KEY, GEMINI_CONCURRENCY, GEMINI_TIMEOUT
+from gemini_dispatch import GeminiDispatcher, GeminiJob
+from http_client import get_session, close_http_client
+
+console = Console()
+
+ACTION_RANK = {'STRONG_BUY': 2, 'BUY': 1, 'HOLD': 0, 'SELL': -1, 'STRONG_SELL': -2}
+ACTION_COLORS = {'STRONG_BUY': 'bold green', 'BUY': 'green', 'HOLD': 'white',
+                 'SELL': 'red', 'STRONG_SELL': 'bold red'}
+
+
+def rank_key(result):
+    """Urutan ranking: paling bullish dan paling yakin di atas, error paling bawah"""
+    if 'error' in result:
+        return (-99, 0, 0)
+    return (ACTION_RANK.get(result['action'], 0), result['confidence'], result['technical_score'])
+
+
+def rank_results(results):
+    return sorted(results, key=rank_key, reverse=True)
+
+
+async def scan(symbols, intervals, concurrency=10, executor=None, limit=1000, session=None):
+    """Async generator hasil analisis (symbol x interval) sesuai urutan selesai.
+
+    Fetch dibatasi semaphore, komputasi dikirim ke IndicatorComputeExecutor (process
+    pool) supaya event loop tetap bebas untuk request berikutnya. Tanpa executor,
+    komputasi jalan di thread pool default.
+    """
+    if session is None:
+        session = await get_session()
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyze(symbol, interval):
+        async with semaphore:
+            klines = await get_binance_data(symbol, interval, limit=limit, session=session, as_array=True)
+        if klines is None or len(klines) == 0:
+            return {'symbol': symbol, 'timeframe': interval, 'error': 'Gagal ngambil data'}
+        try:
+            if executor is None:
+                return await loop.run_in_executor(None, analyze_klines, klines, symbol, interval)
+            return await executor.submit(symbol, interval, klines)
+        except Exception as e:
+            return {'symbol': symbol, 'timeframe': interval, 'error': str(e)}
+
+    tasks = [asyncio.ensure_future(analyze(symbol, interval)) for symbol in symbols for interval in intervals]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def build_table(results, top=None, throughput=None):
+    """Tabel rich hasil scan yang sudah diranking"""
+    title = "🔍 BINANCE SCANNER"
+    if throughput is not None:
+        title += f"  ({throughput:.1f} simbol/detik)"
+    table = Table(title=title)
+    for column in ['#', 'Symbol', 'TF', 'Harga', 'Action', 'Conf%', 'Score', 'ML', 'ATR%', 'R:R']:
+        table.add_column(column, justify='right' if column not in ('Symbol', 'Action') else 'left')
+
+    ranked = rank_results(results)
+    for index, rec in enumerate(ranked[:top] if top else ranked, start=1):
+        if 'error' in rec:
+            table.add_row(str(index), rec['symbol'], rec['timeframe'], '-', f"[red]{rec['error'][:30]}[/red]",
+                          '-', '-', '-', '-', '-')
+            continue
+        color = ACTION_COLORS.get(rec['action'], 'white')
+        table.add_row(
+            str(index), rec['symbol'], rec['timeframe'], f"{rec['price']:.6g}",
+            f"[{color}]{rec['action']}[/{color}]", f"{rec['confidence']:.1f}",
+            str(rec['technical_score']), str(rec['ml_signal']), f"{rec['atr_percent']:.2f}",
+            f"{rec['risk_reward_ratio']:.2f}"
+        )
+    return table
+
+
+async def run_scanner(symbols=None, quote_asset='USDT', intervals=('1h',), concurrency=10,
+                      workers=None, limit=1000, top=30, max_symbols=None):
+    """Jalankan scan lengkap dengan tabel live, return (hasil terurut, throughput)"""
+    binance_data.console.quiet = True
+    session = await get_session()
+
+    if not symbols:
+        symbols = await get_exchange_symbols(quote_asset, session=session)
+        if not symbols:
+            console.log("[bold red]Gagal ngambil daftar symbol dari exchangeInfo[/bold red]")
+            return [], 0.0
+    if max_symbols:
+        symbols = symbols[:max_symbols]
+
+    console.log(f"[cyan]🔍 Scan {len(symbols)} symbol x {len(intervals)} timeframe...[/cyan]")
+    results = []
+    started = time.perf_counter()
+
+    with IndicatorComputeExecutor(max_workers=workers) as executor:
+        with Live(build_table(results, top), console=console, refresh_per_second=4) as live:
+            async for result in scan(symbols, intervals, concurrency, executor, limit, session):
+                results.append(result)
+                throughput = len(results) / (time.perf_counter() - started)
+                live.update(build_table(results, top, throughput))
+
+    elapsed = time.perf_counter() - started
+    throughput = len(results) / elapsed if elapsed > 0 else 0.0
+    console.log(f"[bold green]✅ Scan selesai: {len(results)} analisis dalam {elapsed:.1f}s "
+                f"({throughput:.1f} simbol/detik)[/bold green]")
+    return rank_results(results), throughput
+
+
+def gemini_jobs(ranked, count):
+    """GeminiJob untuk `count` hasil teratas, lengkap dengan candle terakhir (indikator + timestamp bar)"""
+    return [GeminiJob(rec['symbol'], rec['timeframe'], rec, latest=rec.get('latest'))
+            for rec in ranked if 'error' not in rec][:count]
+
+
+async def analyze_top(ranked, count, dispatcher):
+    """Analisis Gemini untuk `count` hasil teratas secara paralel, tampilkan per symbol sesuai ranking"""
+    jobs = gemini_jobs(ranked, count)
+    if not jobs:
+        return []
+    console.log(f"[cyan]🤖 Analisis Gemini {len(jobs)} symbol teratas "
+                f"(concurrency {dispatcher.concurrency}, batch {dispatcher.batch_size})...[/cyan]")
+    started = time.perf_counter()
+    reports = await dispatcher.run(jobs)
+    for report in reports:
+        color = 'green' if report.source != 'fallback' else 'yellow'
+        console.rule(f"[{color}]{report.symbol} {report.timeframe} ({report.source})[/{color}]")
+        console.print(report.text)
+
+    percentiles = ' '.join(f"{name} {value:.0f}ms" for name, value in dispatcher.percentiles().items())
+    console.log(f"[bold green]✅ {len(reports)} analisis Gemini dalam {time.perf_counter() - started:.1f}s "
+                f"| {dict(dispatcher.stats)} | latency {percentiles or '-'}[/bold green]")
+    return reports
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scanner multi-symbol Binance Gemini Analyzer")
+    parser.add_argument('--symbols', nargs='*', help="Daftar symbol (default: semua pair quote dari exchangeInfo)")
+    parser.add_argument('--quote', default='USDT', help="Filter quote asset untuk exchangeInfo")
+    parser.add_argument('--intervals', nargs='+', default=['1h'], help="Timeframe, contoh: 15m 1h 4h")
+    parser.add_argument('--concurrency', type=int, default=10, help="Maksimal request Binance paralel")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah worker process (default: jumlah core)")
+    parser.add_argument('--limit', type=int, default=1000, help="Jumlah candle per symbol")
+    parser.add_argument('--top', type=int, default=30, help="Jumlah baris yang ditampilkan")
+    parser.add_argument('--max-symbols', type=int, default=None, help="Batasi jumlah symbol yang discan")
+    parser.add_argument('--gemini-top', type=int, default=0, help="Analisis Gemini untuk N hasil teratas (0 = mati)")
+    parser.add_argument('--gemini-concurrency', type=int, default=GEMINI_CONCURRENCY,
+                        help="Maksimal request Gemini paralel")
+    parser.add_argument('--gemini-batch', type=int, default=1, help="Jumlah symbol per request Gemini")
+    parser.add_argument('--gemini-timeout', type=float, default=GEMINI_TIMEOUT,
+                        help="Deadline per request Gemini (detik) sebelum pakai rekomendasi lokal")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    try:
+        ranked, _ = await run_scanner(args.symbols, args.quote, args.intervals, args.concurrency,
+                                      args.workers, args.limit, args.top, args.max_symbols)
+        if args.gemini_top:
+            dispatcher = GeminiDispatcher(GEMINI_API_KEY, concurrency=args.gemini_concurrency,
+                                          batch_size=args.gemini_batch, timeout=args.gemini_timeout)
+            await analyze_top(ranked, args.gemini_top, dispatcher)
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        console.print("[bold red]\nScan dihentikan oleh user.[/bold red]")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test AnalysisContext: rekomendasi, fitur, dan risk metrics cuma dihitung sekali per siklus analisis
+"""
+import asyncio
+import sys
+sys.path.append('.')
+import gemini_analyzer
+from analysis_context import AnalysisContext, content_hash
+from gemini_cache import GeminiResponseCache
+from http_client import close_http_client
+from indicators import calculate_indicators
+from mock_servers import create_gemini_app, start_server
+from model_registry import ModelRegistry
+from test_with_simulation import generate_sample_klines
+import numpy as np
+import pytest
+
+STAGES = ['features', 'predictions', 'risk_metrics', 'recommendation']
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path))
+
+
+@pytest.fixture(scope='module')
+def result():
+    np.random.seed(11)
+    return calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h')
+
+
+def test_matches_engine_recommendation(registry, result):
+    expected = registry.generate_trading_recommendation(result, 'BTCUSDT', '1h')
+    context = AnalysisContext(registry)
+    assert context.recommendation(result, 'BTCUSDT', '1h') == expected
+    assert AnalysisContext(registry).recommendation([], 'BTCUSDT', '1h') == {"error": "No data available"}
+
+
+def test_each_stage_runs_once(registry, result):
+    columns = list(result.df.columns)
+    context = AnalysisContext(registry)
+
+    first = context.recommendation(result, 'BTCUSDT', '1h')
+    # DataFrame baru dengan isi yang sama tetap kena cache (key-nya content hash, bukan id object)
+    second = context.recommendation(result.df.copy(), 'BTCUSDT', '1h')
+    context.features(result)
+    context.risk_metrics(result)
+
+    assert first is second
+    assert {stage: context.stats[stage] for stage in STAGES} == dict.fromkeys(STAGES, 1)
+    assert context.hits['recommendation'] == 1
+    # Kolom fitur tidak ikut menempel ke data milik caller
+    assert list(result.df.columns) == columns
+
+
+def test_content_hash_changes_with_data(result):
+    changed = result.df.copy()
+    changed.loc[changed.index[-1], 'close'] += 1
+    assert content_hash(result) == content_hash(result.df.copy())
+    assert content_hash(result) != content_hash(changed)
+
+
+def test_main_and_gemini_share_one_computation(registry, result, monkeypatch, tmp_path):
+    monkeypatch.setattr(gemini_analyzer, 'gemini_cache', GeminiResponseCache(str(tmp_path / 'gemini')))
+
+    async def run(context):
+        runner, base_url = await start_server(create_gemini_app(text='OK'))
+        monkeypatch.setattr(gemini_analyzer, 'GEMINI_API_URL',
+                            f'{base_url}/v1beta/models/gemini-1.5-flash-latest:generateContent')
+        try:
+            context.recommendation(result, 'BTCUSDT', '1h')
+            return await gemini_analyzer.analyze_with_gemini(result, 'test-key', 'BTCUSDT', '1h', context=context)
+        finally:
+            await close_http_client()
+            await runner.cleanup()
+
+    context = AnalysisContext(registry)
+    assert asyncio.run(run(context)) == 'OK'
+    assert {stage: context.stats[stage] for stage in STAGES} == dict.fromkeys(STAGES, 1)
+    assert context.hits['recommendation'] == 1
+
+
+if __name__ == "__main__":
+    np.random.seed(11)
+    data = calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h')
+    context = AnalysisContext()
+    for _ in range(3):
+        context.recommendation(data, 'BTCUSDT', '1h')
+    print(f'✅ Stage dijalankan: {dict(context.stats)}, cache hit: {dict(context.hits)}')
@@ -8,7 +8,7 @@ sys.path.append('.')
 from binance_data import get_binance_data
 from indicators import calculate_indicators
 from trading_signals import signal_engine
-import pandas as pd
+from http_client import close_http_client
 
 async def test_analysis():
     print('🚀 Testing Binance Gemini Analyzer Advanced...')
@@ -29,8 +29,7 @@ async def test_analysis():
         print(f'✅ Berhasil menghitung {len(data_with_indicators)} data dengan indikator')
         
         # Test trading signals
-        df = pd.DataFrame(data_with_indicators)
-        trading_rec = signal_engine.generate_trading_recommendation(df, symbol, timeframe)
+        trading_rec = signal_engine.generate_trading_recommendation(data_with_indicators, symbol, timeframe)
         
         print('\n🎯 HASIL ANALISIS:')
         print(f'Symbol: {trading_rec["symbol"]}')
@@ -45,7 +44,7 @@ async def test_analysis():
         print(f'Volatility: {trading_rec["volatility"]}%')
         
         # Show latest indicators
-        latest = data_with_indicators[-1]
+        latest = data_with_indicators.latest()
         print('\n📈 INDIKATOR TERAKHIR:')
         print(f'RSI: {latest.get("RSI", 0):.2f}')
         print(f'MACD: {latest.get("MACD", 0):.6f}')
@@ -63,8 +62,7 @@ async def test_analysis():
                 test_klines = await get_binance_data(test_symbol, '15m', limit=50)
                 if test_klines:
                     test_data = calculate_indicators(test_klines, '15m')
-                    test_df = pd.DataFrame(test_data)
-                    test_rec = signal_engine.generate_trading_recommendation(test_df, test_symbol, '15m')
+                    test_rec = signal_engine.generate_trading_recommendation(test_data, test_symbol, '15m')
                     print(f'{test_symbol}: {test_rec["action"]} ({test_rec["confidence"]:.1f}%)')
             except Exception as e:
                 print(f'{test_symbol}: Error - {e}')
@@ -73,5 +71,7 @@ async def test_analysis():
     else:
         print('❌ Gagal mengambil data dari Binance')
 
+    await close_http_client()
+
 if __name__ == "__main__":
     asyncio.run(test_analysis())
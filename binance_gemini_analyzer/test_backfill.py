@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test backfill kline dengan pagination terhadap mock server Binance
+"""
+import asyncio
+import sys
+from collections import Counter
+sys.path.append('.')
+import binance_data
+from binance_data import get_historical_klines, INTERVAL_MS
+from http_client import HttpClient
+from mock_servers import create_binance_app, start_server
+from request_scheduler import PRIORITY_BACKFILL, RequestScheduler
+
+NOW_MS = 1_700_000_000_000
+
+
+async def backfill(start_time, end_time, **kwargs):
+    app = create_binance_app(now_ms=NOW_MS, history_candles=5000)
+    runner, base_url = await start_server(app)
+    binance_data.BASE_URL = f'{base_url}/api/v3/klines'
+    try:
+        async with HttpClient() as client:
+            klines = await get_historical_klines('BTCUSDT', '1m', start_time, end_time,
+                                                 session=await client.get_session(), **kwargs)
+    finally:
+        await runner.cleanup()
+    return klines, app['state']
+
+
+def test_backfill_spans_multiple_pages_in_order(monkeypatch):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    interval_ms = INTERVAL_MS['1m']
+    last_open = NOW_MS // interval_ms * interval_ms
+    start = last_open - 3499 * interval_ms
+
+    klines, state = asyncio.run(backfill(start - 1234, last_open))
+
+    open_times = [kline[0] for kline in klines]
+    assert len(klines) == 3500
+    assert open_times[0] == start and open_times[-1] == last_open
+    assert all(b - a == interval_ms for a, b in zip(open_times, open_times[1:]))
+    assert state.requests == 4
+
+
+def test_backfill_respects_scheduler_backfill_limit(monkeypatch):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    scheduler = RequestScheduler(max_weight=100, window_seconds=0.2, safety_margin=0,
+                                 priority_limits={PRIORITY_BACKFILL: 4})
+    granted = []
+    acquire = scheduler.acquire
+
+    async def recording_acquire(weight, priority):
+        window = await acquire(weight, priority)
+        granted.append((window, priority))
+        return window
+
+    monkeypatch.setattr(scheduler, 'acquire', recording_acquire)
+    monkeypatch.setattr(binance_data, 'request_scheduler', scheduler)
+    interval_ms = INTERVAL_MS['1m']
+    last_open = NOW_MS // interval_ms * interval_ms
+
+    klines, state = asyncio.run(backfill(last_open - 3999 * interval_ms, last_open))
+
+    # 4 halaman x weight 2 dengan jatah backfill 4 per window -> paling banyak 2 halaman per window
+    assert len(klines) == 4000 and state.requests == 4
+    per_window = Counter(window for window, _ in granted)
+    assert len(per_window) >= 2 and max(per_window.values()) <= 2
+    assert all(priority == PRIORITY_BACKFILL for _, priority in granted)
+    assert scheduler.stats['throttled'] >= 1
+
+
+if __name__ == "__main__":
+    klines, state = asyncio.run(backfill(NOW_MS - 3000 * 60_000, NOW_MS))
+    print(f'✅ {len(klines)} candles dari {state.requests} halaman')
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test backtest vectorized: aturan exit ATR, non-overlap, ringkasan PnL/drawdown/R
+"""
+import sys
+sys.path.append('.')
+from backtest import (entry_directions, run_backtest, run_parameter_grid, simulate_trades,
+                      summarize_trades, walk_forward_ml_signals)
+from indicators import calculate_indicators, get_indicator_params
+from test_with_simulation import generate_sample_klines
+import numpy as np
+
+
+def flat_market(n=10, price=100.0):
+    close = np.full(n, price)
+    return close, close + 0.1, close - 0.1
+
+
+def test_long_take_profit_and_short_stop_loss():
+    close, high, low = flat_market()
+    high[3] = 104            # long dari bar 1: TP di 100 + 2*1.5 = 103
+    atr = np.full(10, 2.0)
+    direction = np.zeros(10, dtype=np.int8)
+    direction[1] = 1
+    direction[5] = -1
+    high[7] = 104            # short dari bar 5: stop di 100 + 2 = 102
+
+    trades = simulate_trades(close, high, low, atr, direction, atr_multiplier=1.0, fee_rate=0)
+
+    assert trades['entry_index'].tolist() == [1, 5]
+    assert trades['exit_index'].tolist() == [3, 7]
+    assert trades['exit_reason'].tolist() == ['take_profit', 'stop_loss']
+    np.testing.assert_allclose(trades['r_multiple'], [1.5, -1.0])
+    np.testing.assert_allclose(trades['return'], [0.03, -0.02])
+
+
+def test_same_bar_touch_counts_as_stop_and_timeout_exits_at_close():
+    close, high, low = flat_market(20)
+    atr = np.full(20, 1.0)
+    direction = np.zeros(20, dtype=np.int8)
+    direction[0] = 1
+    high[2], low[2] = 110, 90
+    direction[5] = 1
+    close[9] = 100.5
+
+    trades = simulate_trades(close, high, low, atr, direction, max_holding=4, fee_rate=0)
+
+    assert trades['exit_reason'].tolist() == ['stop_loss', 'timeout']
+    assert trades['exit_index'].tolist() == [2, 9]
+    assert trades['exit_price'][1] == 100.5
+
+
+def test_signals_are_skipped_while_in_position():
+    close, high, low = flat_market(12)
+    high[6] = 110
+    atr = np.full(12, 1.0)
+    direction = np.zeros(12, dtype=np.int8)
+    direction[[1, 3, 6, 8]] = 1
+
+    single = simulate_trades(close, high, low, atr, direction, fee_rate=0)
+    overlap = simulate_trades(close, high, low, atr, direction, fee_rate=0, allow_overlap=True)
+
+    assert single['entry_index'].tolist() == [1, 8]
+    assert overlap['entry_index'].tolist() == [1, 3, 6, 8]
+
+
+def test_summary_metrics():
+    trades = {'return': np.array([0.10, -0.05, 0.02, -0.10]),
+              'r_multiple': np.array([1.5, -1.0, 0.4, -1.0]),
+              'exit_reason': np.array(['take_profit', 'stop_loss', 'timeout', 'stop_loss'])}
+    summary = summarize_trades(trades)
+
+    equity = np.cumprod([1.10, 0.95, 1.02, 0.90])
+    assert summary['trades'] == 4
+    assert summary['hit_rate'] == 50.0
+    assert summary['total_return'] == round((equity[-1] - 1) * 100, 2)
+    assert summary['max_drawdown'] == round((1 - equity[-1] / equity[0]) * 100, 2)
+    assert summary['total_r'] == -0.1
+    assert summary['profit_factor'] == round(0.12 / 0.15, 2)
+    assert (summary['take_profit'], summary['stop_loss'], summary['timeout']) == (1, 2, 1)
+    assert summarize_trades({'return': [], 'r_multiple': [], 'exit_reason': []})['trades'] == 0
+
+
+def test_entry_directions_match_recommendation_thresholds():
+    score = np.array([3, 2, 1, 0, -1, -2])
+    assert entry_directions(score).tolist() == [1, 1, 0, 0, 0, -1]
+    assert entry_directions(score, ml_signal=np.array([0, 0, 1, 0, -1, 0])).tolist() == [1, 1, 1, 0, -1, -1]
+
+
+def test_backtest_on_indicators_and_params_override():
+    np.random.seed(8)
+    klines = generate_sample_klines('BTCUSDT', 600, 45000)
+    result = calculate_indicators(klines, '1h')
+    summary, trade_log = run_backtest(result, return_trades=True)
+
+    assert summary['trades'] == len(trade_log) > 0
+    assert (trade_log['entry_index'].to_numpy()[1:] > trade_log['exit_index'].to_numpy()[:-1]).all()
+    assert (trade_log['entry_time'] == result.df['timestamp'].to_numpy()[trade_log['entry_index']]).all()
+
+    custom = calculate_indicators(klines, '1h', params={'rsi_period': 7})
+    assert custom.params['rsi_period'] == 7
+    assert custom.params['bb_period'] == get_indicator_params('1h')['bb_period']
+    assert not np.allclose(custom.column('RSI'), result.column('RSI'))
+
+    grid = run_parameter_grid(klines, '1h', {'rsi_period': [7, 14], 'atr_period': [10, 14]})
+    assert len(grid) == 4
+    assert grid['total_r'].is_monotonic_decreasing
+
+
+def test_walk_forward_signals_have_no_prediction_before_first_fold():
+    np.random.seed(9)
+    df = calculate_indicators(generate_sample_klines('BTCUSDT', 700, 45000), '1h').df
+    signals = walk_forward_ml_signals(df, train_bars=300, step=100)
+
+    assert len(signals) == len(df)
+    assert not signals[:300].any()
+    assert set(np.unique(signals)) <= {-1, 0, 1}
+    assert run_backtest(df, '1h', ml_signal=signals)['trades'] >= 0
+
+
+if __name__ == "__main__":
+    np.random.seed(8)
+    result = calculate_indicators(generate_sample_klines('BTCUSDT', 600, 45000), '1h')
+    print(f'✅ Backtest: {run_backtest(result)}')
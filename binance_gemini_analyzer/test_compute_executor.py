@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test IndicatorComputeExecutor: hasil dari process pool (via shared memory) sama dengan hasil in-process
+"""
+import asyncio
+import sys
+sys.path.append('.')
+import model_registry
+from compute_executor import IndicatorComputeExecutor, analyze_klines
+from binance_data import klines_to_array, KLINE_DTYPE
+from test_with_simulation import generate_sample_klines
+import numpy as np
+import pytest
+
+INDICATOR_FIELDS = ['price', 'signal_score', 'technical_score', 'atr_percent', 'support',
+                    'resistance', 'current_rsi', 'current_macd']
+
+
+@pytest.fixture(autouse=True)
+def isolated_model_dir(tmp_path, monkeypatch):
+    # Model hasil training jangan sampai menumpuk di data/models milik user
+    monkeypatch.setenv('MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(model_registry.model_registry, 'model_dir', str(tmp_path))
+
+
+def make_batch():
+    np.random.seed(5)
+    return [
+        ('BTCUSDT', '1h', generate_sample_klines('BTCUSDT', 200, 45000)),
+        ('ETHUSDT', '15m', klines_to_array(generate_sample_klines('ETHUSDT', 180, 3000))),
+        ('SOLUSDT', '30m', klines_to_array(generate_sample_klines('SOLUSDT', 150, 100), KLINE_DTYPE.names)),
+    ]
+
+
+def test_batch_matches_in_process():
+    batch = make_batch()
+    with IndicatorComputeExecutor(max_workers=2) as executor:
+        results = executor.run_batch_sync(batch)
+
+    assert [r['symbol'] for r in results] == ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+    for (symbol, timeframe, klines), result in zip(batch, results):
+        expected = analyze_klines(klines, symbol, timeframe)
+        for field in INDICATOR_FIELDS:
+            assert result[field] == expected[field], field
+
+
+def test_async_batch_reports_errors():
+    async def run():
+        with IndicatorComputeExecutor(max_workers=1) as executor:
+            return await executor.run_batch([
+                ('BTCUSDT', '1h', generate_sample_klines('BTCUSDT', 120, 45000)),
+                ('EMPTY', '1h', []),
+            ])
+
+    results = asyncio.run(run())
+    assert results[0]['symbol'] == 'BTCUSDT' and 'error' not in results[0]
+    assert results[1] == {'symbol': 'EMPTY', 'timeframe': '1h', 'error': 'No data available'}
+
+
+if __name__ == "__main__":
+    test_batch_matches_in_process()
+    test_async_batch_reports_errors()
+    print('✅ Compute executor OK')
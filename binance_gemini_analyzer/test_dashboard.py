@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test Dashboard: diff per baris, header tidak dirender ulang, batas FPS, dan input non-blocking
+"""
+import asyncio
+import io
+import sys
+import time
+sys.path.append('.')
+from blessed import Terminal
+from blessed.keyboard import Keystroke
+from dashboard import Dashboard, figlet_header
+
+
+def make_dashboard(height=40, **kwargs):
+    stream = io.StringIO()
+    term = Terminal(kind='xterm-256color', stream=stream, force_styling=True)
+    return Dashboard(term, stream=stream, width=80, height=height, **kwargs), stream
+
+
+def take(stream):
+    data = stream.getvalue()
+    stream.seek(0)
+    stream.truncate()
+    return data
+
+
+def test_only_changed_lines_are_written():
+    dash, stream = make_dashboard()
+    header = figlet_header(dash.term)
+    dash.update(header=header, input='Pair: BTCUSDT', progress='Ngambil data...', indicators='RSI 55\nADX 20')
+    first = dash.render()
+    assert first == sum(1 for line in dash.compose() if line) >= 8
+    assert dash.term.clear in take(stream)
+
+    # Tidak ada perubahan -> tidak ada byte yang ditulis
+    assert dash.render() == 0 and take(stream) == ''
+
+    dash.update(progress='Menghitung indikator...')
+    assert dash.render() == 1
+    written = take(stream)
+    assert 'Menghitung indikator' in written
+    assert dash.term.clear not in written and 'BTCUSDT' not in written and '___' not in written
+
+
+def test_windows_are_clipped_and_wrapped():
+    dash, _ = make_dashboard(height=60)
+    dash.update(result='x' * 200 + '\n' + '\n'.join(f'baris {i}' for i in range(40)))
+    screen = dash.compose()
+    top, bottom = 60 // 2 + 5, 60 - 15
+    assert screen[top] == 'x' * 80 and screen[top + 2] == 'x' * 40
+    # Window result berhenti tepat sebelum window indikator
+    assert screen[bottom - 1] and screen[bottom] == ''
+
+
+def test_frame_rate_is_capped():
+    dash, _ = make_dashboard(fps=20)
+
+    async def scenario():
+        task = asyncio.ensure_future(dash.run())
+        started = time.perf_counter()
+        updates = 0
+        while time.perf_counter() - started < 0.5:
+            dash.update(result=f'token {updates}')
+            updates += 1
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.06)
+        task.cancel()
+        return updates
+
+    updates = asyncio.run(scenario())
+    assert updates > 1000
+    assert 5 <= dash.stats['frames'] <= 13  # 20 fps x 0.5 detik (+ frame terakhir)
+    assert dash.windows['result'] == f'token {updates - 1}'
+
+
+def test_read_line_does_not_block_rendering(monkeypatch):
+    dash, stream = make_dashboard(fps=50)
+    monkeypatch.setattr(type(dash.term), 'is_a_tty', property(lambda self: True))
+    monkeypatch.setattr(dash.term, 'cbreak', lambda: io.StringIO())
+    keys = iter([None] * 10 + [Keystroke('e'), Keystroke('t'), Keystroke('x'), Keystroke('\x7f'),
+                               Keystroke('h'), None, Keystroke('\n')])
+
+    async def fake_read_key():
+        await asyncio.sleep(0.01)
+        return next(keys)
+
+    monkeypatch.setattr(dash, '_read_key', fake_read_key)
+
+    async def scenario():
+        dash.start()
+        ticker_frames = []
+
+        async def ticker():
+            for i in range(5):
+                dash.update(progress=f'tick {i}')
+                await asyncio.sleep(0.02)
+                ticker_frames.append(dash.stats['frames'])
+
+        line, _ = await asyncio.gather(dash.read_line('Pair: '), ticker())
+        await dash.stop()
+        return line, ticker_frames
+
+    line, ticker_frames = asyncio.run(scenario())
+    assert line == 'eth'
+    # Frame terus digambar selama menunggu input
+    assert ticker_frames[-1] > ticker_frames[0]
+    assert 'tick 4' in stream.getvalue()
+
+
+if __name__ == "__main__":
+    dash, stream = make_dashboard()
+    dash.update(header=figlet_header(dash.term), progress='Ngambil data...')
+    full = dash.render()
+    full_bytes = len(take(stream))
+    dash.update(progress='Menghitung indikator...')
+    changed = dash.render()
+    print(f'✅ Frame penuh {full} baris / {full_bytes} byte, frame berikutnya {changed} baris / '
+          f'{len(take(stream))} byte')
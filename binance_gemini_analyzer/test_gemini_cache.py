@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test cache jawaban Gemini: fingerprint kondisi pasar, tier memori + disk, TTL, LRU
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append('.')
+import gemini_analyzer
+from analysis_context import AnalysisContext
+from gemini_cache import GeminiResponseCache, market_fingerprint, quantize
+from http_client import close_http_client
+from indicators import calculate_indicators
+from mock_servers import create_gemini_app, start_server
+from model_registry import ModelRegistry
+from test_with_simulation import generate_sample_klines
+import numpy as np
+import pytest
+
+LATEST = {'timestamp': 1_700_000_000_000, 'close': 45123.45, 'RSI': 55.2, 'MACD': 12.34, 'Signal_Score': 3,
+          'ADX': 27.6, 'Williams_R': -40.2, 'CCI': 88.0, 'Trend_Strength': 0.0123, 'Recommendation': 'BUY',
+          'Doji': False, 'Hammer': True}
+RECOMMENDATION = {'action': 'BUY', 'confidence': 71.3, 'entry_price': 45123.45, 'stop_loss': 44000.1,
+                  'ml_signal': 1, 'technical_score': 3}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GeminiResponseCache(str(tmp_path / 'gemini'), ttl=60)
+
+
+@pytest.fixture(scope='module')
+def result():
+    np.random.seed(5)
+    return calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h')
+
+
+def test_quantize():
+    assert quantize(45123.456, ('sig', 5)) == 45123.0
+    assert quantize(55.4, ('step', 1.0)) == 55.0
+    assert quantize(88.0, ('step', 5.0)) == 90.0
+    assert quantize(float('nan'), ('step', 1.0)) is None
+    assert quantize('N/A', ('sig', 3)) == 'N/A'
+
+
+def test_fingerprint_ignores_noise_but_not_real_changes():
+    key = market_fingerprint('BTCUSDT', '1h', LATEST, RECOMMENDATION)
+    # Perubahan di bawah resolusi pembulatan -> fingerprint sama
+    assert key == market_fingerprint('btcusdt', '1h', {**LATEST, 'RSI': 55.3, 'close': 45123.2}, RECOMMENDATION)
+    assert key == market_fingerprint('BTCUSDT', '1h', LATEST, {**RECOMMENDATION, 'confidence': 70.9})
+
+    changed = [
+        ('BTCUSDT', '4h', LATEST, RECOMMENDATION),
+        ('ETHUSDT', '1h', LATEST, RECOMMENDATION),
+        ('BTCUSDT', '1h', {**LATEST, 'timestamp': LATEST['timestamp'] + 3_600_000}, RECOMMENDATION),
+        ('BTCUSDT', '1h', {**LATEST, 'RSI': 58.0}, RECOMMENDATION),
+        ('BTCUSDT', '1h', {**LATEST, 'Hammer': False}, RECOMMENDATION),
+        ('BTCUSDT', '1h', LATEST, {**RECOMMENDATION, 'action': 'HOLD'}),
+    ]
+    assert len({key} | {market_fingerprint(*args) for args in changed}) == len(changed) + 1
+
+
+def test_memory_and_disk_tiers(cache):
+    assert cache.get('a') is None
+    cache.put('a', 'analisis A', symbol='BTCUSDT')
+    assert cache.get('a') == 'analisis A'
+    assert os.path.exists(cache.path('a'))
+
+    # Instance baru (proses baru) membaca dari disk lalu menaikkannya ke memori
+    fresh = GeminiResponseCache(cache.cache_dir, ttl=60)
+    assert fresh.get('a') == 'analisis A'
+    assert fresh.get('a') == 'analisis A'
+    assert fresh.stats['disk_hits'] == 1 and fresh.stats['memory_hits'] == 1
+    assert cache.stats['misses'] == 1 and cache.hit_rate == 0.5
+
+
+def test_ttl_expiry(tmp_path):
+    cache = GeminiResponseCache(str(tmp_path), ttl=0.05)
+    cache.put('a', 'basi')
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    assert cache.stats['expired'] == 2  # memori dan disk
+    assert not os.path.exists(cache.path('a'))
+
+
+def test_lru_eviction(tmp_path):
+    cache = GeminiResponseCache(str(tmp_path), ttl=60, max_entries=2, max_disk_entries=3)
+    for index, key in enumerate('abcd'):
+        cache.put(key, key)
+        # mtime disk berbeda per entry supaya urutan LRU jelas
+        os.utime(cache.path(key), (1_000_000 + index, 1_000_000 + index))
+        if key == 'b':
+            cache.get('a')
+            os.utime(cache.path('a'), (1_000_010, 1_000_010))
+
+    assert list(cache._memory) == ['c', 'd']
+    assert sorted(name[0] for name in os.listdir(tmp_path)) == ['a', 'c', 'd']
+    assert cache.stats['evictions'] == 3
+
+
+def run_analysis(result, cache, runs=2, **app_kwargs):
+    async def run():
+        runner, base_url = await start_server(create_gemini_app(text='Analisis cache', **app_kwargs))
+        gemini_analyzer.GEMINI_API_URL = f'{base_url}/v1beta/models/gemini-1.5-flash-latest:generateContent'
+        context = AnalysisContext(ModelRegistry(os.path.join(cache.cache_dir, 'models')))
+        try:
+            texts = [await gemini_analyzer.analyze_with_gemini(result, 'test-key', 'BTCUSDT', '1h',
+                                                               context=context, cache=cache)
+                     for _ in range(runs)]
+            return texts, runner.app['state']
+        finally:
+            await close_http_client()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def test_analyze_with_gemini_uses_cache(result, cache, monkeypatch):
+    monkeypatch.setattr(gemini_analyzer, 'GEMINI_API_URL', gemini_analyzer.GEMINI_API_URL)
+    texts, state = run_analysis(result, cache)
+    assert texts == ['Analisis cache'] * 2
+    assert state.requests == 1
+    assert cache.stats['memory_hits'] == 1 and cache.stats['stores'] == 1
+
+
+def test_errors_are_not_cached(result, cache, monkeypatch):
+    monkeypatch.setattr(gemini_analyzer, 'GEMINI_API_URL', gemini_analyzer.GEMINI_API_URL)
+    texts, state = run_analysis(result, cache, status=503)
+    assert all(text.startswith('Error: 503') for text in texts)
+    assert state.requests == 2
+    assert cache.stats['stores'] == 0
+
+
+def test_blocked_answer_returns_error_without_caching(result, cache, monkeypatch):
+    monkeypatch.setattr(gemini_analyzer, 'GEMINI_API_URL', gemini_analyzer.GEMINI_API_URL)
+    blocked = {'candidates': [{'finishReason': 'SAFETY'}]}
+    texts, state = run_analysis(result, cache, response=lambda prompt: blocked)
+    assert all(text.startswith('Error: jawaban Gemini tidak valid') for text in texts)
+    assert state.requests == 2
+    assert cache.stats['stores'] == 0
+
+
+if __name__ == "__main__":
+    key = market_fingerprint('BTCUSDT', '1h', LATEST, RECOMMENDATION)
+    print(f'✅ Fingerprint contoh: {key}')
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test GeminiDispatcher terhadap mock Gemini: concurrency limit, batching multi-symbol,
+deadline + fallback ke rekomendasi lokal, cache, dan persentil latency
+"""
+import asyncio
+import sys
+import time
+sys.path.append('.')
+import gemini_dispatch
+import prompt_builder
+from gemini_cache import GeminiResponseCache
+from gemini_dispatch import GeminiDispatcher, GeminiJob, latency_percentiles, split_sections
+from http_client import HttpClient
+from mock_servers import create_gemini_app, start_server
+import pytest
+
+SYMBOLS = [f'SYM{i:02d}USDT' for i in range(12)]
+
+
+def make_job(symbol, timeframe='1h', action='BUY', latest=None):
+    recommendation = {'symbol': symbol, 'timeframe': timeframe, 'action': action, 'confidence': 70.0,
+                      'entry_price': 100.0, 'stop_loss': 95.0, 'take_profit_1': 110.0, 'take_profit_2': 120.0,
+                      'risk_reward_ratio': 2.0, 'technical_score': 3, 'ml_signal': 1, 'price': 100.0}
+    return GeminiJob(symbol, timeframe, recommendation, latest)
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    gemini_dispatch.console.quiet = True
+    yield
+    gemini_dispatch.console.quiet = False
+
+
+async def with_gemini(scenario, **app_kwargs):
+    app = create_gemini_app(text='Analisis mock', **app_kwargs)
+    runner, base_url = await start_server(app)
+    try:
+        async with HttpClient() as client:
+            url = f'{base_url}/v1beta/models/gemini-1.5-flash-latest:generateContent'
+            return await scenario(await client.get_session(), url, app['state'])
+    finally:
+        await runner.cleanup()
+
+
+def run_dispatch(jobs, app_kwargs=None, **dispatcher_kwargs):
+    async def scenario(session, url, state):
+        dispatcher = GeminiDispatcher('test-key', session=session, api_url=url,
+                                      **{'cache': False, **dispatcher_kwargs})
+        started = time.perf_counter()
+        results = await dispatcher.run(jobs)
+        return results, dispatcher, state, time.perf_counter() - started
+
+    return asyncio.run(with_gemini(scenario, **(app_kwargs or {})))
+
+
+def test_concurrency_limit_and_order():
+    jobs = [make_job(symbol) for symbol in SYMBOLS]
+    results, dispatcher, state, elapsed = run_dispatch(jobs, {'latency': 0.05}, concurrency=4)
+
+    assert [result.symbol for result in results] == SYMBOLS
+    assert all(result.source == 'gemini' and result.text == 'Analisis mock' for result in results)
+    assert state.requests == len(SYMBOLS)
+    assert state.max_inflight == 4
+    # 12 request x 50ms dengan 4 paralel -> sekitar 3 gelombang, jauh di bawah 600ms sequential
+    assert elapsed < 0.4
+    assert set(dispatcher.percentiles()) == {'p50', 'p90', 'p99'}
+    assert dispatcher.percentiles()['p50'] >= 50
+
+
+def test_batching_packs_symbols_into_multipart_requests():
+    # Job scanner: candle terakhir ada, riwayat tidak -> tetap boleh digabung
+    jobs = [make_job(symbol, latest={'timestamp': 1_700_000_000_000, 'close': 100.0, 'RSI': 55.55})
+            for symbol in SYMBOLS]
+    results, dispatcher, state, _ = run_dispatch(jobs, batch_size=5)
+
+    assert state.requests == 3  # 5 + 5 + 2
+    assert all(result.source == 'gemini' and result.text == 'Analisis mock' for result in results)
+    assert all(f'### {symbol} 1h' in ''.join(state.prompts) for symbol in SYMBOLS)
+    assert 'RSI 55.5' in state.prompts[0]
+    assert len(dispatcher.latencies) == 3
+
+
+def test_timeout_falls_back_to_local_recommendation():
+    jobs = [make_job(symbol, action='SELL' if symbol == 'SYM03USDT' else 'BUY') for symbol in SYMBOLS[:6]]
+    slow = lambda prompt: 1.0 if 'SYM03USDT' in prompt else 0.0
+    results, dispatcher, _, elapsed = run_dispatch(jobs, {'latency': slow}, timeout=0.1)
+
+    by_symbol = {result.symbol: result for result in results}
+    assert by_symbol['SYM03USDT'].source == 'fallback'
+    assert 'timeout' in by_symbol['SYM03USDT'].error
+    assert 'SELL' in by_symbol['SYM03USDT'].text
+    assert all(result.source == 'gemini' for symbol, result in by_symbol.items() if symbol != 'SYM03USDT')
+    assert dispatcher.stats['fallback'] == 1
+    assert elapsed < 0.5
+
+
+def test_server_errors_are_retried_then_fall_back():
+    results, dispatcher, state, _ = run_dispatch([make_job('BTCUSDT')], {'status': 503},
+                                                 max_retries=2, base_backoff=0.001)
+    assert state.requests == 3
+    assert results[0].source == 'fallback' and results[0].error == 'HTTP 503'
+    assert dispatcher.stats['retries'] == 2
+
+
+@pytest.mark.parametrize('body', [{'promptFeedback': {'blockReason': 'SAFETY'}}, {'candidates': []}])
+def test_invalid_answer_falls_back_without_failing_the_run(body):
+    jobs = [make_job(symbol) for symbol in SYMBOLS[:4]]
+    blocked = lambda prompt: body if 'SYM02USDT' in prompt else None
+    results, dispatcher, state, _ = run_dispatch(jobs, {'response': blocked})
+
+    by_symbol = {result.symbol: result for result in results}
+    assert by_symbol['SYM02USDT'].source == 'fallback'
+    assert by_symbol['SYM02USDT'].error == 'jawaban Gemini tidak valid'
+    assert all(result.source == 'gemini' for symbol, result in by_symbol.items() if symbol != 'SYM02USDT')
+    assert state.requests == 4 and dispatcher.stats['fallback'] == 1
+
+
+def test_prompt_over_budget_falls_back_without_request(monkeypatch):
+    monkeypatch.setattr(prompt_builder.prompt_builder, 'token_budget', 10)
+    monkeypatch.setattr(prompt_builder.console, 'quiet', True)
+    # Job dengan candle terakhir memakai prompt lengkap (lewat budget), job ringkasan tetap dikirim
+    jobs = [make_job('BTCUSDT', latest={'timestamp': 1_700_000_000_000, 'close': 100.0}), make_job('ETHUSDT')]
+    results, dispatcher, state, _ = run_dispatch(jobs, max_retries=2, base_backoff=0.001)
+
+    by_symbol = {result.symbol: result for result in results}
+    assert by_symbol['BTCUSDT'].source == 'fallback'
+    assert by_symbol['BTCUSDT'].error == 'prompt melebihi budget token'
+    assert by_symbol['ETHUSDT'].source == 'gemini'
+    assert state.requests == 1 and 'BTCUSDT' not in ''.join(state.prompts)
+    assert dispatcher.stats['over_budget'] == 1 and dispatcher.stats['retries'] == 0
+    assert dispatcher.stats['requests'] == 1
+
+
+def test_cache_hits_skip_the_request(tmp_path):
+    cache = GeminiResponseCache(str(tmp_path), ttl=60)
+    jobs = [make_job(symbol) for symbol in SYMBOLS[:4]]
+    run_dispatch(jobs, cache=cache, batch_size=2)
+    results, _, state, _ = run_dispatch(jobs + [make_job('NEWUSDT')], cache=cache, batch_size=2)
+
+    assert [result.source for result in results] == ['cache'] * 4 + ['gemini']
+    assert state.requests == 1
+
+
+def test_split_sections_and_percentiles():
+    jobs = [make_job('AAAUSDT'), make_job('BBBUSDT')]
+    text = 'pembuka\n### AAAUSDT 1h\nsatu\ndua\n### BBBUSDT 1h\ntiga'
+    assert split_sections(text, jobs) == {'### AAAUSDT 1h': 'satu\ndua', '### BBBUSDT 1h': 'tiga'}
+    assert latency_percentiles([]) == {}
+    assert latency_percentiles(range(1, 101))['p50'] == pytest.approx(50.5)
+
+
+if __name__ == "__main__":
+    results, dispatcher, state, elapsed = run_dispatch([make_job(symbol) for symbol in SYMBOLS],
+                                                       {'latency': 0.05}, concurrency=4)
+    print(f'✅ {len(results)} analisis dalam {elapsed:.2f}s, maks {state.max_inflight} paralel, '
+          f'latency {dispatcher.percentiles()}')
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test streaming Gemini (streamGenerateContent?alt=sse) terhadap mock chunked:
+potongan datang bertahap, cache, error status, dan stream yang putus di tengah
+"""
+import asyncio
+import sys
+import time
+sys.path.append('.')
+import gemini_analyzer
+import prompt_builder
+from analysis_context import AnalysisContext
+from gemini_cache import GeminiResponseCache
+from http_client import close_http_client
+from indicators import calculate_indicators
+from mock_servers import create_gemini_app, start_server, stream_chunks
+from model_registry import ModelRegistry
+from test_with_simulation import generate_sample_klines
+import numpy as np
+import pytest
+
+TEXT = ' '.join(f'kata{i}' for i in range(30))
+
+
+@pytest.fixture(scope='module')
+def result():
+    np.random.seed(3)
+    return calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h')
+
+
+def run_stream(result, tmp_path, cache, runs=1, **app_kwargs):
+    async def run():
+        app = create_gemini_app(text=TEXT, **app_kwargs)
+        runner, base_url = await start_server(app)
+        gemini_analyzer.GEMINI_STREAM_URL = f'{base_url}/v1beta/models/gemini-1.5-flash-latest:streamGenerateContent'
+        context = AnalysisContext(ModelRegistry(str(tmp_path / 'models')))
+        # Rekomendasi dihitung dulu seperti di main.py, jadi waktu yang diukur murni waktu Gemini
+        context.recommendation(result, 'BTCUSDT', '1h')
+        try:
+            streams = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                arrivals = []
+                async for chunk in gemini_analyzer.stream_analysis_with_gemini(
+                        result, 'test-key', 'BTCUSDT', '1h', context=context, cache=cache):
+                    arrivals.append((time.perf_counter() - started, chunk))
+                streams.append(arrivals)
+            return streams, app['state']
+        finally:
+            await close_http_client()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_analyzer, 'GEMINI_STREAM_URL', gemini_analyzer.GEMINI_STREAM_URL)
+    return GeminiResponseCache(str(tmp_path / 'gemini'), ttl=60)
+
+
+def test_chunks_arrive_progressively(result, tmp_path, cache):
+    (arrivals,), state = run_stream(result, tmp_path, cache, chunk_words=3, chunk_delay=0.05)
+
+    assert [chunk for _, chunk in arrivals] == stream_chunks(TEXT, 3)
+    assert ''.join(chunk for _, chunk in arrivals) == TEXT
+    # Potongan pertama jauh sebelum jawaban lengkap (10 potongan x 50ms)
+    first, last = arrivals[0][0], arrivals[-1][0]
+    assert first < 0.2 and last - first >= 0.4
+    assert state.requests == 1
+
+
+def test_completed_stream_is_cached(result, tmp_path, cache):
+    (first, second), state = run_stream(result, tmp_path, cache, runs=2)
+    assert state.requests == 1
+    assert [chunk for _, chunk in second] == [TEXT]
+    assert cache.stats['stores'] == 1
+
+
+def test_error_status_yields_error_message(result, tmp_path, cache):
+    (arrivals,), _ = run_stream(result, tmp_path, cache, status=503)
+    assert len(arrivals) == 1 and arrivals[0][1].startswith('Error: 503')
+    assert cache.stats['stores'] == 0
+
+
+def test_broken_stream_keeps_partial_text_and_is_not_cached(result, tmp_path, cache):
+    (arrivals,), _ = run_stream(result, tmp_path, cache, chunk_words=3, stream_break_after=4)
+    chunks = [chunk for _, chunk in arrivals]
+    assert ''.join(chunks[:4]) == ''.join(stream_chunks(TEXT, 3)[:4])
+    assert 'Error: stream Gemini terputus' in chunks[-1]
+    assert cache.stats['stores'] == 0
+
+
+@pytest.mark.parametrize('reason', ['MAX_TOKENS', 'SAFETY'])
+def test_unfinished_stream_is_not_cached(result, tmp_path, cache, reason):
+    (first, second), state = run_stream(result, tmp_path, cache, runs=2, chunk_words=3, finish_reason=reason)
+    chunks = [chunk for _, chunk in first]
+    assert ''.join(chunks[:-1]) == TEXT
+    assert chunks[-1] == f'\n\nError: jawaban Gemini tidak lengkap (finishReason {reason})'
+    # Jawaban terpotong tidak dipakai ulang: run kedua minta lagi ke Gemini
+    assert state.requests == 2 and [chunk for _, chunk in second] == chunks
+    assert cache.stats['stores'] == 0
+
+
+def test_prompt_over_budget_yields_error_without_request(result, tmp_path, cache, monkeypatch):
+    monkeypatch.setattr(prompt_builder.prompt_builder, 'token_budget', 10)
+    monkeypatch.setattr(prompt_builder.console, 'quiet', True)
+    (arrivals,), state = run_stream(result, tmp_path, cache)
+    assert len(arrivals) == 1 and arrivals[0][1].startswith('Error: Prompt BTCUSDT 1h')
+    assert 'melebihi budget 10' in arrivals[0][1]
+    assert state.requests == 0 and cache.stats['stores'] == 0
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    np.random.seed(3)
+    data = calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h')
+    with tempfile.TemporaryDirectory() as tmp:
+        (arrivals,), _ = run_stream(data, Path(tmp), False, chunk_words=3, chunk_delay=0.05)
+    print(f'✅ Potongan pertama {arrivals[0][0] * 1000:.0f}ms, lengkap {arrivals[-1][0] * 1000:.0f}ms '
+          f'({len(arrivals)} potongan)')
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test HttpClient: koneksi dipakai ulang antar request dan ditutup dengan bersih
+"""
+import asyncio
+import sys
+sys.path.append('.')
+import binance_data
+from binance_data import get_binance_data
+from http_client import HttpClient
+from mock_servers import create_binance_app, start_server
+
+
+async def scan_with_shared_client(symbols):
+    app = create_binance_app()
+    runner, base_url = await start_server(app)
+    binance_data.BASE_URL = f'{base_url}/api/v3/klines'
+    client = HttpClient()
+    try:
+        session = await client.get_session()
+        results = [await get_binance_data(symbol, '1h', 10, session=session) for symbol in symbols]
+        assert await client.get_session() is session
+    finally:
+        await client.close()
+        await runner.cleanup()
+    return results, app['state'], session
+
+
+def test_shared_client_reuses_connection(monkeypatch):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    results, state, session = asyncio.run(scan_with_shared_client(['BTCUSDT', 'ETHUSDT', 'SOLUSDT']))
+
+    assert all(len(klines) == 10 for klines in results)
+    assert state.requests == 3
+    assert len(state.connections) == 1
+    assert session.closed
+
+
+def test_new_event_loop_gets_new_session():
+    client = HttpClient()
+
+    async def open_session():
+        return await client.get_session()
+
+    first = asyncio.run(open_session())
+    second = asyncio.run(open_session())
+    assert first is not second
+    asyncio.run(client.close())
+
+
+if __name__ == "__main__":
+    results, state, _ = asyncio.run(scan_with_shared_client(['BTCUSDT', 'ETHUSDT']))
+    print(f'✅ {state.requests} request lewat {len(state.connections)} koneksi')
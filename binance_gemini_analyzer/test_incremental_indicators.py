@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test IncrementalIndicatorState: hasil update per candle harus sama dengan calculate_indicators
+"""
+import sys
+sys.path.append('.')
+import indicators
+from incremental_indicators import IncrementalIndicatorState
+from indicators import calculate_indicators
+from param_sweep import save_best_params
+from test_with_simulation import generate_sample_klines
+import numpy as np
+
+STREAMED_COLUMNS = [
+    'close', 'SMA_20', 'SMA_50', 'SMA_100', 'EMA_12', 'EMA_26', 'EMA_50',
+    'MACD', 'MACD_Signal', 'MACD_Histogram', 'RSI',
+    'BB_Middle', 'BB_Upper', 'BB_Lower', 'BB_Width',
+    'Lowest_Low', 'Highest_High', '%K', '%D', 'TR', 'ATR', 'ATR_Percent',
+    'Williams_R', 'CCI', 'ADX', 'Plus_DI', 'Minus_DI', 'VWAP',
+    'Tenkan_sen', 'Kijun_sen', 'Senkou_A', 'Senkou_B', 'Chikou_span'
+]
+
+
+def assert_matches(snapshot, record):
+    for column in STREAMED_COLUMNS:
+        np.testing.assert_allclose(snapshot[column], record[column], rtol=1e-8, atol=1e-8,
+                                   err_msg=column)
+    assert snapshot['timestamp'] == record['timestamp']
+    assert snapshot['Signal_Score'] == record['Signal_Score']
+    assert snapshot['Recommendation'] == record['Recommendation']
+
+
+def test_incremental_matches_batch():
+    np.random.seed(1)
+    klines = generate_sample_klines('BTCUSDT', 260, 45000)
+
+    state = IncrementalIndicatorState('1h', history=klines[:200])
+    assert_matches(state.snapshot(), calculate_indicators(klines[:200], '1h').latest())
+
+    for end in range(201, 261):
+        snapshot = state.update(klines[end - 1])
+        if end % 20 == 0:
+            assert_matches(snapshot, calculate_indicators(klines[:end], '1h').latest())
+
+    assert state.count == 260
+
+
+def test_incremental_other_timeframe_and_duplicates():
+    np.random.seed(2)
+    klines = generate_sample_klines('ETHUSDT', 150, 3000)
+
+    state = IncrementalIndicatorState('5m', history=klines)
+    record = calculate_indicators(klines, '5m').latest()
+    for column in ['SMA_10', 'EMA_6', 'RSI', '%D', 'ATR', 'ADX', 'CCI', 'Senkou_B']:
+        np.testing.assert_allclose(state.snapshot()[column], record[column], rtol=1e-8, err_msg=column)
+
+    # Kline lama / duplikat diabaikan
+    assert state.update(klines[-1]) is None
+    assert state.count == 150
+
+
+def test_incremental_uses_tuned_params_like_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(indicators, 'PARAMS_DIR', str(tmp_path))
+    tuned = {'rsi_period': 9, 'ema_fast': 8, 'ema_slow': 21, 'sma_fast': 15, 'cci_period': 14, 'bb_period': 14}
+    save_best_params('BTCUSDT', '1h', tuned, {'total_r': 1.0})
+    np.random.seed(5)
+    klines = generate_sample_klines('BTCUSDT', 230, 45000)
+
+    state = IncrementalIndicatorState('1h', history=klines[:200], symbol='BTCUSDT')
+    assert state.params['rsi_period'] == 9 and state.params['ema_fast'] == 8
+    for end in range(201, 231):
+        snapshot = state.update(klines[end - 1])
+    result = calculate_indicators(klines, '1h', symbol='BTCUSDT')
+    record = result.latest()
+    assert state.params == result.params
+    assert 'EMA_8' in snapshot and 'SMA_15' in snapshot
+    for column in ['EMA_8', 'EMA_21', 'SMA_15', 'MACD', 'RSI', 'CCI', 'BB_Upper', 'ATR', 'ADX']:
+        np.testing.assert_allclose(snapshot[column], record[column], rtol=1e-8, atol=1e-8, err_msg=column)
+    assert snapshot['Signal_Score'] == record['Signal_Score']
+    assert snapshot['Recommendation'] == record['Recommendation']
+
+
+if __name__ == "__main__":
+    test_incremental_matches_batch()
+    test_incremental_other_timeframe_and_duplicates()
+    print('✅ Incremental indicators OK')
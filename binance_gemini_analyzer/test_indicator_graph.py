@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test indicator graph: perhitungan selektif sama dengan perhitungan penuh,
+planner hanya menjalankan node yang dibutuhkan, rolling window bersama dihitung sekali
+"""
+import sys
+sys.path.append('.')
+import indicators
+import trading_signals
+from indicator_graph import IndicatorGraph, Workspace
+from indicators import INDICATOR_GRAPH, calculate_indicators, get_indicator_params, klines_to_frame
+from test_with_simulation import generate_sample_klines
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def klines():
+    np.random.seed(11)
+    indicators.console.quiet = True
+    return generate_sample_klines('BTCUSDT', 600, 45000)
+
+
+@pytest.mark.parametrize('timeframe', ['1m', '1h', '1d'])
+def test_selected_columns_match_full_computation(klines, timeframe):
+    full = calculate_indicators(klines, timeframe).df
+    for columns in (['RSI', 'ATR'], ['Signal_Score'], trading_signals.recommendation_columns):
+        selected = calculate_indicators(klines, timeframe, columns=columns).df
+        assert set(selected.columns) < set(full.columns)
+        for column in selected.columns:
+            assert selected[column].equals(full[column]), column
+
+
+def test_plan_only_runs_needed_nodes():
+    params = get_indicator_params('1h')
+    names = [node.name for node in INDICATOR_GRAPH.plan(['RSI', 'ATR'], params, ['close', 'high', 'low'])]
+    assert names == ['rsi', 'true_range', 'atr']
+
+    ohlcv = ['open', 'high', 'low', 'close', 'volume']
+    score_plan = {node.name for node in INDICATOR_GRAPH.plan(['Signal_Score'], params, ohlcv)}
+    assert 'adx' in score_plan and 'candlestick' in score_plan
+    assert not score_plan & {'tenkan_sen', 'senkou_b', 'vwap', 'sma_long', 'trend_regression'}
+
+
+def test_shared_windows_computed_once(klines):
+    params = {**get_indicator_params('1h'), 'williams_period': 14, 'stoch_k': 14, 'ichimoku_tenkan': 14}
+    df = klines_to_frame(klines)
+    workspace = Workspace(df)
+    for node in INDICATOR_GRAPH.plan(['Williams_R', '%K', 'Tenkan_sen'], params, df.columns):
+        for column, values in node.func(df, params, workspace).items():
+            df[column] = values
+
+    assert workspace.stats[('rolling', 'high', 14, 'max', False)] == 1
+    assert workspace.stats[('rolling', 'low', 14, 'min', False)] == 1
+    # Semua window high/low (termasuk Ichimoku) dijawab dari satu sparse table per kolom
+    assert workspace.stats[('extrema', 'high', 'max')] == 1
+    assert workspace.stats[('extrema', 'low', 'min')] == 1
+
+
+def test_unknown_column_and_bad_order_raise():
+    with pytest.raises(KeyError):
+        INDICATOR_GRAPH.plan(['Not_An_Indicator'], get_indicator_params('1h'))
+
+    graph = IndicatorGraph()
+    graph.node('double', inputs=['single'], outputs=['double'])(lambda df, params, ws: {})
+    graph.node('single', inputs=['close'], outputs=['single'])(lambda df, params, ws: {})
+    with pytest.raises(ValueError):
+        graph.plan(['double'], {}, ['close'])
+    with pytest.raises(ValueError):
+        graph.node('single')(lambda df, params, ws: {})
+
+
+if __name__ == "__main__":
+    np.random.seed(11)
+    data = generate_sample_klines('BTCUSDT', 600, 45000)
+    result = calculate_indicators(data, '1h', columns=['RSI', 'ATR'])
+    print(f"✅ Kolom dihitung: {list(result.df.columns)}")
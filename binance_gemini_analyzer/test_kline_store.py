@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test KlineStore dan sync incremental terhadap mock server Binance
+"""
+import asyncio
+import sys
+import time
+sys.path.append('.')
+import binance_data
+from binance_data import INTERVAL_MS, KLINE_DTYPE, klines_to_array, parse_klines_json
+from http_client import HttpClient
+from indicators import calculate_indicators
+from kline_store import KlineStore, sync_klines
+from mock_servers import create_binance_app, start_server, mock_kline_rows
+import numpy as np
+import json
+
+
+def make_rows(count, end_ms=None, interval='1h'):
+    interval_ms = INTERVAL_MS[interval]
+    end_ms = end_ms or int(time.time() * 1000)
+    last_closed = end_ms // interval_ms * interval_ms - interval_ms
+    first = last_closed - (count - 1) * interval_ms
+    return mock_kline_rows('BTCUSDT', interval, range(first, last_closed + 1, interval_ms))
+
+
+def test_append_load_and_dedupe(tmp_path):
+    store = KlineStore(str(tmp_path))
+    rows = make_rows(300)
+
+    assert store.load('BTCUSDT', '1h').dtype == KLINE_DTYPE
+    assert store.last_timestamp('BTCUSDT', '1h') is None
+    assert store.append('BTCUSDT', '1h', rows[:200]) == 200
+    assert store.append('BTCUSDT', '1h', rows[150:]) == 100
+
+    stored = store.load('BTCUSDT', '1h')
+    assert len(stored) == 300
+    assert stored['timestamp'][-1] == rows[-1][0]
+    np.testing.assert_allclose(stored['close'], [float(row[4]) for row in rows])
+
+
+def test_partial_record_is_truncated(tmp_path):
+    store = KlineStore(str(tmp_path))
+    store.append('BTCUSDT', '1h', make_rows(10))
+    with open(store.path('BTCUSDT', '1h'), 'ab') as f:
+        f.write(b'\x00' * 7)
+    assert len(store.load('BTCUSDT', '1h')) == 10
+
+
+def test_indicators_from_stored_array_match_list(tmp_path):
+    store = KlineStore(str(tmp_path))
+    rows = make_rows(200)
+    store.append('BTCUSDT', '1h', rows)
+
+    from_store = calculate_indicators(store.load('BTCUSDT', '1h'), '1h').latest()
+    from_list = calculate_indicators(rows, '1h').latest()
+    for column in ['RSI', 'MACD', 'ATR', 'CCI', 'Signal_Score']:
+        assert from_store[column] == from_list[column]
+
+
+def test_parse_klines_json_matches_list_conversion():
+    rows = make_rows(50)
+    raw = json.dumps(rows).encode()
+
+    parsed = parse_klines_json(raw, KLINE_DTYPE.names)
+    np.testing.assert_array_equal(parsed, klines_to_array(rows))
+
+    ohlcv = parse_klines_json(raw)
+    assert ohlcv.dtype.names == ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+    assert ohlcv['timestamp'].dtype == np.int64
+    assert len(parse_klines_json(b'[]')) == 0
+
+
+def test_parse_klines_json_falls_back_on_unexpected_format():
+    # Kolom tambahan di tiap kline -> jumlah angka tidak kelipatan 12, pakai json.loads
+    raw = b'[[1, "1.0", "2.0", "0.5", "1.5", "10", 2, "15", 3, "5", "7", "0", "extra"]]'
+    assert parse_klines_json(raw)['close'][0] == 1.5
+    pretty = json.dumps(make_rows(3), indent=2)
+    np.testing.assert_array_equal(parse_klines_json(pretty), parse_klines_json(json.dumps(make_rows(3))))
+
+
+async def run_sync(store):
+    app = create_binance_app()
+    runner, base_url = await start_server(app)
+    binance_data.BASE_URL = f'{base_url}/api/v3/klines'
+    try:
+        async with HttpClient() as client:
+            result = await sync_klines('BTCUSDT', '1h', store=store, session=await client.get_session())
+    finally:
+        await runner.cleanup()
+    return result, app['state']
+
+
+def test_sync_fetches_only_new_candles(tmp_path, monkeypatch):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    store = KlineStore(str(tmp_path))
+    rows = make_rows(500)
+    store.append('BTCUSDT', '1h', klines_to_array(rows[:-30]))
+
+    result, state = asyncio.run(run_sync(store))
+
+    assert state.requests == 1
+    assert int(state.last_query['startTime']) == rows[-31][0] + INTERVAL_MS['1h']
+    # 30 candle tertutup disimpan, candle yang masih berjalan hanya ada di hasil
+    assert len(store.load('BTCUSDT', '1h')) == 500
+    assert len(result) == 501
+    assert np.all(np.diff(result['timestamp']) == INTERVAL_MS['1h'])
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as folder:
+        result, state = asyncio.run(run_sync(KlineStore(folder)))
+        print(f'✅ Sync awal: {len(result)} candles, {state.requests} request')
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test KlineStream terhadap mock WebSocket Binance: multiplex, reconnect, gap fill REST,
+dan state incremental sama dengan calculate_indicators
+"""
+import asyncio
+import statistics
+import sys
+import time
+sys.path.append('.')
+import binance_data
+import indicators
+import kline_stream
+from binance_data import INTERVAL_MS
+from http_client import HttpClient
+from indicators import calculate_indicators
+from kline_stream import KlineStream
+from mock_servers import create_binance_app, mock_kline_rows, start_server
+from param_sweep import save_best_params
+import numpy as np
+
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+INTERVAL = '1m'
+HISTORY = 300
+
+
+async def run_stream(stream_candles=20, **kwargs):
+    interval_ms = INTERVAL_MS[INTERVAL]
+    now_ms = (int(time.time() * 1000) // interval_ms - 2 * stream_candles) * interval_ms + 1
+    app = create_binance_app(now_ms=now_ms, stream_candles=stream_candles, stream_delay=0.01, **kwargs)
+    runner, base_url = await start_server(app)
+    binance_data.BASE_URL = f'{base_url}/api/v3/klines'
+    last_open = now_ms // interval_ms * interval_ms + (stream_candles - 1) * interval_ms
+    updates = []
+
+    async with HttpClient() as client:
+        # Jam stream mengikuti waktu mock supaya candle mock yang masih berjalan tidak dianggap close
+        stream = KlineStream(SYMBOLS, INTERVAL, on_update=updates.append, session=await client.get_session(),
+                             history=HISTORY, stream_url=f'{base_url.replace("http", "ws")}/stream',
+                             initial_backoff=0.01, clock=app['state'].current_time)
+
+        async def stop_when_done():
+            while not all(state.last_timestamp == last_open for state in stream.states.values()):
+                await asyncio.sleep(0.01)
+            await stream.stop()
+
+        try:
+            await asyncio.wait_for(asyncio.gather(stream.run(), stop_when_done()), timeout=20)
+        finally:
+            await runner.cleanup()
+    return stream, updates, app['state'], last_open
+
+
+def assert_contiguous(updates, symbol, last_open):
+    timestamps = [update.snapshot['timestamp'] for update in updates if update.symbol == symbol]
+    assert timestamps[-1] == last_open
+    assert np.all(np.diff(timestamps) == INTERVAL_MS[INTERVAL])
+
+
+def assert_matches_batch(stream, symbol, last_open):
+    interval_ms = INTERVAL_MS[INTERVAL]
+    first_open = last_open - (stream.states[symbol].count - 1) * interval_ms
+    rows = mock_kline_rows(symbol, INTERVAL, range(first_open, last_open + 1, interval_ms))
+    record = calculate_indicators(rows, INTERVAL, symbol=symbol).latest()
+    snapshot = stream.snapshot(symbol)
+    for column in ['close', 'RSI', 'MACD', 'ATR', 'ADX', 'Williams_R']:
+        np.testing.assert_allclose(snapshot[column], record[column], rtol=1e-8, err_msg=column)
+    assert snapshot['Signal_Score'] == record['Signal_Score']
+    assert snapshot['Recommendation'] == record['Recommendation']
+
+
+def test_stream_multiplexes_and_matches_batch(monkeypatch, tmp_path):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    # Satu symbol punya parameter hasil param_sweep, hasil stream harus tetap sama dengan batch
+    monkeypatch.setattr(indicators, 'PARAMS_DIR', str(tmp_path))
+    save_best_params(SYMBOLS[0], INTERVAL, {'rsi_period': 9, 'ema_fast': 8, 'ema_slow': 21}, {'total_r': 1.0})
+    indicators.console.quiet = True
+    stream, updates, state, last_open = asyncio.run(run_stream())
+
+    # Satu koneksi untuk semua symbol
+    assert state.stream_connections == 1
+    assert sorted(state.stream_queries[0]) == sorted(f'{s.lower()}@kline_{INTERVAL}' for s in SYMBOLS)
+    for symbol in SYMBOLS:
+        assert_contiguous(updates, symbol, last_open)
+        assert_matches_batch(stream, symbol, last_open)
+    assert stream.states[SYMBOLS[0]].params['rsi_period'] == 9 and 'EMA_8' in stream.snapshot(SYMBOLS[0])
+
+    stream_latencies = [update.latency_ms for update in updates if update.source == 'stream']
+    assert stream_latencies and statistics.median(stream_latencies) < 50
+
+
+def test_reconnect_and_gap_fill(monkeypatch):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    indicators.console.quiet = True
+    stream, updates, state, last_open = asyncio.run(
+        run_stream(stream_candles=25, stream_drop_after=6, stream_skip={4, 11, 12, 20}))
+
+    assert state.stream_connections >= 3 and stream.stats['reconnects'] >= 2
+    assert any(update.source == 'rest' for update in updates)
+    for symbol in SYMBOLS:
+        assert_contiguous(updates, symbol, last_open)
+        assert_matches_batch(stream, symbol, last_open)
+
+
+def test_backoff_grows_and_is_capped():
+    stream = KlineStream(['BTCUSDT'], '1m', initial_backoff=1.0, max_backoff=8.0)
+    delays = [stream._backoff(attempt) for attempt in range(8)]
+    assert 0.5 <= delays[0] <= 1.0
+    assert all(4.0 <= delay <= 8.0 for delay in delays[4:])
+    assert stream.url == f'{kline_stream.STREAM_URL}?streams=btcusdt@kline_1m'
+
+
+if __name__ == "__main__":
+    stream, updates, state, _ = asyncio.run(run_stream())
+    print(f'✅ {len(updates)} update, median latency {statistics.median(u.latency_ms for u in updates):.2f} ms, '
+          f'{state.stream_connections} koneksi')
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test inference bar terakhir: hasilnya sama dengan prediksi full history
+"""
+import sys
+sys.path.append('.')
+from indicators import calculate_indicators
+from model_registry import ModelRegistry
+from test_with_simulation import generate_sample_klines
+from trading_signals import TradingSignalEngine
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope='module')
+def frames():
+    np.random.seed(21)
+    return [calculate_indicators(generate_sample_klines('X', 300, price), '1h').df
+            for price in (45000, 3000, 100, 1.5)]
+
+
+@pytest.fixture(scope='module')
+def engine(frames):
+    engine = TradingSignalEngine()
+    engine.train_model(frames[0].copy())
+    return engine
+
+
+def test_latest_features_match_full_matrix(engine, frames):
+    df = frames[1]
+    full = engine.prepare_features(df.copy())
+    for n in (1, 5):
+        pd.testing.assert_frame_equal(engine.latest_features(df, n), full.iloc[-n:])
+    assert 'Volume_Ratio' not in df.columns
+
+
+def test_predict_latest_matches_full_prediction(engine, frames):
+    df = frames[2]
+    full = engine.predict_signals(df.copy())
+    latest = engine.predict_latest(df, 3)
+
+    np.testing.assert_array_equal(latest['ML_Signal'].to_numpy(), full['ML_Signal'].iloc[-3:].to_numpy())
+    np.testing.assert_allclose(latest['ML_Confidence'].to_numpy(), full['ML_Confidence'].iloc[-3:].to_numpy())
+
+
+def test_batch_matches_single_predictions(engine, frames):
+    batch = engine.predict_latest_batch(frames)
+    assert batch == [engine.latest_signal(df) for df in frames]
+    assert engine.predict_latest_batch([]) == []
+
+
+def test_recommendation_uses_ml_signal_of_latest_bar(engine, frames):
+    df = frames[3]
+    full = engine.predict_signals(df.copy())
+    recommendation = engine.generate_trading_recommendation(df, 'XUSDT', '1h')
+
+    assert recommendation['ml_signal'] == full['ML_Signal'].iloc[-1]
+    assert recommendation['ml_confidence'] == round(full['ML_Confidence'].iloc[-1], 1)
+
+
+def test_registry_batch_keeps_order(tmp_path, frames):
+    registry = ModelRegistry(str(tmp_path))
+    items = [('BTCUSDT', '1h', frames[0]), ('ETHUSDT', '1h', frames[1]), ('BTCUSDT', '1h', frames[2])]
+    expected = [registry.get_engine(symbol, tf, df).latest_signal(df) for symbol, tf, df in items]
+    assert registry.predict_latest_batch(items) == expected
+
+
+if __name__ == "__main__":
+    np.random.seed(21)
+    df = calculate_indicators(generate_sample_klines('X', 300, 45000), '1h').df
+    engine = TradingSignalEngine()
+    print(f'✅ Prediksi bar terakhir: {engine.latest_signal(df)}')
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test ModelRegistry: model per symbol/timeframe, persist ke disk, LRU di memori
+"""
+import sys
+sys.path.append('.')
+from indicators import calculate_indicators
+from model_registry import ModelRegistry
+from test_with_simulation import generate_sample_klines
+from trading_signals import TradingSignalEngine
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def results():
+    np.random.seed(3)
+    return {
+        ('BTCUSDT', '1h'): calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h'),
+        ('ETHUSDT', '1h'): calculate_indicators(generate_sample_klines('ETHUSDT', 300, 3000), '1h'),
+        ('BTCUSDT', '1d'): calculate_indicators(generate_sample_klines('BTCUSDT', 400, 45000), '1d'),
+    }
+
+
+def test_engine_per_symbol_and_timeframe(tmp_path, results):
+    registry = ModelRegistry(str(tmp_path))
+    engines = {key: registry.get_engine(key[0], key[1], result) for key, result in results.items()}
+
+    assert all(engine.is_trained for engine in engines.values())
+    assert len({id(engine) for engine in engines.values()}) == 3
+    assert registry.get_engine('BTCUSDT', '1h', results[('BTCUSDT', '1h')]) is engines[('BTCUSDT', '1h')]
+    assert len(list(tmp_path.iterdir())) == 3
+
+    # Schema fitur 1d berbeda (tanpa EMA_12/26) dan tetap bisa dipakai tanpa error
+    rec = registry.generate_trading_recommendation(results[('BTCUSDT', '1d')], 'BTCUSDT', '1d')
+    assert rec['symbol'] == 'BTCUSDT' and 'error' not in rec
+
+
+def test_models_are_loaded_from_disk_without_training(tmp_path, results, monkeypatch):
+    ModelRegistry(str(tmp_path)).get_engine('BTCUSDT', '1h', results[('BTCUSDT', '1h')])
+
+    def fail_training(self, df):
+        raise AssertionError('model seharusnya di-load dari disk')
+
+    monkeypatch.setattr(TradingSignalEngine, 'train_model', fail_training)
+    engine = ModelRegistry(str(tmp_path)).get_engine('BTCUSDT', '1h', results[('BTCUSDT', '1h')])
+    assert engine.is_trained
+
+
+def test_lru_eviction_keeps_files(tmp_path, results):
+    registry = ModelRegistry(str(tmp_path), max_models=2)
+    for (symbol, timeframe), result in results.items():
+        registry.get_engine(symbol, timeframe, result)
+
+    assert len(registry._engines) == 2
+    assert ('BTCUSDT', '1h') not in {key[:2] for key in registry._engines}
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_empty_data_returns_error(tmp_path, results):
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.generate_trading_recommendation([], 'BTCUSDT', '1h') == {"error": "No data available"}
+
+
+if __name__ == "__main__":
+    import tempfile
+    np.random.seed(3)
+    result = calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h')
+    with tempfile.TemporaryDirectory() as folder:
+        rec = ModelRegistry(folder).generate_trading_recommendation(result, 'BTCUSDT', '1h')
+        print(f'✅ {rec["symbol"]}: {rec["action"]} ({rec["confidence"]}%)')
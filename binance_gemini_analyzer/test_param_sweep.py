@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test param sweep: hasil RollingCache sama dengan calculate_indicators + run_backtest,
+checkpoint bisa dilanjutkan, parameter terbaik dipakai calculate_indicators
+"""
+import json
+import sys
+sys.path.append('.')
+import indicators
+from backtest import run_backtest
+from indicators import calculate_indicators, get_indicator_params
+from param_sweep import (RollingCache, grid_candidates, random_candidates, run_sweep, save_best_params,
+                         candidate_key)
+from test_with_simulation import generate_sample_klines
+import numpy as np
+import pytest
+
+SMALL_SPACE = {'rsi_period': [7, 14], 'ema_fast': [6, 13], 'ema_slow': [13, 26], 'atr_period': [7, 14]}
+
+
+@pytest.fixture(scope='module')
+def klines():
+    np.random.seed(4)
+    return generate_sample_klines('BTCUSDT', 800, 45000)
+
+
+@pytest.fixture(scope='module')
+def cache(klines):
+    return RollingCache(klines, '1h')
+
+
+def test_cache_matches_full_indicator_pipeline(klines, cache):
+    for params in random_candidates(6, seed=3) + [{}]:
+        result = calculate_indicators(klines, '1h', params=params)
+        full = {**get_indicator_params('1h'), **params}
+        start = max(full['sma_slow'], full['bb_period'])
+
+        np.testing.assert_array_equal(cache.signal_score(full)[start:], result.column('Signal_Score'))
+        assert cache.evaluate(params) == run_backtest(result, use_ml=False)
+
+
+def test_each_ema_span_computed_once(klines):
+    cache = RollingCache(klines, '1h')
+    candidates = grid_candidates(SMALL_SPACE)
+    for params in candidates:
+        cache.evaluate(params)
+
+    spans = {span for params in candidates for span in (params['ema_fast'], params['ema_slow'])}
+    assert cache.stats['ema'] == len(spans)
+    assert cache.stats['rsi'] == len(SMALL_SPACE['rsi_period'])
+    # Prefix sum dibuat sekali per seri, bukan per kandidat
+    assert cache.stats['prefix'] < len(candidates)
+
+
+def test_candidates_are_valid_and_unique():
+    grid = grid_candidates(SMALL_SPACE)
+    assert all(params['ema_fast'] < params['ema_slow'] for params in grid)
+    assert len(grid) == 12
+
+    sample = random_candidates(20, seed=1)
+    assert len({candidate_key(params) for params in sample}) == len(sample) == 20
+    assert sample == random_candidates(20, seed=1)
+
+
+def test_sweep_resumes_from_checkpoint(klines, tmp_path):
+    checkpoint = tmp_path / 'sweep.json'
+    candidates = grid_candidates(SMALL_SPACE)
+
+    table, best = run_sweep('BTCUSDT', '1h', klines, candidates[:5], workers=2,
+                            checkpoint_path=str(checkpoint), min_trades=1, chunk_size=2)
+    assert len(table) == 5 and best is not None
+
+    # Tandai satu hasil di checkpoint: kalau tidak dihitung ulang, nilainya tetap
+    saved = json.loads(checkpoint.read_text())
+    marked = candidate_key(candidates[0])
+    saved['results'][marked]['metrics']['total_r'] = 999.0
+    checkpoint.write_text(json.dumps(saved))
+
+    table, best = run_sweep('BTCUSDT', '1h', klines, candidates, workers=2,
+                            checkpoint_path=str(checkpoint), min_trades=1, chunk_size=3)
+    assert len(table) == len(candidates)
+    assert best['params'] == candidates[0] and best['metrics']['total_r'] == 999.0
+    assert len(json.loads(checkpoint.read_text())['results']) == len(candidates)
+
+
+def test_best_params_are_loaded_by_calculate_indicators(klines, tmp_path, monkeypatch):
+    monkeypatch.setattr(indicators, 'PARAMS_DIR', str(tmp_path))
+    save_best_params('BTCUSDT', '1h', {'rsi_period': 7, 'ema_fast': 6, 'ema_slow': 13}, {'total_r': 1.0})
+
+    tuned = calculate_indicators(klines, '1h', symbol='BTCUSDT')
+    assert tuned.params['rsi_period'] == 7 and 'EMA_6' in tuned.df.columns
+    assert calculate_indicators(klines, '1h', symbol='ETHUSDT').params == get_indicator_params('1h')
+    # Override eksplisit tetap menang
+    assert calculate_indicators(klines, '1h', params={'rsi_period': 21}, symbol='BTCUSDT').params['rsi_period'] == 21
+
+
+if __name__ == "__main__":
+    np.random.seed(4)
+    data = generate_sample_klines('BTCUSDT', 800, 45000)
+    table, best = run_sweep('BTCUSDT', '1h', data, grid_candidates(SMALL_SPACE), min_trades=1)
+    print(table.head().to_string(index=False))
+    print(f'✅ Parameter terbaik: {best["params"]}')
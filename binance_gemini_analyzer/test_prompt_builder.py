@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test PromptBuilder: presisi tetap, tabel riwayat, budget token, dan prompt lebih kecil dari versi lama
+"""
+import sys
+sys.path.append('.')
+import prompt_builder
+from indicators import calculate_indicators
+from prompt_builder import INSTRUCTIONS, PromptBudgetError, PromptBuilder, estimate_tokens, format_price, significant
+from test_with_simulation import generate_sample_klines
+import numpy as np
+import pytest
+
+RECOMMENDATION = {'action': 'BUY', 'confidence': 71.26, 'entry_price': 45123.456789, 'stop_loss': 44012.3,
+                  'take_profit_1': 46500.0, 'take_profit_2': 47800.0, 'risk_reward_ratio': 1.2391,
+                  'technical_score': 4, 'ml_signal': 1, 'ml_confidence': 66.66, 'support': 44000.0,
+                  'resistance': 47000.0, 'volatility': 3.14159, 'atr_percent': 1.41421}
+
+
+@pytest.fixture(scope='module')
+def result():
+    np.random.seed(21)
+    return calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h')
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    prompt_builder.console.quiet = True
+    yield
+    prompt_builder.console.quiet = False
+
+
+def test_fixed_precision_formatting():
+    assert format_price(45123.456789) == '45123.46'
+    assert format_price(0.0000123456) == '0.0000123456'
+    assert format_price(float('nan')) == '-' and format_price(None) == '-'
+    assert significant(4)(-715.9123) == '-715.9'
+    assert significant(3)(-1716.3) == '-1716'
+    assert significant(3)(0.00000123456) == '0.00000123'
+
+
+def test_market_block_has_no_raw_floats(result):
+    latest = result.latest()
+    block = PromptBuilder().market_block('BTCUSDT', '1h', latest, RECOMMENDATION)
+    assert block.startswith('ANALISIS TRADING BTCUSDT 1h')
+    assert f"RSI {latest['RSI']:.1f}" in block
+    assert 'entry 45123.46' in block and 'R:R 1.24' in block and 'conf% 71.3' in block
+    assert repr(latest['RSI']) not in block  # float mentah tidak ikut
+    assert 'e+' not in block and 'e-' not in block
+
+
+def test_scanner_recommendation_fallbacks():
+    recommendation = {**RECOMMENDATION, 'price': 2.5, 'current_rsi': 61.04, 'signal_score': 3}
+    block = PromptBuilder().market_block('XRPUSDT', '4h', None, recommendation, title='### XRPUSDT 4h')
+    assert block.startswith('### XRPUSDT 4h')
+    assert 'close 2.50000' in block and 'RSI 61.0' in block and 'skor 3' in block
+    assert 'ADX -' in block
+
+
+def test_history_table(result):
+    table = PromptBuilder().history_table(result, 5)
+    lines = table.splitlines()
+    assert lines[0].startswith('RIWAYAT 5 candle') and lines[1] == 'waktu,close,chg%,rsi,macd,vol,skor'
+    assert len(lines) == 7
+    close = result.column('close')
+    expected_change = (close[-1] / close[-2] - 1) * 100
+    assert lines[-1].split(',')[1] == format_price(close[-1])
+    assert lines[-1].split(',')[2] == f'{expected_change:.2f}'
+
+
+def test_token_budget_trims_history_then_raises(result):
+    latest = result.latest()
+    full = PromptBuilder(token_budget=10_000, history_rows=40)
+    full_prompt = full.build('BTCUSDT', '1h', latest, RECOMMENDATION, history=result)
+    assert 'RIWAYAT 40 candle' in full_prompt and full_prompt.endswith(INSTRUCTIONS)
+
+    core_tokens = estimate_tokens(PromptBuilder().build('BTCUSDT', '1h', latest, RECOMMENDATION))
+    tight = PromptBuilder(token_budget=core_tokens + 60, history_rows=40)
+    prompt = tight.build('BTCUSDT', '1h', latest, RECOMMENDATION, history=result)
+    assert tight.last_tokens <= tight.token_budget == core_tokens + 60
+    assert tight.stats['trimmed'] >= 2 and 'RIWAYAT 40' not in prompt
+
+    with pytest.raises(PromptBudgetError):
+        PromptBuilder(token_budget=core_tokens - 1).build('BTCUSDT', '1h', latest, RECOMMENDATION, history=result)
+
+
+def test_prompt_is_much_smaller_than_legacy(result):
+    from bench_prompt_builder import legacy_prompt
+    latest = result.latest()
+    legacy = legacy_prompt('BTCUSDT', '1h', latest, RECOMMENDATION)
+    compact = PromptBuilder().build('BTCUSDT', '1h', latest, RECOMMENDATION, history=result)
+    # Dengan 12 candle riwayat pun prompt baru tetap jauh lebih kecil
+    assert estimate_tokens(compact) < 0.8 * estimate_tokens(legacy)
+
+
+if __name__ == "__main__":
+    np.random.seed(21)
+    data = calculate_indicators(generate_sample_klines('BTCUSDT', 300, 45000), '1h')
+    builder = PromptBuilder()
+    print(builder.build('BTCUSDT', '1h', data.latest(), RECOMMENDATION, history=data))
+    print(f'✅ {builder.last_tokens} token (budget {builder.token_budget})')
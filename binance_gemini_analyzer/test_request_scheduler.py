@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test RequestScheduler terhadap mock Binance yang menegakkan limit weight:
+throughput maksimal tanpa 429, prioritas live > backfill, coalescing, retry
+"""
+import asyncio
+import math
+import sys
+import time
+sys.path.append('.')
+from http_client import HttpClient
+from mock_servers import create_binance_app, start_server
+from request_scheduler import PRIORITY_BACKFILL, PRIORITY_LIVE, RequestScheduler
+
+WEIGHT = 2
+
+
+async def with_server(scenario, **app_kwargs):
+    app = create_binance_app(**app_kwargs)
+    runner, base_url = await start_server(app)
+    try:
+        async with HttpClient() as client:
+            return await scenario(await client.get_session(), f'{base_url}/api/v3/klines', app['state'])
+    finally:
+        await runner.cleanup()
+
+
+def kline_params(index):
+    return {'symbol': 'BTCUSDT', 'interval': '1m', 'limit': 5, 'endTime': 1_700_000_000_000 + index * 60_000}
+
+
+def run_throughput(requests=300, limit=100, window=0.25):
+    scheduler = RequestScheduler(max_weight=limit, window_seconds=window, safety_margin=0.1)
+
+    async def scenario(session, url, state):
+        started = time.perf_counter()
+        results = await asyncio.gather(*(scheduler.get(session, url, kline_params(i), WEIGHT)
+                                         for i in range(requests)))
+        return results, time.perf_counter() - started, state
+
+    return asyncio.run(with_server(scenario, weight_limit=limit, weight_window=window))
+
+
+def test_sustained_throughput_stays_under_limit():
+    limit, window, requests = 100, 0.25, 300
+    results, elapsed, state = run_throughput(requests, limit, window)
+
+    assert all(status == 200 for status, _ in results)
+    assert state.rate_limited == 0
+    assert max(state.window_weights.values()) <= limit
+    # 600 weight dengan kapasitas 90 per window -> 7 window terisi, tanpa window kosong. Window sejajar jam,
+    # jadi window pertama bisa tinggal sebagian: batas atas = window terisi + 1 window pertama
+    windows_needed = math.ceil(requests * WEIGHT / (limit * 0.9))
+    assert elapsed < (windows_needed + 1) * window
+
+
+def test_inflight_weight_is_charged_to_next_window():
+    scheduler = RequestScheduler(max_weight=10, window_seconds=60.0, safety_margin=0)
+    window = [100]
+    scheduler._current_window = lambda: window[0]
+
+    async def scenario(session, url, state):
+        slow = [asyncio.ensure_future(scheduler.get(session, url, kline_params(i), 4)) for i in range(2)]
+        await asyncio.sleep(0.05)
+        # 8 weight sudah di-grant di window 100 tapi belum dijawab saat window berganti
+        window[0] = 101
+        scheduler._refill()
+        at_rollover = scheduler.used
+        await asyncio.gather(*slow)
+        after_answer = scheduler.used
+        granted = await scheduler.acquire(2)
+        full = scheduler.used
+
+        # Tidak ada request yang masih berjalan: window berikutnya mulai dari nol
+        window[0] = 102
+        scheduler._refill()
+        return at_rollover, after_answer, granted, full, scheduler.used
+
+    at_rollover, after_answer, granted, full, idle = asyncio.run(with_server(scenario, latency=0.2))
+    assert (at_rollover, after_answer) == (8, 8)
+    assert granted == 101 and full == 10
+    assert idle == 0 and not scheduler._pending
+
+
+def test_live_requests_jump_the_queue():
+    scheduler = RequestScheduler(max_weight=20, window_seconds=0.2, safety_margin=0)
+    finished = []
+
+    async def fetch(session, url, index, priority):
+        await scheduler.get(session, url, kline_params(index), WEIGHT, priority)
+        finished.append(priority)
+
+    async def scenario(session, url, state):
+        backfill = [asyncio.ensure_future(fetch(session, url, i, PRIORITY_BACKFILL)) for i in range(30)]
+        await asyncio.sleep(0.01)
+        live = [asyncio.ensure_future(fetch(session, url, 100 + i, PRIORITY_LIVE)) for i in range(5)]
+        await asyncio.gather(*backfill, *live)
+        return state
+
+    state = asyncio.run(with_server(scenario, weight_limit=20, weight_window=0.2))
+    assert state.rate_limited == 0
+    # Window pertama sudah habis untuk backfill, live dapat jatah pertama di window berikutnya
+    assert max(i for i, priority in enumerate(finished) if priority == PRIORITY_LIVE) < 15
+
+
+def test_backfill_limit_does_not_block_live_requests():
+    scheduler = RequestScheduler(max_weight=100, window_seconds=60.0, safety_margin=0,
+                                 priority_limits={PRIORITY_BACKFILL: 4})
+
+    async def scenario(session, url, state):
+        # Jangan mulai tepat di ujung window, supaya jatah backfill tidak keburu diisi ulang
+        if time.time() % 60.0 > 58.0:
+            await asyncio.sleep(60.0 - time.time() % 60.0 + 0.01)
+        backfill = [asyncio.ensure_future(scheduler.get(session, url, kline_params(i), WEIGHT, PRIORITY_BACKFILL))
+                    for i in range(5)]
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        live = await asyncio.gather(*(scheduler.get(session, url, kline_params(100 + i), WEIGHT, PRIORITY_LIVE)
+                                      for i in range(3)))
+        elapsed = time.perf_counter() - started
+        done = sum(task.done() for task in backfill)
+        for task in backfill:
+            task.cancel()
+        return live, elapsed, done
+
+    live, elapsed, backfill_done = asyncio.run(with_server(scenario))
+    assert [status for status, _ in live] == [200] * 3
+    # Jatah backfill (2 request) habis, sisanya menunggu window berikutnya tanpa menahan request live
+    assert elapsed < 1.0 and backfill_done == 2
+    assert scheduler.priority_used[PRIORITY_BACKFILL] == 4 and scheduler.priority_used[PRIORITY_LIVE] == 6
+
+
+def test_identical_inflight_requests_are_coalesced():
+    scheduler = RequestScheduler()
+
+    async def scenario(session, url, state):
+        results = await asyncio.gather(*(scheduler.get(session, url, kline_params(1), WEIGHT) for _ in range(10)))
+        again = await scheduler.get(session, url, kline_params(1), WEIGHT)
+        return results, again, state
+
+    results, again, state = asyncio.run(with_server(scenario, latency=0.05))
+    assert state.requests == 2  # 10 request paralel digabung, request berikutnya dikirim ulang
+    assert len({body for _, body in results}) == 1 and again == results[0]
+    assert scheduler.stats['coalesced'] == 9
+
+
+def test_retries_with_retry_after_and_backoff():
+    scheduler = RequestScheduler(base_backoff=0.01)
+
+    async def scenario(session, url, state):
+        return await scheduler.get(session, url, kline_params(1), WEIGHT), state
+
+    (status, _), state = asyncio.run(with_server(scenario, error_statuses=[500, 429], retry_after=0.05))
+    assert status == 200
+    assert [entry[2] for entry in state.request_log] == [500, 429, 200]
+    assert scheduler.stats[500] == 1 and scheduler.stats[429] == 1
+    # Setelah 429 request berikutnya menunggu Retry-After
+    assert state.request_log[2][0] - state.request_log[1][0] >= 0.05
+
+    scheduler = RequestScheduler(base_backoff=0.01, max_retries=1)
+    (status, body), _ = asyncio.run(with_server(scenario, error_statuses=[418, 418], retry_after=0.01))
+    assert status == 418 and b'Too many' in body
+
+
+def test_used_weight_header_from_other_clients_is_respected():
+    scheduler = RequestScheduler(max_weight=100, window_seconds=1.0, safety_margin=0)
+
+    async def scenario(session, url, state):
+        # Proses lain di IP yang sama sudah memakai 95 weight di window ini
+        state.window_weights[int(time.time() // 1.0)] += 95
+        statuses = []
+        for i in range(4):
+            status, _ = await scheduler.get(session, url, kline_params(i), WEIGHT)
+            statuses.append(status)
+        return statuses, state
+
+    statuses, state = asyncio.run(with_server(scenario, weight_limit=100, weight_window=1.0))
+    assert statuses == [200] * 4
+    assert state.rate_limited == 0
+
+
+if __name__ == "__main__":
+    results, elapsed, state = run_throughput()
+    accepted = sum(weight for weight in state.window_weights.values())
+    print(f'✅ {len(results)} request dalam {elapsed:.2f}s, {accepted / elapsed:.0f} weight/s '
+          f'(limit {100 / 0.25:.0f}/s), 429: {state.rate_limited}')
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test support/resistance & trend regression rolling: setiap baris hanya memakai data sampai baris itu
+"""
+import sys
+sys.path.append('.')
+import indicators
+from indicators import calculate_indicators
+from test_with_simulation import generate_sample_klines
+from window_kernels import rolling_linear_regression
+from scipy import stats
+import numpy as np
+import pandas as pd
+import pytest
+
+LEVEL_COLUMNS = ['Local_Max', 'Local_Min', 'Resistance_1', 'Resistance_2', 'Support_1', 'Support_2',
+                 'Trend_Slope', 'Trend_R2', 'Trend_Strength']
+
+
+@pytest.fixture(scope='module')
+def klines():
+    np.random.seed(21)
+    indicators.console.quiet = True
+    return generate_sample_klines('BTCUSDT', 700, 45000)
+
+
+def test_rolling_regression_matches_linregress():
+    rng = np.random.default_rng(3)
+    values = pd.Series(45000 * np.cumprod(1 + rng.normal(0, 0.01, 3000)))
+    for window in (2, 20, 50):
+        slope, r_squared = rolling_linear_regression(values, window)
+        assert slope[:window - 1].isna().all() and slope[window - 1:].notna().all()
+        for end in (window - 1, 1023, 1024 + window, 2999):
+            expected = stats.linregress(np.arange(window), values.values[end - window + 1:end + 1])
+            assert slope[end] == pytest.approx(expected.slope, rel=1e-7)
+            assert r_squared[end] == pytest.approx(expected.rvalue ** 2, abs=1e-7)
+
+    flat_slope, flat_r2 = rolling_linear_regression(np.full(10, 5.0), 4)
+    assert flat_slope[3:].tolist() == [0.0] * 7 and flat_r2[3:].tolist() == [0.0] * 7
+
+
+def test_rows_do_not_use_future_data(klines):
+    full = calculate_indicators(klines, '1h').df
+    for cut in (200, 450):
+        partial = calculate_indicators(klines[:cut], '1h').df
+        pd.testing.assert_frame_equal(partial[LEVEL_COLUMNS], full[LEVEL_COLUMNS].loc[partial.index])
+
+
+def test_levels_follow_confirmed_pivots(klines):
+    result = calculate_indicators(klines, '1h').df
+    # Level berubah dari bar ke bar, bukan satu konstanta untuk seluruh seri
+    assert result['Resistance_1'].nunique() > 1 and result['Trend_Slope'].nunique() > 1
+    assert (result['Resistance_1'] >= result['Resistance_2']).all()
+    assert (result['Support_1'] <= result['Support_2']).all()
+
+    # Bar terakhir: 5 pivot terakhir yang sudah terkonfirmasi (pivot high = max window 20 terpusat)
+    high = pd.Series(np.asarray([float(k[2]) for k in klines]))
+    pivots = high[high.rolling(20, center=True).max() == high]
+    assert result['Resistance_1'].iloc[-1] == pivots.tail(5).max()
+
+
+if __name__ == "__main__":
+    np.random.seed(21)
+    data = generate_sample_klines('BTCUSDT', 700, 45000)
+    df = calculate_indicators(data, '1h').df
+    print(df[['close'] + LEVEL_COLUMNS[2:]].tail().to_string())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test scanner multi-symbol terhadap mock server Binance
+"""
+import asyncio
+import sys
+import pytest
+sys.path.append('.')
+import binance_data
+import model_registry
+from http_client import close_http_client
+from mock_servers import create_binance_app, start_server
+from scanner import gemini_jobs, run_scanner, rank_results
+
+
+@pytest.fixture(autouse=True)
+def isolated_model_dir(tmp_path, monkeypatch):
+    # Model hasil training jangan sampai menumpuk di data/models milik user
+    monkeypatch.setenv('MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(model_registry.model_registry, 'model_dir', str(tmp_path))
+
+
+async def run_mock_scan(now_ms=None, **kwargs):
+    app = create_binance_app(symbols=['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT', 'ETHBTC'], now_ms=now_ms)
+    runner, base_url = await start_server(app)
+    binance_data.BASE_URL = f'{base_url}/api/v3/klines'
+    binance_data.EXCHANGE_INFO_URL = f'{base_url}/api/v3/exchangeInfo'
+    try:
+        return await run_scanner(**kwargs)
+    finally:
+        await close_http_client()
+        await runner.cleanup()
+
+
+def test_scanner_ranks_usdt_universe(monkeypatch):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    monkeypatch.setattr(binance_data, 'EXCHANGE_INFO_URL', binance_data.EXCHANGE_INFO_URL)
+    monkeypatch.setattr(binance_data.console, 'quiet', False)
+
+    results, throughput = asyncio.run(run_mock_scan(intervals=('1h', '15m'), workers=2, limit=300))
+
+    assert {r['symbol'] for r in results} == {'BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT'}
+    assert len(results) == 8
+    assert all('error' not in r for r in results)
+    assert results == rank_results(results)
+    assert throughput > 0
+
+
+def test_scanner_reports_failed_symbols(monkeypatch):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    monkeypatch.setattr(binance_data, 'EXCHANGE_INFO_URL', binance_data.EXCHANGE_INFO_URL)
+    monkeypatch.setattr(binance_data.console, 'quiet', False)
+
+    results, _ = asyncio.run(run_mock_scan(symbols=['BTCUSDT'], intervals=('1h', '7x'), workers=1, limit=300))
+
+    assert len(results) == 2
+    assert 'error' in results[-1] and results[-1]['timeframe'] == '7x'
+
+
+def test_gemini_jobs_carry_latest_bar(monkeypatch):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    monkeypatch.setattr(binance_data, 'EXCHANGE_INFO_URL', binance_data.EXCHANGE_INFO_URL)
+    hour_ms = 3_600_000
+    now_ms = 1_700_000_000_000 // hour_ms * hour_ms
+
+    jobs = []
+    for bar in range(2):
+        results, _ = asyncio.run(run_mock_scan(now_ms=now_ms + bar * hour_ms, symbols=['BTCUSDT'],
+                                               intervals=('1h',), workers=1, limit=300))
+        jobs.append(gemini_jobs(results, 1)[0])
+
+    first, second = jobs
+    assert first.latest['timestamp'] == now_ms and second.latest['timestamp'] == now_ms + hour_ms
+    # Bar berbeda -> fingerprint cache berbeda
+    assert first.fingerprint != second.fingerprint
+    summary = second.summary()
+    assert f"RSI {second.latest['RSI']:.1f}" in summary and 'RSI -' not in summary and 'MACD -' not in summary
+
+
+if __name__ == "__main__":
+    results, throughput = asyncio.run(run_mock_scan(intervals=('1h',), limit=300))
+    print(f'✅ {len(results)} hasil, {throughput:.1f} simbol/detik')
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Test Watchlist terhadap mock server Binance: refresh sejajar candle close,
+analisis hanya untuk candle baru, alert perubahan Recommendation, dan urutan tabel
+"""
+import asyncio
+import io
+import sys
+sys.path.append('.')
+import binance_data
+import model_registry
+import watchlist
+from blessed import Terminal
+from http_client import close_http_client
+from mock_servers import create_binance_app, start_server
+from watchlist import Watchlist, last_closed_open, next_close_delay, render_table
+import pytest
+
+HOUR_MS = 3_600_000
+NOW_MS = 1_700_000_000_000 // HOUR_MS * HOUR_MS + 30_000  # 30 detik setelah jam pas
+
+
+class VirtualClock:
+    """Jam virtual: `sleep` menunggu sampai waktu virtual lewat, `run_until` melompat ke bangun berikutnya.
+
+    Waktu mock Binance ikut maju, tertinggal `lag_ms` (seperti candle yang belum diterbitkan).
+    """
+
+    def __init__(self, now_ms, state, lag_ms=0):
+        self.now_ms = now_ms
+        self.state = state
+        self.lag_ms = lag_ms
+        self.wakes = []
+        self._targets = []
+        self._set(now_ms)
+
+    def _set(self, now_ms):
+        self.now_ms = now_ms
+        self.state.now_ms = now_ms - self.lag_ms
+
+    def time(self):
+        return self.now_ms / 1000
+
+    async def sleep(self, delay):
+        target = self.now_ms + round(delay * 1000)
+        self._targets.append(target)
+        try:
+            while self.now_ms < target:
+                await asyncio.sleep(0.001)
+        finally:
+            self._targets.remove(target)
+        self.wakes.append(target)
+
+    async def run_until(self, end_ms, tasks):
+        while True:
+            # Semua task sudah tidur -> lompat ke waktu bangun paling awal
+            while len(self._targets) < tasks:
+                await asyncio.sleep(0.001)
+            wake = min(self._targets)
+            if wake > end_ms:
+                return
+            self._set(wake)
+            while any(target <= wake for target in self._targets):
+                await asyncio.sleep(0.001)
+
+
+def fake_analysis(klines, symbol, timeframe):
+    """Analisis palsu yang murah: sinyal ikut arah candle terakhir"""
+    close = klines['close']
+    signal = 'BUY' if close[-1] >= close[-2] else 'SELL'
+    return {'action': signal, 'price': float(close[-1]), 'signal_score': 2 if signal == 'BUY' else -2,
+            'signal_recommendation': signal, 'ml_confidence': 60.0, 'atr_percent': 1.5}
+
+
+@pytest.fixture
+def mock_binance(monkeypatch, tmp_path):
+    monkeypatch.setattr(binance_data, 'BASE_URL', binance_data.BASE_URL)
+    monkeypatch.setenv('MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(model_registry.model_registry, 'model_dir', str(tmp_path))
+    for module in (binance_data, watchlist):
+        monkeypatch.setattr(module.console, 'quiet', True)
+
+
+async def with_server(scenario, **app_kwargs):
+    app = create_binance_app(now_ms=NOW_MS, history_candles=2000, **app_kwargs)
+    runner, base_url = await start_server(app)
+    binance_data.BASE_URL = f'{base_url}/api/v3/klines'
+    try:
+        return await scenario(app['state'])
+    finally:
+        await close_http_client()
+        await runner.cleanup()
+
+
+def test_close_alignment():
+    minute = 60_000
+    assert last_closed_open(NOW_MS, minute) == NOW_MS - 30_000 - minute
+    assert next_close_delay(NOW_MS, minute, close_delay=2) == 32.0
+    assert next_close_delay(NOW_MS, HOUR_MS, close_delay=0) == 3570.0
+    # Tepat di batas candle: tunggu candle berikutnya penuh
+    assert next_close_delay(NOW_MS - 30_000, minute, close_delay=0) == 60.0
+
+
+def test_refresh_analyzes_only_new_closed_candles(mock_binance):
+    async def scenario(state):
+        now = [NOW_MS]
+        watched = Watchlist(['BTCUSDT'], ['1h'], limit=300, clock=lambda: now[0] / 1000)
+        first = await watched.refresh('BTCUSDT', '1h')
+        row = watched.rows[('BTCUSDT', '1h')]
+        snapshot = (row.candle, row.price, row.signal)
+        again = await watched.refresh('BTCUSDT', '1h')
+
+        now[0] = state.now_ms = NOW_MS + HOUR_MS
+        after_close = await watched.refresh('BTCUSDT', '1h')
+        return watched, snapshot, (first, again, after_close)
+
+    watched, (candle, price, signal), refreshed = asyncio.run(with_server(scenario))
+    row = watched.rows[('BTCUSDT', '1h')]
+    assert refreshed == (True, False, True)
+    # Candle yang masih berjalan tidak ikut dianalisis
+    assert candle == last_closed_open(NOW_MS, HOUR_MS) and row.candle == candle + HOUR_MS
+    assert price > 0 and signal in watchlist.SIGNAL_RANK
+    assert 0 <= row.ml_confidence <= 100 and row.atr_percent > 0
+    assert watched.stats['fetches'] == 3 and watched.stats['analyses'] == 2 and watched.stats['skipped'] == 1
+
+
+def test_recommendation_change_raises_alert(mock_binance, monkeypatch):
+    signals = iter(['HOLD', 'HOLD', 'BUY', 'STRONG_BUY'])
+
+    def scripted(klines, symbol, timeframe):
+        return {**fake_analysis(klines, symbol, timeframe), 'signal_recommendation': next(signals)}
+
+    monkeypatch.setattr(watchlist, 'analyze_klines', scripted)
+
+    async def scenario(state):
+        now = [NOW_MS]
+        received = []
+
+        async def on_alert(alert):
+            received.append(alert)
+
+        watched = Watchlist(['ETHUSDT'], ['1h'], limit=100, clock=lambda: now[0] / 1000, on_alert=on_alert)
+        changed = []
+        for step in range(4):
+            now[0] = state.now_ms = NOW_MS + step * HOUR_MS
+            await watched.refresh('ETHUSDT', '1h')
+            changed.append(watched.rows[('ETHUSDT', '1h')].changed)
+        return watched, received, changed
+
+    watched, received, changed = asyncio.run(with_server(scenario))
+    assert changed == [False, False, True, True]
+    assert [(a['previous'], a['signal']) for a in watched.alerts] == [('BUY', 'STRONG_BUY'), ('HOLD', 'BUY')]
+    assert received == list(reversed(watched.alerts)) and watched.stats['alerts'] == 2
+
+
+@pytest.mark.parametrize('lag_ms', [0, 3000])
+def test_refresh_tasks_wake_at_candle_closes(mock_binance, monkeypatch, lag_ms):
+    monkeypatch.setattr(watchlist, 'analyze_klines', fake_analysis)
+
+    async def scenario(state):
+        clock = VirtualClock(NOW_MS, state, lag_ms=lag_ms)
+        watched = Watchlist(['BTCUSDT', 'SOLUSDT'], ['1m', '5m'], limit=100, close_delay=2, retry_delay=3,
+                            clock=clock.time, sleep=clock.sleep)
+        watched.start()
+        try:
+            await clock.run_until(NOW_MS + 600_000, len(watched.rows))
+        finally:
+            await watched.stop()
+        return watched, clock
+
+    watched, clock = asyncio.run(with_server(scenario))
+    # 10 menit: 1 analisis awal + 10 candle 1m, 1 + 2 candle 5m, untuk 2 symbol
+    assert watched.stats['analyses'] == 2 * 11 + 2 * 3
+    assert watched.stats['errors'] == 0
+    if lag_ms == 0:
+        # Setiap bangun tepat 2 detik setelah candle close, tanpa fetch sia-sia
+        assert all(wake % 60_000 == 2000 for wake in clock.wakes)
+        assert watched.stats['fetches'] == watched.stats['analyses'] and watched.stats['skipped'] == 0
+    else:
+        # Candle belum terbit saat bangun pertama -> dilewati lalu dicoba lagi 3 detik kemudian
+        assert watched.stats['skipped'] == watched.stats['retries'] == watched.stats['analyses'] - 4
+        assert {wake % 60_000 for wake in clock.wakes} == {2000, 5000}
+    assert all(row.candle == last_closed_open(NOW_MS + 600_000, binance_data.INTERVAL_MS[row.timeframe])
+               for row in watched.rows.values())
+
+
+def test_sorting_and_table_rendering():
+    term = Terminal(kind='xterm-256color', stream=io.StringIO(), force_styling=True)
+    watched = Watchlist(['AAAUSDT', 'BBBUSDT', 'CCCUSDT', 'DDDUSDT'], ['1h'])
+    values = {'AAAUSDT': (1, 'WEAK_BUY', 80.0, 1.0), 'BBBUSDT': (4, 'STRONG_BUY', 55.0, 3.0),
+              'CCCUSDT': (-3, 'SELL', 70.0, 2.0)}
+    for symbol, (score, signal, confidence, atr) in values.items():
+        row = watched.rows[(symbol, '1h')]
+        row.signal_score, row.signal, row.ml_confidence, row.atr_percent = score, signal, confidence, atr
+        row.price, row.candle = 1.2345, NOW_MS
+    watched.rows[('BBBUSDT', '1h')].changed = True
+
+    def order(sort_key):
+        return [row.symbol for row in watched.sorted_rows(sort_key)]
+
+    assert order('score') == ['BBBUSDT', 'AAAUSDT', 'CCCUSDT', 'DDDUSDT']
+    assert order('ml') == ['AAAUSDT', 'CCCUSDT', 'BBBUSDT', 'DDDUSDT']
+    assert order('atr') == ['BBBUSDT', 'CCCUSDT', 'AAAUSDT', 'DDDUSDT']
+    assert order('symbol') == ['AAAUSDT', 'BBBUSDT', 'CCCUSDT', 'DDDUSDT']
+    assert watched.cycle_sort() == 'signal' and watched.sort_key == 'signal'
+
+    lines = render_table(watched.sorted_rows('score'), term).split('\n')
+    assert len(lines) == 5 and 'Sinyal' in lines[0]
+    assert 'BBBUSDT' in lines[1] and 'STRONG_BUY' in lines[1] and '🔔' in lines[1]
+    assert term.red('        SELL') in lines[3]
+    assert 'menunggu data' in lines[4]
+
+    with pytest.raises(ValueError):
+        Watchlist(['BTCUSDT'], ['7x'])
+
+
+if __name__ == "__main__":
+    import tempfile
+    watchlist.analyze_klines = fake_analysis
+    binance_data.console.quiet = watchlist.console.quiet = True
+
+    async def demo(state):
+        clock = VirtualClock(NOW_MS, state)
+        watched = Watchlist(['BTCUSDT', 'ETHUSDT', 'SOLUSDT'], ['1m', '5m'], limit=100,
+                            clock=clock.time, sleep=clock.sleep)
+        watched.start()
+        await clock.run_until(NOW_MS + 3_600_000, len(watched.rows))
+        await watched.stop()
+        return watched
+
+    with tempfile.TemporaryDirectory():
+        watched = asyncio.run(with_server(demo))
+    print(f'✅ 1 jam virtual: {dict(watched.stats)}, {len(watched.alerts)} alert terakhir')
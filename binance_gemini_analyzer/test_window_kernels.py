@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test window kernels: hasil batch harus sama dengan rolling().apply() / max() / min() pandas
+"""
+import sys
+sys.path.append('.')
+from window_kernels import RollingExtrema, rolling_extrema, rolling_mad, rolling_median, rolling_quantile
+import pandas as pd
+import numpy as np
+
+
+def make_series(count=500, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.Series(45000 * np.cumprod(1 + rng.normal(0, 0.01, count)))
+
+
+def test_rolling_mad_matches_pandas_apply():
+    series = make_series()
+    for window in [1, 5, 20, 30]:
+        expected = series.rolling(window=window).apply(lambda x: np.mean(np.abs(x - x.mean())))
+        result = rolling_mad(series, window)
+        assert isinstance(result, pd.Series)
+        assert result.index.equals(series.index)
+        np.testing.assert_allclose(result.values, expected.values, rtol=1e-10, equal_nan=True)
+
+
+def test_rolling_median_and_quantile_match_pandas():
+    series = make_series()
+    np.testing.assert_allclose(rolling_median(series, 14).values,
+                               series.rolling(14).median().values, rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(rolling_quantile(series, 14, 0.25).values,
+                               series.rolling(14).quantile(0.25).values, rtol=1e-12, equal_nan=True)
+
+
+def test_rolling_mad_short_input_and_nan():
+    assert np.isnan(rolling_mad(np.array([1.0, 2.0]), 5)).all()
+
+    values = np.arange(10, dtype=float)
+    values[4] = np.nan
+    expected = pd.Series(values).rolling(3).apply(lambda x: np.mean(np.abs(x - x.mean())))
+    np.testing.assert_allclose(rolling_mad(values, 3), expected.values, equal_nan=True)
+
+
+def test_rolling_mad_chunking(monkeypatch):
+    import window_kernels
+    series = make_series(300)
+    expected = rolling_mad(series, 10).values
+    monkeypatch.setattr(window_kernels, 'CHUNK_ELEMENTS', 70)
+    np.testing.assert_allclose(rolling_mad(series, 10).values, expected, equal_nan=True)
+
+
+def test_rolling_extrema_match_pandas():
+    series = make_series(300)
+    series[[40, 41, 200]] = np.nan
+    for how in ('max', 'min'):
+        for center in (False, True):
+            results = rolling_extrema(series, range(1, 80), how, center)
+            for window, result in results.items():
+                expected = getattr(series.rolling(window, center=center), how)()
+                assert result.equals(expected), (how, center, window)
+
+
+def test_rolling_extrema_short_input_and_shared_levels():
+    extrema = RollingExtrema(np.array([3.0, 1.0, 2.0]), 'max')
+    np.testing.assert_array_equal(extrema.window(3), [np.nan, np.nan, 3.0])
+    assert np.isnan(extrema.window(4)).all()
+
+    extrema = RollingExtrema(make_series(), 'min')
+    extrema.window(9)
+    extrema.window(14)
+    # Window 9..15 memakai level 2^3, tidak perlu level baru
+    assert len(extrema._levels) == 4
+
+
+if __name__ == "__main__":
+    test_rolling_mad_matches_pandas_apply()
+    test_rolling_median_and_quantile_match_pandas()
+    test_rolling_mad_short_input_and_nan()
+    test_rolling_extrema_match_pandas()
+    print('✅ Window kernels OK')
@@ -6,7 +6,6 @@ import sys
 sys.path.append('.')
 from indicators import calculate_indicators
 from trading_signals import signal_engine
-import pandas as pd
 import numpy as np
 import time
 
@@ -68,8 +67,7 @@ def test_analysis():
     print(f'✅ Berhasil menghitung {len(data_with_indicators)} data dengan indikator')
     
     # Test trading signals
-    df = pd.DataFrame(data_with_indicators)
-    trading_rec = signal_engine.generate_trading_recommendation(df, symbol, timeframe)
+    trading_rec = signal_engine.generate_trading_recommendation(data_with_indicators, symbol, timeframe)
     
     print('\n🎯 HASIL ANALISIS TRADING:')
     print('=' * 50)
@@ -89,7 +87,7 @@ def test_analysis():
     print(f'ATR%: {trading_rec["atr_percent"]:.2f}%')
     
     # Show latest indicators
-    latest = data_with_indicators[-1]
+    latest = data_with_indicators.latest()
     print('\n📈 INDIKATOR TEKNIKAL TERAKHIR:')
     print('=' * 50)
     print(f'Current Price: ${latest.get("close", 0):,.2f}')
@@ -127,8 +125,7 @@ def test_analysis():
         try:
             test_klines = generate_sample_klines(symbol, 50, 45000)
             test_data = calculate_indicators(test_klines, tf)
-            test_df = pd.DataFrame(test_data)
-            test_rec = signal_engine.generate_trading_recommendation(test_df, symbol, tf)
+            test_rec = signal_engine.generate_trading_recommendation(test_data, symbol, tf)
             print(f'{tf}: {test_rec["action"]} ({test_rec["confidence"]:.1f}%) - Score: {test_rec["technical_score"]}')
         except Exception as e:
             print(f'{tf}: Error - {e}')
@@ -173,8 +170,7 @@ def test_analysis():
                 timestamp += 3600000
             
             test_data = calculate_indicators(test_klines, '1h')
-            test_df = pd.DataFrame(test_data)
-            test_rec = signal_engine.generate_trading_recommendation(test_df, symbol, '1h')
+            test_rec = signal_engine.generate_trading_recommendation(test_data, symbol, '1h')
             
             print(f'{condition}: {test_rec["action"]} ({test_rec["confidence"]:.1f}%) - '
                   f'Vol: {test_rec["volatility"]:.2f}% - Score: {test_rec["technical_score"]}')
@@ -3,11 +3,32 @@ import pandas as pd
 from rich.console import Console
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
+from indicators import as_frame
 import warnings
 warnings.filterwarnings('ignore')
 
 console = Console()
 
+# Window rolling volume di prepare_features, menentukan berapa bar history yang dibutuhkan fitur bar terakhir
+VOLUME_SMA_PERIOD = 20
+
+# Fitur dasar model (fitur turunan EMA_Ratio / BB_Position / Volume_Ratio dihitung di prepare_features)
+BASE_FEATURES = [
+    'RSI', 'MACD', 'MACD_Signal', 'MACD_Histogram',
+    '%K', '%D', 'Williams_R', 'CCI', 'ADX',
+    'BB_Width', 'ATR_Percent', 'Trend_Strength'
+]
+
+def recommendation_columns(params):
+    """Kolom indikator yang dibutuhkan generate_trading_recommendation.
+
+    Dipakai sebagai calculate_indicators(..., columns=recommendation_columns).
+    Semua kolom EMA ikut dihitung supaya schema fitur (EMA_Ratio butuh
+    EMA_12/EMA_26) sama dengan hasil perhitungan penuh.
+    """
+    emas = [f'EMA_{params[key]}' for key in ('ema_fast', 'ema_slow', 'ema_long')]
+    return BASE_FEATURES + emas + ['BB_Upper', 'BB_Lower', 'ATR', 'Support_1', 'Resistance_1', 'Signal_Score']
+
 class TradingSignalEngine:
     """Engine untuk menghasilkan sinyal trading yang akurat"""
     
@@ -16,35 +37,69 @@ class TradingSignalEngine:
         self.model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.is_trained = False
         
+    def feature_columns(self, df):
+        """Daftar nama fitur yang akan dipakai untuk DataFrame ini (tanpa menghitung apa pun)"""
+        # Price-based features
+        features = list(BASE_FEATURES)
+        if 'EMA_12' in df.columns and 'EMA_26' in df.columns:
+            features.append('EMA_Ratio')
+        if all(col in df.columns for col in ['close', 'BB_Upper', 'BB_Lower']):
+            features.append('BB_Position')
+        if 'volume' in df.columns:
+            features.append('Volume_Ratio')
+        return features
+    
     def prepare_features(self, df):
         """Menyiapkan fitur untuk machine learning"""
-        features = []
-        
-        # Price-based features
-        features.extend([
-            'RSI', 'MACD', 'MACD_Signal', 'MACD_Histogram',
-            '%K', '%D', 'Williams_R', 'CCI', 'ADX',
-            'BB_Width', 'ATR_Percent', 'Trend_Strength'
-        ])
+        features = self.feature_columns(df)
         
         # Moving average ratios
-        if f'EMA_12' in df.columns and f'EMA_26' in df.columns:
+        if 'EMA_Ratio' in features:
             df['EMA_Ratio'] = df['EMA_12'] / df['EMA_26']
-            features.append('EMA_Ratio')
         
         # Price position in Bollinger Bands
-        if all(col in df.columns for col in ['close', 'BB_Upper', 'BB_Lower']):
+        if 'BB_Position' in features:
             df['BB_Position'] = (df['close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
-            features.append('BB_Position')
         
         # Volume analysis
-        if 'volume' in df.columns:
-            df['Volume_SMA'] = df['volume'].rolling(20).mean()
+        if 'Volume_Ratio' in features:
+            df['Volume_SMA'] = df['volume'].rolling(VOLUME_SMA_PERIOD).mean()
             df['Volume_Ratio'] = df['volume'] / df['Volume_SMA']
-            features.append('Volume_Ratio')
         
         return df[features].fillna(0)
     
+    def _latest_feature_matrix(self, df, n):
+        """Array fitur n bar terakhir langsung dari kolom numpy (tanpa copy/insert kolom DataFrame)"""
+        features = self.feature_columns(df)
+        # Cukup ambil bar yang dibutuhkan window volume, DataFrame caller tidak ikut diubah
+        tail = df.iloc[-(n + VOLUME_SMA_PERIOD - 1):]
+        
+        def values(column):
+            return tail[column].to_numpy(dtype=float)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            derived = {}
+            if 'EMA_Ratio' in features:
+                derived['EMA_Ratio'] = values('EMA_12') / values('EMA_26')
+            if 'BB_Position' in features:
+                derived['BB_Position'] = (values('close') - values('BB_Lower')) / (values('BB_Upper') - values('BB_Lower'))
+            if 'Volume_Ratio' in features:
+                volume = values('volume')
+                volume_sma = np.full(len(volume), np.nan)
+                if len(volume) >= VOLUME_SMA_PERIOD:
+                    window_sum = np.convolve(volume, np.ones(VOLUME_SMA_PERIOD), 'valid')
+                    volume_sma[VOLUME_SMA_PERIOD - 1:] = window_sum / VOLUME_SMA_PERIOD
+                derived['Volume_Ratio'] = volume / volume_sma
+            
+            matrix = np.column_stack([derived[f] if f in derived else values(f) for f in features])[-n:]
+        # Sama dengan fillna(0) di prepare_features (inf dibiarkan)
+        return features, np.nan_to_num(matrix, nan=0.0, posinf=np.inf, neginf=-np.inf), tail.index[-n:]
+    
+    def latest_features(self, df, n=1):
+        """Fitur untuk n bar terakhir saja, nilainya sama dengan prepare_features(df).iloc[-n:]"""
+        features, matrix, index = self._latest_feature_matrix(df, n)
+        return pd.DataFrame(matrix, index=index, columns=features)
+    
     def generate_labels(self, df, lookahead=5, threshold=0.02):
         """Generate labels untuk training (1=buy, 0=hold, -1=sell)"""
         future_returns = df['close'].shift(-lookahead) / df['close'] - 1
@@ -83,23 +138,55 @@ class TradingSignalEngine:
         else:
             console.log("[yellow]⚠️ Data tidak cukup untuk training model[/yellow]")
     
-    def predict_signals(self, df):
-        """Prediksi sinyal menggunakan trained model"""
+    def predict_signals(self, df, features=None):
+        """Prediksi sinyal menggunakan trained model (features boleh dari prepare_features sebelumnya)"""
         if not self.is_trained:
             self.train_model(df)
         
         if self.is_trained:
-            features = self.prepare_features(df)
-            features_scaled = self.scaler.transform(features)
-            
-            predictions = self.model.predict(features_scaled)
-            probabilities = self.model.predict_proba(features_scaled)
+            if features is None:
+                features = self.prepare_features(df)
+            predictions, confidence = self._predict(features)
             
             df['ML_Signal'] = predictions
-            df['ML_Confidence'] = np.max(probabilities, axis=1) * 100
+            df['ML_Confidence'] = confidence
             
         return df
     
+    def _predict(self, features):
+        """Satu kali predict_proba: kelas = argmax probabilitas (sama dengan model.predict)"""
+        probabilities = self.model.predict_proba(self.scaler.transform(features))
+        predictions = self.model.classes_.take(np.argmax(probabilities, axis=1))
+        return predictions, np.max(probabilities, axis=1) * 100
+    
+    def predict_latest(self, df, n=1, features=None):
+        """Prediksi ML hanya untuk n bar terakhir (mode inference live).
+        
+        Return DataFrame berisi ML_Signal dan ML_Confidence dengan index n bar
+        terakhir, atau None kalau model tidak bisa di-training.
+        """
+        if not self.is_trained:
+            self.train_model(df)
+        if not self.is_trained:
+            return None
+        
+        if features is None:
+            features = self.latest_features(df, n)
+        predictions, confidence = self._predict(features)
+        return pd.DataFrame({'ML_Signal': predictions, 'ML_Confidence': confidence}, index=features.index)
+    
+    def predict_latest_batch(self, frames):
+        """Prediksi bar terakhir banyak DataFrame (misal banyak symbol) dalam satu predict_proba.
+        
+        Engine harus sudah ter-training. Return list (ml_signal, ml_confidence) sesuai urutan frames.
+        """
+        if not frames:
+            return []
+        rows = [self._latest_feature_matrix(as_frame(df), 1) for df in frames]
+        features = pd.DataFrame(np.vstack([matrix for _, matrix, _ in rows]), columns=rows[0][0])
+        predictions, confidence = self._predict(features)
+        return [(int(signal), float(conf)) for signal, conf in zip(predictions, confidence)]
+    
     def calculate_risk_metrics(self, df, current_price):
         """Menghitung metrik risiko untuk position sizing"""
         console.log("[cyan]📊 Menghitung risk metrics...[/cyan]")
@@ -126,6 +213,7 @@ class TradingSignalEngine:
         """Generate comprehensive trading recommendation"""
         console.log("[cyan]🎯 Generating trading recommendation...[/cyan]")
         
+        df = as_frame(df)
         if df.empty:
             return {"error": "No data available"}
         
@@ -133,16 +221,27 @@ class TradingSignalEngine:
         latest = df.iloc[-1]
         current_price = latest['close']
         
-        # Predict signals
-        df = self.predict_signals(df)
+        # Predict signal untuk bar terakhir saja (hanya itu yang dipakai rekomendasi)
+        ml_signal, ml_confidence = self.latest_signal(df)
         
         # Calculate risk metrics
         risk_metrics = self.calculate_risk_metrics(df, current_price)
         
+        return self.build_recommendation(latest, risk_metrics, symbol, timeframe, ml_signal, ml_confidence)
+    
+    def latest_signal(self, df, features=None):
+        """(ml_signal, ml_confidence) bar terakhir, (0, 0) kalau model belum bisa dipakai"""
+        prediction = self.predict_latest(df, 1, features=features)
+        if prediction is None:
+            return 0, 0
+        return int(prediction['ML_Signal'].iloc[-1]), float(prediction['ML_Confidence'].iloc[-1])
+    
+    def build_recommendation(self, latest, risk_metrics, symbol, timeframe, ml_signal=0, ml_confidence=0):
+        """Gabungkan skor teknikal, sinyal ML, dan risk metrics jadi rekomendasi final"""
+        current_price = latest['close']
+        
         # Combine signals
         technical_score = latest.get('Signal_Score', 0)
-        ml_signal = latest.get('ML_Signal', 0)
-        ml_confidence = latest.get('ML_Confidence', 0)
         
         # Final recommendation logic
         combined_score = (technical_score * 0.6) + (ml_signal * 0.4)
@@ -0,0 +1,326 @@
+"""
+Watchlist live multi-symbol untuk dashboard.
+
+Setiap pasangan (symbol, timeframe) punya task refresh sendiri yang tidur sampai
+candle berikutnya close, lalu mengambil kline terbaru. Analisis (indikator + ML)
+hanya dijalankan kalau memang ada candle close baru; kalau Binance belum
+menerbitkan candle tersebut, refresh dicoba lagi sebentar kemudian. Perubahan
+Recommendation dicatat sebagai alert.
+"""
+import asyncio
+import inspect
+import time
+from collections import Counter, deque
+from rich.console import Console
+from binance_data import INTERVAL_MS, get_binance_data
+from compute_executor import analyze_klines
+from config import WATCHLIST_CLOSE_DELAY, WATCHLIST_RETRY_DELAY
+from http_client import get_session
+
+console = Console()
+
+SIGNAL_RANK = {'STRONG_BUY': 3, 'BUY': 2, 'WEAK_BUY': 1, 'HOLD': 0, 'WEAK_SELL': -1, 'SELL': -2, 'STRONG_SELL': -3}
+SIGNAL_STYLES = {'STRONG_BUY': 'bold_green', 'BUY': 'green', 'WEAK_BUY': 'yellow', 'HOLD': 'white',
+                 'WEAK_SELL': 'yellow', 'SELL': 'red', 'STRONG_SELL': 'bold_red'}
+
+# Urutan tabel: nama -> (key, terbesar di atas?). Baris yang belum punya data selalu paling bawah.
+SORT_KEYS = {
+    'score': (lambda row: (row.signal_score, SIGNAL_RANK.get(row.signal, 0), row.ml_confidence), True),
+    'signal': (lambda row: (SIGNAL_RANK.get(row.signal, 0), row.signal_score, row.ml_confidence), True),
+    'ml': (lambda row: (row.ml_confidence, row.signal_score), True),
+    'atr': (lambda row: (row.atr_percent, row.signal_score), True),
+    'symbol': (lambda row: (row.symbol, INTERVAL_MS.get(row.timeframe, 0)), False),
+}
+
+# (judul, lebar) kolom tabel watchlist
+COLUMNS = (('Symbol', 10), ('TF', 4), ('Harga', 12), ('Skor', 5), ('Sinyal', 12), ('ML%', 6), ('ATR%', 6),
+           ('Candle', 12))
+TABLE_HEADER = ' '.join(title.ljust(width) if index < 2 else title.rjust(width)
+                        for index, (title, width) in enumerate(COLUMNS))
+
+
+def last_closed_open(now_ms, interval_ms):
+    """Open time candle terakhir yang sudah close pada waktu `now_ms`"""
+    return now_ms // interval_ms * interval_ms - interval_ms
+
+
+def next_close_delay(now_ms, interval_ms, close_delay=WATCHLIST_CLOSE_DELAY):
+    """Detik sampai candle yang sedang berjalan close (+ jeda supaya Binance sempat menerbitkannya)"""
+    next_close = (now_ms // interval_ms + 1) * interval_ms
+    return max(0.0, (next_close - now_ms) / 1000 + close_delay)
+
+
+class WatchRow:
+    """Satu baris watchlist: hasil analisis terakhir satu symbol/timeframe"""
+
+    __slots__ = ('symbol', 'timeframe', 'candle', 'price', 'signal_score', 'signal', 'action', 'ml_confidence',
+                 'atr_percent', 'changed', 'error', 'next_refresh')
+
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.candle = None  # open time candle close terakhir yang sudah dianalisis
+        self.price = 0.0
+        self.signal_score = 0
+        self.signal = None  # kolom Recommendation indikator
+        self.action = None  # action rekomendasi gabungan (teknikal + ML)
+        self.ml_confidence = 0.0
+        self.atr_percent = 0.0
+        self.changed = False  # Recommendation berubah di candle terakhir
+        self.error = None
+        self.next_refresh = None
+
+    @property
+    def ready(self):
+        return self.signal is not None
+
+    def __repr__(self):
+        return f'WatchRow({self.symbol} {self.timeframe} {self.candle} {self.signal} skor {self.signal_score})'
+
+
+class Watchlist:
+    """Tabel live banyak symbol x timeframe yang diisi task refresh di background.
+
+    `on_update(row)` dan `on_alert(alert)` (fungsi biasa atau coroutine) dipanggil
+    setiap baris berubah / Recommendation berganti. `clock` dan `sleep` bisa
+    diganti untuk test. `stats` mencatat fetches, analyses, skipped, retries,
+    errors dan alerts.
+    """
+
+    def __init__(self, symbols, timeframes, limit=500, sort_key='score', executor=None, session=None,
+                 concurrency=10, close_delay=WATCHLIST_CLOSE_DELAY, retry_delay=WATCHLIST_RETRY_DELAY,
+                 max_retries=5, max_alerts=50, on_update=None, on_alert=None, clock=time.time, sleep=asyncio.sleep):
+        unknown = [timeframe for timeframe in timeframes if timeframe not in INTERVAL_MS]
+        if unknown:
+            raise ValueError(f"Timeframe tidak dikenal: {', '.join(unknown)}")
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Urutan tidak dikenal: {sort_key} (pilihan: {', '.join(SORT_KEYS)})")
+        self.rows = {(symbol, timeframe): WatchRow(symbol, timeframe) for symbol in symbols for timeframe in timeframes}
+        self.limit = limit
+        self.sort_key = sort_key
+        self.executor = executor
+        self.session = session
+        self.close_delay = close_delay
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.alerts = deque(maxlen=max_alerts)
+        self.on_update = on_update
+        self.on_alert = on_alert
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = Counter()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks = []
+
+    def now_ms(self):
+        return int(self.clock() * 1000)
+
+    def sorted_rows(self, sort_key=None):
+        """Baris sesuai urutan `sort_key` (default: self.sort_key), yang belum siap di bawah"""
+        key, descending = SORT_KEYS[sort_key or self.sort_key]
+        ready = sorted((row for row in self.rows.values() if row.ready), key=key, reverse=descending)
+        pending = [row for row in self.rows.values() if not row.ready]
+        return ready + pending
+
+    def cycle_sort(self):
+        """Ganti ke urutan berikutnya di SORT_KEYS, return nama urutan baru"""
+        names = list(SORT_KEYS)
+        self.sort_key = names[(names.index(self.sort_key) + 1) % len(names)]
+        return self.sort_key
+
+    async def _emit(self, callback, value):
+        if callback is not None:
+            result = callback(value)
+            if inspect.isawaitable(result):
+                await result
+
+    async def _analyze(self, symbol, timeframe, klines):
+        if self.executor is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, analyze_klines, klines, symbol, timeframe)
+        return await self.executor.submit(symbol, timeframe, klines)
+
+    async def refresh(self, symbol, timeframe):
+        """Ambil kline terbaru, analisis hanya kalau ada candle close baru. Return True kalau dianalisis."""
+        row = self.rows[(symbol, timeframe)]
+        interval_ms = INTERVAL_MS[timeframe]
+        session = self.session or await get_session()
+
+        async with self._semaphore:
+            self.stats['fetches'] += 1
+            # +1 karena candle yang masih berjalan dibuang
+            klines = await get_binance_data(symbol, timeframe, limit=self.limit + 1, session=session, as_array=True)
+        if klines is None or len(klines) == 0:
+            return await self._fail(row, 'Gagal ngambil data')
+
+        # Baris terakhir dari Binance selalu candle yang masih berjalan menurut jam server, jadi
+        # dibuang walaupun jam lokal sudah lewat close-nya (jam lokal bisa lebih cepat dari server)
+        closed = klines[:-1]
+        closed = closed[closed['timestamp'] + interval_ms <= self.now_ms()]
+        if len(closed) == 0:
+            return await self._fail(row, 'Belum ada candle close')
+        candle = int(closed['timestamp'][-1])
+        if candle == row.candle:
+            # Tidak ada candle baru: tidak ada yang perlu dihitung ulang
+            self.stats['skipped'] += 1
+            return False
+
+        try:
+            analysis = await self._analyze(symbol, timeframe, closed[-self.limit:])
+        except Exception as e:
+            analysis = {'error': str(e)}
+        if 'error' in analysis:
+            return await self._fail(row, analysis['error'])
+
+        self.stats['analyses'] += 1
+        previous = row.signal
+        row.candle = candle
+        row.price = float(analysis['price'])
+        row.signal_score = int(analysis['signal_score'])
+        row.signal = analysis['signal_recommendation']
+        row.action = analysis['action']
+        row.ml_confidence = float(analysis['ml_confidence'])
+        row.atr_percent = float(analysis['atr_percent'])
+        row.changed = previous is not None and previous != row.signal
+        row.error = None
+
+        if row.changed:
+            alert = {'symbol': symbol, 'timeframe': timeframe, 'candle': candle, 'previous': previous,
+                     'signal': row.signal, 'price': row.price, 'action': row.action}
+            self.alerts.appendleft(alert)
+            self.stats['alerts'] += 1
+            console.log(f"[bold yellow]🔔 {symbol} {timeframe}: {previous} → {row.signal} "
+                        f"@ {row.price:.6g}[/bold yellow]")
+            await self._emit(self.on_alert, alert)
+        await self._emit(self.on_update, row)
+        return True
+
+    async def _fail(self, row, error):
+        self.stats['errors'] += 1
+        row.error = error
+        console.log(f"[red]❌ Watchlist {row.symbol} {row.timeframe}: {error}[/red]")
+        await self._emit(self.on_update, row)
+        return False
+
+    async def _watch(self, symbol, timeframe):
+        row = self.rows[(symbol, timeframe)]
+        interval_ms = INTERVAL_MS[timeframe]
+        retries = 0
+        while True:
+            try:
+                await self.refresh(symbol, timeframe)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._fail(row, str(e))
+
+            now_ms = self.now_ms()
+            delay = next_close_delay(now_ms, interval_ms, self.close_delay)
+            behind = row.candle is None or row.candle < last_closed_open(now_ms, interval_ms)
+            if behind and retries < self.max_retries:
+                # Candle terakhir belum diterbitkan Binance (atau fetch gagal): coba lagi sebentar lagi
+                retries += 1
+                self.stats['retries'] += 1
+                delay = min(delay, self.retry_delay)
+            else:
+                retries = 0
+            row.next_refresh = now_ms + int(delay * 1000)
+            await self.sleep(delay)
+
+    def start(self):
+        """Mulai satu task refresh per baris"""
+        if not self._tasks:
+            console.log(f"[cyan]👀 Watchlist {len(self.rows)} baris, refresh setiap candle close[/cyan]")
+            self._tasks = [asyncio.ensure_future(self._watch(symbol, timeframe)) for symbol, timeframe in self.rows]
+        return self
+
+    async def wait(self):
+        """Tunggu semua task refresh (berjalan terus sampai stop/cancel)"""
+        await asyncio.gather(*self._tasks)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def _clock_text(ms):
+    return time.strftime('%m-%d %H:%M', time.gmtime(ms / 1000)) if ms is not None else '-'
+
+
+def render_table(rows, term):
+    """Teks tabel watchlist (warna blessed), satu baris per symbol/timeframe"""
+    lines = [term.bold(TABLE_HEADER)]
+    widths = [width for _, width in COLUMNS]
+    for row in rows:
+        if not row.ready:
+            status = row.error or 'menunggu data...'
+            style = term.red if row.error else term.bright_black
+            lines.append(f"{row.symbol:<{widths[0]}} {row.timeframe:<{widths[1]}} " + style(status))
+            continue
+        signal = f"{row.signal:>{widths[4]}}"
+        signal = getattr(term, SIGNAL_STYLES.get(row.signal, 'white'))(signal)
+        cells = [f"{row.symbol:<{widths[0]}}", f"{row.timeframe:<{widths[1]}}", f"{row.price:>{widths[2]}.6g}",
+                 f"{row.signal_score:>{widths[3]}}", signal, f"{row.ml_confidence:>{widths[5]}.1f}",
+                 f"{row.atr_percent:>{widths[6]}.2f}", f"{_clock_text(row.candle):>{widths[7]}}"]
+        line = ' '.join(cells)
+        if row.changed:
+            line = term.reverse(' '.join(cells[:4])) + ' ' + ' '.join(cells[4:]) + ' 🔔'
+        if row.error:
+            line += ' ' + term.red(f'⚠️ {row.error}')
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def render_alerts(alerts, term, count=5):
+    """Daftar alert terbaru (paling baru di atas)"""
+    lines = [term.bold_yellow('🔔 PERUBAHAN REKOMENDASI')]
+    for alert in list(alerts)[:count]:
+        lines.append(f"{_clock_text(alert['candle'])} {alert['symbol']} {alert['timeframe']}: {alert['previous']} → "
+                     + getattr(term, SIGNAL_STYLES.get(alert['signal'], 'white'))(alert['signal'])
+                     + f" @ {alert['price']:.6g}")
+    if len(lines) == 1:
+        lines.append(term.bright_black('Belum ada perubahan'))
+    return '\n'.join(lines)
+
+
+def watchlist_layout(height):
+    """Layout dashboard watchlist: judul, tabel, alert, status"""
+    return [('header', 0), ('table', 2), ('alerts', max(3, height - 8)), ('status', height - 1)]
+
+
+async def run_dashboard(watchlist, dashboard):
+    """Tampilkan watchlist di dashboard sampai user menekan 'q' ('s' ganti urutan)"""
+    term = dashboard.term
+
+    def show(_=None):
+        pending = [row.next_refresh for row in watchlist.rows.values() if row.next_refresh is not None]
+        stats = watchlist.stats
+        dashboard.update(
+            header=term.bold_magenta("👀 WATCHLIST LIVE") +
+            term.cyan(f"  urut: {watchlist.sort_key}  |  [s] ganti urutan  [q] keluar"),
+            table=render_table(watchlist.sorted_rows(), term),
+            alerts=render_alerts(watchlist.alerts, term),
+            status=term.bright_black(f"analisis {stats['analyses']} | dilewati {stats['skipped']} | "
+                                     f"error {stats['errors']} | refresh berikutnya "
+                                     f"{time.strftime('%H:%M:%S', time.gmtime(min(pending) / 1000)) if pending else '-'}"))
+
+    watchlist.on_update = show
+    show()
+    watchlist.start()
+    try:
+        if not term.is_a_tty:
+            # Tanpa keyboard interaktif: jalan terus sampai Ctrl+C
+            await watchlist.wait()
+            return
+        with term.cbreak():
+            while True:
+                key = await dashboard.read_key()
+                if key.lower() == 'q':
+                    break
+                if key.lower() == 's':
+                    watchlist.cycle_sort()
+                    show()
+    finally:
+        await watchlist.stop()
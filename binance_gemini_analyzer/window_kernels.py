@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Batas jumlah elemen (baris x window) per blok supaya strided view tidak makan memori
+CHUNK_ELEMENTS = 4_000_000
+
+
+def _as_float_array(values):
+    """Konversi Series/list ke array float64 tanpa copy kalau memungkinkan"""
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _wrap_result(result, values):
+    """Kembalikan Series dengan index yang sama kalau input berupa Series"""
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result
+
+
+def rolling_window_reduce(values, window, reducer):
+    """Menjalankan reducer(windows) untuk semua window sekaligus secara batch.
+
+    `reducer` menerima array 2D (jumlah_window x window) dan harus mengembalikan
+    array 1D dengan satu nilai per window. Window yang belum lengkap (awal seri)
+    diisi NaN, sama seperti `rolling(window)` di pandas.
+    """
+    arr = _as_float_array(values)
+    n = len(arr)
+    result = np.full(n, np.nan)
+
+    if window < 1:
+        raise ValueError("window harus >= 1")
+    if n < window:
+        return _wrap_result(result, values)
+
+    windows = sliding_window_view(arr, window)
+    step = max(1, CHUNK_ELEMENTS // window)
+
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        result[window - 1 + start:window - 1 + start + len(block)] = reducer(block)
+
+    return _wrap_result(result, values)
+
+
+def _mad_reducer(block):
+    mean = block.mean(axis=1, keepdims=True)
+    return np.abs(block - mean).mean(axis=1)
+
+
+def rolling_mad(values, window):
+    """Rolling mean absolute deviation (dipakai CCI) tanpa callback Python per window"""
+    return rolling_window_reduce(values, window, _mad_reducer)
+
+
+def rolling_median(values, window):
+    """Rolling median via strided view"""
+    return rolling_window_reduce(values, window, lambda block: np.median(block, axis=1))
+
+
+def rolling_quantile(values, window, q):
+    """Rolling quantile (0-1) dengan interpolasi linear, sama dengan pandas"""
+    return rolling_window_reduce(values, window, lambda block: np.quantile(block, q, axis=1))
+
+
+class RollingExtrema:
+    """Rolling max/min untuk banyak ukuran window dari satu sparse table.
+
+    Level k berisi ekstrem blok 2^k bar, dibangun sekali per seri (dan hanya
+    sampai level yang dibutuhkan window terbesar). Window w apa pun dijawab
+    dengan dua blok 2^k yang saling tumpang tindih, O(n) per window tanpa
+    menyentuh ulang data mentah. Hasil sama persis dengan
+    `rolling(window, center=...).max()/min()` pandas, termasuk NaN di awal seri
+    dan window yang mengandung NaN.
+    """
+
+    def __init__(self, values, how='max'):
+        if how not in ('max', 'min'):
+            raise ValueError("how harus 'max' atau 'min'")
+        self.values = values
+        self.how = how
+        self._op = np.maximum if how == 'max' else np.minimum
+        self._levels = [_as_float_array(values)]
+
+    def __len__(self):
+        return len(self._levels[0])
+
+    def _level(self, k):
+        """Ekstrem blok 2^k mulai dari setiap posisi, level dibangun bertahap"""
+        while len(self._levels) <= k:
+            previous = self._levels[-1]
+            half = 1 << (len(self._levels) - 1)
+            self._levels.append(self._op(previous[:-half], previous[half:]))
+        return self._levels[k]
+
+    def window(self, window, center=False):
+        """Rolling max/min untuk satu ukuran window"""
+        if window < 1:
+            raise ValueError("window harus >= 1")
+        n = len(self)
+        result = np.full(n, np.nan)
+        if n >= window:
+            k = window.bit_length() - 1
+            level = self._level(k)
+            count = n - window + 1
+            offset = window - (1 << k)
+            trailing = self._op(level[:count], level[offset:offset + count])
+            # center=True seperti pandas: label ada di tengah window (dibulatkan ke kiri)
+            start = window - 1 - ((window - 1) // 2 if center else 0)
+            result[start:start + count] = trailing
+        return _wrap_result(result, self.values)
+
+
+def rolling_extrema(values, windows, how='max', center=False):
+    """{window: rolling max/min} untuk semua window sekaligus dari satu sparse table"""
+    extrema = RollingExtrema(values, how)
+    return {window: extrema.window(window, center) for window in sorted(set(windows))}
+
+
+# Blok prefix sum rolling regression: sum direset tiap blok supaya error pembulatan tidak menumpuk
+REGRESSION_BLOCK = 1024
+
+
+def rolling_linear_regression(values, window):
+    """Slope dan R² regresi linear y ~ x (x = 0..window-1) per window, dari windowed sums.
+
+    Setiap bar hanya memakai `window` bar terakhir sampai bar itu sendiri.
+    sum(y), sum(x*y), sum(y²) per window diambil dari selisih prefix sum
+    (O(1) per bar, tidak tergantung ukuran window). Prefix sum dihitung ulang
+    per blok REGRESSION_BLOCK bar dengan y digeser ke nilai awal blok, supaya
+    presisi tetap terjaga di seri panjang. Window berisi harga konstan punya R² 0.
+    """
+    if window < 2:
+        raise ValueError("window harus >= 2")
+    y_all = _as_float_array(values)
+    n = len(y_all)
+    slope = np.full(n, np.nan)
+    r_squared = np.full(n, np.nan)
+
+    var_x = (window * window - 1) / 12
+    # x relatif terhadap tengah window: sum(x - x̄) = 0
+    weights = np.arange(window) - (window - 1) / 2
+    step = max(REGRESSION_BLOCK, window)
+    for end in range(window - 1, n, step):
+        start = end - window + 1
+        block = y_all[start:min(n, end + step)]
+        y = block - block[0]
+        x = np.arange(len(block), dtype=np.float64)
+        sums = np.concatenate([[0.0], np.cumsum(y)])
+        sums_xy = np.concatenate([[0.0], np.cumsum(x * y)])
+        sums_sq = np.concatenate([[0.0], np.cumsum(y * y)])
+
+        sum_y = sums[window:] - sums[:-window]
+        sum_xy = sums_xy[window:] - sums_xy[:-window]
+        sum_sq = sums_sq[window:] - sums_sq[:-window]
+        first_x = x[:len(sum_y)]
+
+        mean_y = sum_y / window
+        # Σ(x - x̄)·y dengan x lokal window = Σ x_blok·y - (x_awal + (w-1)/2)·Σy
+        cov_xy = (sum_xy - (first_x - weights[0]) * sum_y) / window
+        var_y = np.maximum(sum_sq / window - mean_y * mean_y, 0.0)
+
+        block_slope = cov_xy / var_x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            block_r2 = np.where(var_y > 0, np.clip(cov_xy * cov_xy / (var_x * var_y), 0.0, 1.0), 0.0)
+        block_r2 = np.where(np.isnan(block_slope), np.nan, block_r2)
+
+        slope[end:end + len(sum_y)] = block_slope
+        r_squared[end:end + len(sum_y)] = block_r2
+
+    return _wrap_result(slope, values), _wrap_result(r_squared, values)